@@ -0,0 +1,307 @@
+"""
+============================================
+PROJETO BIG DATA - CS:GO MATCHMAKING
+Motor Analítico Local (DuckDB)
+============================================
+
+Executa as consultas dos relatórios direto sobre as tabelas
+normalizadas (CSV, Parquet ou Arrow), sem carregar nada no PostgreSQL.
+O DuckDB lê os arquivos em colunas, com execução vetorizada em
+NUM_THREADS threads.
+
+Cada tabela vira uma view com os mesmos nomes e tipos do banco
+(DDL de carregar_postgres.py): inteiros como INTEGER/BIGINT, data_hora
+como TIMESTAMP, coordenadas e segundos como DECIMAL. As tabelas de
+agregados (agg_*, sql/04_agregados.sql) viram views calculadas na hora
+sobre evento_dano e round. A grade mapa_calor, quando gerada pelo
+ETL, também vira view. Assim o mesmo SQL do relatório roda nos
+dois motores e devolve os mesmos resultados.
+
+Uso:
+    python analise_local.py     # roda sql/03_consultas_avancadas.sql nos arquivos
+
+    Em consultas_e_graficos.py, BACKEND = 'duckdb' gera o relatório
+    completo (consultas e gráficos) a partir dos arquivos.
+
+Requisitos:
+    pip install duckdb
+"""
+
+import hashlib
+import os
+import re
+import threading
+from datetime import datetime
+
+import pandas as pd
+
+from armazenamento import caminho_tabela, formato_efetivo, pa
+from esquema import ESQUEMA_TABELAS
+
+try:
+    import duckdb
+except ImportError:  # duckdb é opcional: só este motor depende dele
+    duckdb = None
+
+# ============================================
+# CONFIGURAÇÕES
+# ============================================
+
+PASTA_TABELAS = '../base_dados/tabelas_normalizadas/'
+FORMATO = None  # None = armazenamento.FORMATO_TABELAS
+
+CAMINHO_SQL_CONSULTAS = '../sql/03_consultas_avancadas.sql'
+
+# Threads do DuckDB (por consulta)
+NUM_THREADS = os.cpu_count() or 4
+
+# Tipos lidos do CSV para cada tipo do esquema
+TIPOS_LEITURA_CSV = {
+    'Int8': 'BIGINT',
+    'Int16': 'BIGINT',
+    'Int32': 'BIGINT',
+    'Int64': 'BIGINT',
+    'float32': 'DOUBLE',
+    'float64': 'DOUBLE',
+    'boolean': 'BOOLEAN',
+    'string': 'VARCHAR',
+    'category': 'VARCHAR',
+}
+
+# Tipos das colunas no PostgreSQL (DDL_CRIAR_TABELAS de carregar_postgres.py);
+# colunas fora desta lista seguem TIPOS_POSTGRES_PADRAO
+TIPOS_POSTGRES = {
+    ('jogador', 'steam_id'): 'BIGINT',
+    ('partida', 'rank_medio'): 'DECIMAL(4,1)',
+    ('evento_dano', 'segundos'): 'DECIMAL(10,4)',
+    ('evento_dano', 'atacante_x'): 'DECIMAL(15,3)',
+    ('evento_dano', 'atacante_y'): 'DECIMAL(15,3)',
+    ('evento_dano', 'vitima_x'): 'DECIMAL(15,3)',
+    ('evento_dano', 'vitima_y'): 'DECIMAL(15,3)',
+}
+
+# Tabelas que podem não existir na pasta (mapa_calor só é gerada com
+# GERAR_MAPAS_CALOR no ETL)
+TABELAS_OPCIONAIS = {'mapa_calor'}
+
+TIPOS_POSTGRES_PADRAO = {
+    'Int8': 'INTEGER',
+    'Int16': 'INTEGER',
+    'Int32': 'INTEGER',
+    'Int64': 'BIGINT',
+    'float32': 'DOUBLE',
+    'float64': 'DOUBLE',
+    'boolean': 'BOOLEAN',
+    'string': 'VARCHAR',
+    'category': 'VARCHAR',
+}
+
+# data_hora vem do CSV original como texto ("09/28/2017 8:44:22 PM");
+# o carregador converte com pd.to_datetime(format='mixed')
+CONVERSAO_DATA_HORA = (
+    "COALESCE(try_strptime(data_hora, '%m/%d/%Y %I:%M:%S %p'), "
+    "TRY_CAST(data_hora AS TIMESTAMP))"
+)
+
+# Tabelas de agregados de sql/04_agregados.sql, calculadas por completo
+# (mesmas colunas, tipos e filtros da atualização incremental)
+VIEWS_AGREGADOS = {
+    'agg_arma': """
+        SELECT arma_id,
+               COUNT(*) AS usos,
+               COUNT(*) FILTER (WHERE hitbox = 'Head') AS headshots,
+               COALESCE(SUM(dano_hp), 0)::BIGINT AS dano_total
+        FROM evento_dano
+        WHERE arma_id IS NOT NULL
+        GROUP BY arma_id
+    """,
+    'agg_hitbox': """
+        SELECT hitbox,
+               COUNT(*) AS hits,
+               COUNT(dano_hp) AS hits_com_dano,
+               COALESCE(SUM(dano_hp), 0)::BIGINT AS dano_total
+        FROM evento_dano
+        WHERE hitbox IS NOT NULL AND hitbox != ''
+        GROUP BY hitbox
+    """,
+    'agg_mapa_lado': """
+        SELECT p.mapa_id, r.vencedor_lado, COUNT(*) AS rounds
+        FROM round r
+        INNER JOIN partida p ON r.partida_id = p.partida_id
+        GROUP BY p.mapa_id, r.vencedor_lado
+    """,
+}
+
+
+# ============================================
+# CONEXÃO
+# ============================================
+
+def _literal(texto):
+    """Texto como literal SQL (caminhos de arquivo)."""
+    return "'" + str(texto).replace("'", "''") + "'"
+
+
+def _colunas_postgres(nome, presentes):
+    """SELECT que converte as colunas lidas para os tipos do banco.
+
+    Colunas do esquema ausentes do arquivo (gravado antes de a coluna
+    existir) viram NULL.
+    """
+    colunas = []
+    for coluna, tipo in ESQUEMA_TABELAS[nome].items():
+        destino = TIPOS_POSTGRES.get((nome, coluna), TIPOS_POSTGRES_PADRAO[tipo])
+        if coluna not in presentes:
+            expressao = f"CAST(NULL AS {'TIMESTAMP' if coluna == 'data_hora' else destino})"
+        elif coluna == 'data_hora':
+            expressao = CONVERSAO_DATA_HORA
+        else:
+            expressao = f"CAST({coluna} AS {destino})"
+        colunas.append(f"{expressao} AS {coluna}")
+    return ',\n       '.join(colunas)
+
+
+def _origem(con, nome, pasta, formato):
+    """Expressão FROM que lê o arquivo da tabela e as colunas presentes nele."""
+    caminho = os.path.abspath(caminho_tabela(nome, pasta, formato))
+    if formato == 'csv':
+        # Tipos só para as colunas do cabeçalho, na ordem do arquivo
+        cabecalho = pd.read_csv(caminho, nrows=0).columns.tolist()
+        tipos = ', '.join(
+            f"{_literal(coluna)}: {_literal(TIPOS_LEITURA_CSV.get(ESQUEMA_TABELAS[nome].get(coluna), 'VARCHAR'))}"
+            for coluna in cabecalho)
+        return f"read_csv({_literal(caminho)}, header = true, columns = {{{tipos}}})", cabecalho
+    if formato == 'parquet':
+        origem = f"read_parquet({_literal(caminho)})"
+        return origem, [c[0] for c in con.execute(f"SELECT * FROM {origem} LIMIT 0").description]
+    # Arrow IPC (stream): o DuckDB não lê o formato direto, então a
+    # tabela é mapeada em memória pelo pyarrow e copiada para uma tabela
+    # do DuckDB (um objeto registrado não seria visto pelos cursores)
+    with pa.memory_map(caminho) as origem:
+        tabela = pa.ipc.open_stream(origem).read_all()
+    con.register('_tabela_arrow', tabela)
+    con.execute(f"CREATE TABLE {nome}_arrow AS SELECT * FROM _tabela_arrow")
+    con.unregister('_tabela_arrow')
+    return f"{nome}_arrow", tabela.column_names
+
+
+def _tabelas_presentes(pasta, formato):
+    """Tabelas do esquema com arquivo na pasta (as opcionais podem faltar)."""
+    return [nome for nome in ESQUEMA_TABELAS
+            if nome not in TABELAS_OPCIONAIS or os.path.exists(caminho_tabela(nome, pasta, formato))]
+
+
+def conectar(pasta=None, formato=None, num_threads=None):
+    """Abre um DuckDB em memória com uma view por tabela normalizada e por agregado."""
+    if duckdb is None:
+        raise ImportError("duckdb não instalado: pip install duckdb")
+    pasta = pasta or PASTA_TABELAS
+    formato = formato_efetivo(formato or FORMATO)
+
+    con = duckdb.connect(':memory:')
+    con.execute(f"SET threads = {num_threads or NUM_THREADS}")
+    for nome in _tabelas_presentes(pasta, formato):
+        origem, presentes = _origem(con, nome, pasta, formato)
+        con.execute(f"CREATE VIEW {nome} AS\n"
+                    f"SELECT {_colunas_postgres(nome, presentes)}\n"
+                    f"FROM {origem}")
+    for nome, sql in VIEWS_AGREGADOS.items():
+        con.execute(f"CREATE VIEW {nome} AS {sql}")
+    return con
+
+
+class PoolDuckDB:
+    """Pool com a interface de psycopg2.pool.ThreadedConnectionPool.
+
+    Todas as "conexões" são cursores de uma única conexão DuckDB: cada
+    cursor pode ser usado por uma thread, e as views são compartilhadas.
+    """
+
+    def __init__(self, pasta=None, formato=None, num_threads=None):
+        self._con = conectar(pasta, formato, num_threads)
+        self._trava = threading.Lock()
+
+    def getconn(self):
+        with self._trava:
+            return self._con.cursor()
+
+    def putconn(self, conn):
+        conn.close()
+
+    def closeall(self):
+        self._con.close()
+
+
+def versao_arquivos(pasta=None, formato=None):
+    """Identifica o estado dos arquivos (nome, tamanho e modificação de cada tabela)."""
+    pasta = pasta or PASTA_TABELAS
+    formato = formato_efetivo(formato or FORMATO)
+    partes = []
+    for nome in _tabelas_presentes(pasta, formato):
+        info = os.stat(caminho_tabela(nome, pasta, formato))
+        partes.append(f"{nome}:{info.st_size}:{info.st_mtime_ns}")
+    digest = hashlib.sha256('|'.join(partes).encode()).hexdigest()[:16]
+    return f"arquivos:{formato}:{digest}"
+
+
+# ============================================
+# CONSULTAS DO ARQUIVO SQL
+# ============================================
+
+def consultas_do_arquivo(caminho):
+    """Lista (título, SQL) das consultas de um arquivo .sql.
+
+    O título é o comentário numerado ("-- 4. WINDOW FUNCTIONS") que
+    antecede a consulta.
+    """
+    with open(caminho, encoding='utf-8') as arquivo:
+        texto = arquivo.read()
+
+    consultas = []
+    for sql in duckdb.extract_statements(texto):
+        trecho = sql.query.strip()
+        if not trecho:
+            continue
+        comentarios = [linha.strip('- ').strip() for linha in trecho.splitlines()
+                       if linha.lstrip().startswith('--')]
+        titulos = [c for c in comentarios if re.match(r'\d+\.', c)]
+        consultas.append((titulos[0] if titulos else f"Consulta {len(consultas) + 1}", trecho))
+    return consultas
+
+
+def main():
+    print("=" * 60)
+    print("🦆 CONSULTAS AVANÇADAS - MOTOR LOCAL (DuckDB)")
+    print("=" * 60)
+
+    # Mudar para diretório do script
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
+    formato = formato_efetivo(FORMATO)
+    con = conectar(PASTA_TABELAS, formato)
+    print(f"✅ Tabelas de {os.path.abspath(PASTA_TABELAS)} ({formato}, {NUM_THREADS} threads)")
+
+    pd.set_option('display.width', 200)
+    pd.set_option('display.max_columns', 20)
+
+    tempos = []
+    for titulo, sql in consultas_do_arquivo(CAMINHO_SQL_CONSULTAS):
+        inicio = datetime.now()
+        try:
+            df = con.execute(sql).df()
+        except duckdb.Error as erro:
+            print(f"\n❌ {titulo}: {erro}")
+            continue
+        tempo = (datetime.now() - inicio).total_seconds()
+        tempos.append((titulo, tempo))
+        print(f"\n{'='*50}\n📊 {titulo} ({tempo:.2f}s)\n{'='*50}\n{df.head(20).to_string()}")
+    con.close()
+
+    print("\n" + "=" * 60)
+    print("⏱️ Tempo por consulta:")
+    for titulo, tempo in tempos:
+        print(f"   • {titulo[:45]:<45} {tempo:>8.2f}s")
+
+
+if __name__ == "__main__":
+    main()
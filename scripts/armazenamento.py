@@ -0,0 +1,241 @@
+"""
+============================================
+PROJETO BIG DATA - CS:GO MATCHMAKING
+Camada de Armazenamento das Tabelas
+============================================
+
+Grava e lê as tabelas normalizadas em um dos formatos suportados:
+
+- csv:     texto, compatível com qualquer ferramenta (padrão)
+- parquet: colunar e comprimido, com tipos preservados
+- arrow:   Arrow IPC (stream), leitura praticamente sem parse
+
+Parquet e Arrow exigem o pacote pyarrow. Sem ele, a camada volta
+para CSV e avisa no console.
+
+Requisitos (formatos colunares):
+    pip install pyarrow
+"""
+
+import os
+
+import pandas as pd
+
+from esquema import TIPOS_INTEIROS, aplicar_esquema, tipos_da_tabela
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow é opcional
+    pa = None
+    pq = None
+
+# ============================================
+# CONFIGURAÇÕES
+# ============================================
+
+# Formato usado por todos os scripts: 'csv', 'parquet' ou 'arrow'
+FORMATO_TABELAS = 'csv'
+
+EXTENSOES = {
+    'csv': '.csv',
+    'parquet': '.parquet',
+    'arrow': '.arrows',
+}
+
+# Tipos do pandas -> tipos Arrow gravados em disco
+TIPOS_ARROW = {
+    'Int8': 'int8',
+    'Int16': 'int16',
+    'Int32': 'int32',
+    'Int64': 'int64',
+    'float32': 'float32',
+    'float64': 'float64',
+    'boolean': 'bool_',
+    'string': 'string',
+}
+
+_avisou_fallback = False
+
+
+# ============================================
+# FUNÇÕES AUXILIARES
+# ============================================
+
+def formato_efetivo(formato: str = None) -> str:
+    """Resolve o formato pedido, voltando para CSV se pyarrow faltar."""
+    global _avisou_fallback
+    formato = formato or FORMATO_TABELAS
+    if formato not in EXTENSOES:
+        raise ValueError(f"Formato desconhecido: {formato} (use {', '.join(EXTENSOES)})")
+    if formato != 'csv' and pa is None:
+        if not _avisou_fallback:
+            print(f"⚠️ pyarrow não instalado: usando CSV em vez de {formato}")
+            _avisou_fallback = True
+        return 'csv'
+    return formato
+
+
+def caminho_tabela(nome: str, pasta: str, formato: str = None) -> str:
+    """Caminho do arquivo da tabela no formato informado."""
+    return os.path.join(pasta, f"{nome}{EXTENSOES[formato_efetivo(formato)]}")
+
+
+def esquema_arrow(nome: str, df: pd.DataFrame):
+    """Monta o esquema Arrow da tabela a partir do esquema de tipos."""
+    tipos = tipos_da_tabela(nome)
+    campos = []
+    for coluna in df.columns:
+        tipo = tipos.get(coluna)
+        if tipo == 'category':
+            tipo_arrow = pa.dictionary(pa.int32(), pa.string())
+        elif tipo in TIPOS_ARROW:
+            tipo_arrow = getattr(pa, TIPOS_ARROW[tipo])()
+        else:
+            tipo_arrow = pa.Schema.from_pandas(df[[coluna]], preserve_index=False).field(coluna).type
+        campos.append(pa.field(coluna, tipo_arrow))
+    return pa.schema(campos)
+
+
+# ============================================
+# ESCRITA
+# ============================================
+
+class EscritorTabela:
+    """Grava uma tabela em blocos, mantendo tipos e cabeçalho consistentes.
+
+    Com anexar=True as linhas vão para o final da tabela existente. Em
+    CSV isso é um simples append; Parquet e Arrow não permitem append,
+    então o arquivo antigo é copiado em streaming para o novo antes dos
+    blocos novos.
+
+    Uso:
+        with EscritorTabela('evento_dano', pasta) as escritor:
+            for bloco in blocos:
+                escritor.escrever(bloco)
+    """
+
+    def __init__(self, nome: str, pasta: str, formato: str = None, anexar: bool = False):
+        self.nome = nome
+        self.formato = formato_efetivo(formato)
+        self.caminho = caminho_tabela(nome, pasta, self.formato)
+        self.anexar = anexar
+        self.linhas = 0
+        self._esquema = None
+        self._arquivo = None
+        self._escritor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+        return False
+
+    def escrever(self, df: pd.DataFrame) -> None:
+        """Grava um bloco de linhas no final da tabela."""
+        df = aplicar_esquema(df, self.nome)
+        if self.formato == 'csv':
+            primeiro = self.linhas == 0 and not (self.anexar and os.path.exists(self.caminho))
+            df.to_csv(self.caminho, mode='w' if primeiro else 'a', header=primeiro, index=False)
+        else:
+            if self._esquema is None:
+                self._abrir(df)
+            tabela = pa.Table.from_pandas(df, schema=self._esquema, preserve_index=False)
+            self._escritor.write_table(tabela)
+        self.linhas += len(df)
+
+    def _abrir(self, df: pd.DataFrame) -> None:
+        anterior = None
+        if self.anexar and os.path.exists(self.caminho):
+            anterior = f"{self.caminho}.anterior"
+            os.replace(self.caminho, anterior)
+
+        self._esquema = esquema_arrow(self.nome, df)
+        if self.formato == 'parquet':
+            self._escritor = pq.ParquetWriter(self.caminho, self._esquema, compression='zstd')
+        else:
+            self._arquivo = pa.OSFile(self.caminho, 'wb')
+            self._escritor = pa.ipc.new_stream(self._arquivo, self._esquema)
+
+        if anterior is not None:
+            for lote in _lotes_arrow(anterior, self.formato):
+                self._escritor.write_table(pa.Table.from_batches([lote]).cast(self._esquema))
+            os.remove(anterior)
+
+    def fechar(self) -> None:
+        """Finaliza o arquivo (necessário para Parquet e Arrow)."""
+        if self._escritor is not None:
+            self._escritor.close()
+            self._escritor = None
+        if self._arquivo is not None:
+            self._arquivo.close()
+            self._arquivo = None
+
+
+def _lotes_arrow(caminho: str, formato: str):
+    """Itera sobre os RecordBatches de um arquivo Parquet ou Arrow."""
+    if formato == 'parquet':
+        yield from pq.ParquetFile(caminho).iter_batches()
+    else:
+        with pa.memory_map(caminho) as origem:
+            yield from pa.ipc.open_stream(origem)
+
+
+def salvar_tabela(df: pd.DataFrame, nome: str, pasta: str, formato: str = None) -> str:
+    """Grava a tabela inteira e retorna o caminho do arquivo."""
+    with EscritorTabela(nome, pasta, formato) as escritor:
+        escritor.escrever(df)
+    return escritor.caminho
+
+
+# ============================================
+# LEITURA
+# ============================================
+
+def ler_tabela(nome: str, pasta: str, formato: str = None, colunas: list = None) -> pd.DataFrame:
+    """Lê a tabela no formato informado, já com os tipos do esquema."""
+    formato = formato_efetivo(formato)
+    caminho = caminho_tabela(nome, pasta, formato)
+
+    if formato == 'csv':
+        tipos = tipos_da_tabela(nome, colunas)
+        tipos_leitura = {col: tipo for col, tipo in tipos.items() if tipo not in TIPOS_INTEIROS}
+        df = pd.read_csv(caminho, usecols=colunas, dtype=tipos_leitura)
+    elif formato == 'parquet':
+        df = pq.read_table(caminho, columns=colunas).to_pandas()
+    else:
+        with pa.memory_map(caminho) as origem:
+            tabela = pa.ipc.open_stream(origem).read_all()
+            if colunas is not None:
+                tabela = tabela.select(colunas)
+            df = tabela.to_pandas()
+
+    return aplicar_esquema(df, nome)
+
+
+def ler_tabela_em_lotes(nome: str, pasta: str, formato: str = None, colunas: list = None,
+                        tamanho_lote: int = 100_000):
+    """Itera sobre a tabela em blocos de até tamanho_lote linhas.
+
+    Permite percorrer tabelas grandes (evento_dano) com memória limitada.
+    """
+    formato = formato_efetivo(formato)
+    caminho = caminho_tabela(nome, pasta, formato)
+
+    if formato == 'csv':
+        tipos = tipos_da_tabela(nome, colunas)
+        tipos_leitura = {col: tipo for col, tipo in tipos.items() if tipo not in TIPOS_INTEIROS}
+        for lote in pd.read_csv(caminho, usecols=colunas, dtype=tipos_leitura, chunksize=tamanho_lote):
+            yield aplicar_esquema(lote, nome)
+    elif formato == 'parquet':
+        arquivo = pq.ParquetFile(caminho)
+        for lote in arquivo.iter_batches(batch_size=tamanho_lote, columns=colunas):
+            yield aplicar_esquema(lote.to_pandas(), nome)
+    else:
+        with pa.memory_map(caminho) as origem:
+            for lote in pa.ipc.open_stream(origem):
+                if colunas is not None:
+                    lote = lote.select(colunas)
+                for inicio in range(0, lote.num_rows, tamanho_lote):
+                    yield aplicar_esquema(lote.slice(inicio, tamanho_lote).to_pandas(), nome)
@@ -0,0 +1,415 @@
+"""
+============================================
+PROJETO BIG DATA - CS:GO MATCHMAKING
+Benchmark - ETL, Dados Sintéticos, Carga e Consultas
+============================================
+
+Mede o pipeline inteiro em várias escalas (ESCALAS, em eventos de
+dano; ESCALAS_GRANDES com MEDIR_ESCALAS_GRANDES) e grava os resultados
+em JSON, para comparar versões do código:
+
+- etl:         cada extrair_* de etl_processar_dados.py
+- sinteticos:  gerar_partidas_e_rounds e gerar_eventos_sinteticos
+- carga:       carregar_copy (e carregar_csv, com 'insert' em
+               METODOS_CARGA) por tabela, mais restrições e agregados
+               (exige PostgreSQL)
+- consultas:   cada consulta de CONSULTAS (consultas_e_graficos.py),
+               no PostgreSQL e no motor local DuckDB
+
+Para cada etapa são gravados o menor tempo de REPETICOES execuções, o
+pico de memória (em uma execução à parte) e as linhas por segundo. O
+pico é o maior RSS durante a etapa, do próprio processo (VmHWM, zerado
+antes da etapa) ou de um processo filho encerrado nela (getrusage
+RUSAGE_CHILDREN). Assim entram a memória fora do Python (DuckDB, numpy,
+buffers do COPY) e a dos processos da geração paralela; a do servidor
+PostgreSQL não. O valor inclui o que o processo já ocupava antes da
+etapa. Só no Linux (/proc/self/clear_refs); nos outros sistemas o pico
+fica None.
+
+Os dados de cada escala são gerados como em benchmark_chaves.py e
+gravados em PASTA_TRABALHO. A carga usa o banco DB_CONFIG_BENCHMARK
+(as tabelas dele são recriadas), nunca o banco do projeto:
+    CREATE DATABASE csgo_benchmark;
+
+Com COMPARAR_COM apontando para um JSON anterior, o script mostra a
+variação de cada etapa e marca as que ficaram mais lentas que
+TOLERANCIA_REGRESSAO.
+
+Uso:
+    python benchmark.py
+"""
+
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import subprocess
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import psycopg2
+from psycopg2.pool import ThreadedConnectionPool
+
+import analise_local
+import carregar_postgres as carga
+import consultas_e_graficos as relatorio
+import etl_processar_dados as etl
+import gerar_dados_sinteticos as sinteticos
+from armazenamento import caminho_tabela, formato_efetivo, ler_tabela, salvar_tabela
+from benchmark_chaves import gerar_dados
+from esquema import TIPOS_ORIGINAL, aplicar_esquema
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# ============================================
+# CONFIGURAÇÕES
+# ============================================
+
+# Escalas medidas (número de eventos de dano). As grandes levam de
+# minutos a horas e só entram com MEDIR_ESCALAS_GRANDES
+ESCALAS = [10_000, 100_000]
+ESCALAS_GRANDES = [1_000_000, 10_000_000]
+MEDIR_ESCALAS_GRANDES = False
+
+# Repetições de cada medição (vale o menor tempo)
+REPETICOES = 1
+
+# Medir o pico de memória (uma execução extra por etapa, RSS)
+MEDIR_MEMORIA = True
+
+# Grupos medidos
+MEDIR_ETL = True
+MEDIR_SINTETICOS = True
+MEDIR_CARGA = True
+MEDIR_CONSULTAS = True
+
+# Métodos de carga medidos ('insert', carregar_csv, é lento em escala grande)
+METODOS_CARGA = ['copy']
+
+# Motores das consultas ('postgres' exige MEDIR_CARGA; 'duckdb' lê os arquivos)
+BACKENDS_CONSULTAS = ['postgres', 'duckdb']
+
+# Banco exclusivo do benchmark (as tabelas são recriadas a cada escala)
+DB_CONFIG_BENCHMARK = {**carga.DB_CONFIG, 'database': 'csgo_benchmark'}
+
+PASTA_TRABALHO = '../base_dados/benchmark/'
+PASTA_SAIDA = '../relatorio/benchmarks/'
+
+# JSON de uma execução anterior para comparação (None = sem comparação)
+COMPARAR_COM = None
+TOLERANCIA_REGRESSAO = 0.20  # 20% mais lento
+TEMPO_MINIMO_REGRESSAO = 0.05  # diferenças menores que isso (s) são ruído
+
+SEMENTE = 42
+
+
+# ============================================
+# MEDIÇÃO
+# ============================================
+
+def escalas():
+    """Escalas desta execução: ESCALAS e, se ativadas, ESCALAS_GRANDES."""
+    return ESCALAS + (ESCALAS_GRANDES if MEDIR_ESCALAS_GRANDES else [])
+
+
+def _zerar_pico_rss():
+    """Zera o pico de RSS (VmHWM) do processo. Retorna False fora do Linux."""
+    if resource is None:
+        return False
+    try:
+        with open('/proc/self/clear_refs', 'w') as arquivo:
+            arquivo.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def _rss_mb(campo):
+    """Campo de memória de /proc/self/status (ex.: VmHWM, o pico de RSS), em MB."""
+    with open('/proc/self/status') as arquivo:
+        for linha in arquivo:
+            if linha.startswith(f"{campo}:"):
+                return int(linha.split()[1]) / 1024
+    return 0.0
+
+
+def _pico_filhos_mb():
+    """Maior RSS entre os processos filhos já encerrados, em MB (Linux: ru_maxrss em KB)."""
+    return resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+
+
+def medir(funcao, preparar=None):
+    """Executa funcao REPETICOES vezes (preparar antes de cada uma, fora do tempo).
+
+    Retorna (resultado, menor tempo em s, pico de memória em MB ou None).
+    """
+    tempos = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(REPETICOES):
+            if preparar is not None:
+                preparar()
+            inicio = time.perf_counter()
+            resultado = funcao()
+            tempos.append(time.perf_counter() - inicio)
+        pico = None
+        if MEDIR_MEMORIA:
+            if preparar is not None:
+                preparar()
+            if _zerar_pico_rss():
+                filhos = _pico_filhos_mb()
+                funcao()
+                # ru_maxrss dos filhos só muda se algum superou os anteriores
+                pico_filhos = _pico_filhos_mb()
+                pico = max(_rss_mb('VmHWM'), pico_filhos if pico_filhos > filhos else 0)
+    return resultado, min(tempos), pico
+
+
+class Medicoes:
+    """Acumula as medições e as mostra conforme são feitas."""
+
+    def __init__(self):
+        self.linhas = []
+
+    def registrar(self, escala, grupo, etapa, segundos, pico_mb, linhas):
+        self.linhas.append({
+            'escala': escala,
+            'grupo': grupo,
+            'etapa': etapa,
+            'segundos': round(segundos, 6),
+            'pico_mb': None if pico_mb is None else round(pico_mb, 2),
+            'linhas': int(linhas),
+            'linhas_por_s': round(linhas / segundos, 1) if segundos > 0 else None,
+        })
+        memoria = f"{pico_mb:>9.1f}MB" if pico_mb is not None else f"{'-':>11}"
+        print(f"   {grupo:<10} {etapa:<28} {segundos:>9.3f}s {memoria} {linhas / max(segundos, 1e-9):>14,.0f} linhas/s")
+
+    def medir(self, escala, grupo, etapa, funcao, linhas, preparar=None):
+        """Mede funcao e registra; `linhas` pode ser função do resultado."""
+        resultado, segundos, pico = medir(funcao, preparar)
+        self.registrar(escala, grupo, etapa, segundos, pico, linhas(resultado) if callable(linhas) else linhas)
+        return resultado
+
+
+# ============================================
+# ETAPAS
+# ============================================
+
+def medir_etl(medicoes, escala, df, pasta):
+    """Mede cada extrair_* na ordem de ETAPAS e grava as tabelas em pasta."""
+    tabelas = {}
+    for nome, (funcao, deps) in etl.ETAPAS.items():
+        argumentos = [tabelas[d] for d in deps]
+        tabela = medicoes.medir(escala, 'etl', funcao.__name__, lambda: funcao(df, *argumentos), len(df))
+        tabelas[nome] = aplicar_esquema(tabela, nome)
+        salvar_tabela(tabelas[nome], nome, pasta)
+    return tabelas
+
+
+def _copiar_tabelas(nomes, origem, destino):
+    for nome in nomes:
+        shutil.copyfile(caminho_tabela(nome, origem), caminho_tabela(nome, destino))
+
+
+def medir_sinteticos(medicoes, escala, tabelas, pasta):
+    """Mede os geradores sobre uma cópia das tabelas (eles gravam em disco)."""
+    pasta_sinteticos = os.path.join(pasta, 'sinteticos')
+    os.makedirs(pasta_sinteticos, exist_ok=True)
+    sinteticos.CAMINHO_TABELAS = pasta_sinteticos
+
+    # Partidas na mesma proporção da escala (~700 eventos por partida)
+    novas_partidas = max(1, escala // 700)
+    sinteticos.META_LINHAS = len(tabelas['partida']) + novas_partidas
+    raiz = np.random.SeedSequence(SEMENTE)
+    partidas, rounds = medicoes.medir(
+        escala, 'sinteticos', 'gerar_partidas_e_rounds',
+        lambda: sinteticos.gerar_partidas_e_rounds(tabelas['mapa'], raiz),
+        lambda r: len(r[0]) - len(tabelas['partida']) + len(r[1]) - len(tabelas['round']),
+        preparar=lambda: _copiar_tabelas(['partida', 'round'], pasta, pasta_sinteticos))
+
+    medicoes.medir(
+        escala, 'sinteticos', 'gerar_eventos_sinteticos',
+        lambda: sinteticos.gerar_eventos_sinteticos(escala, rounds, partidas, tabelas['jogador'],
+                                                    np.random.default_rng(SEMENTE)),
+        escala,
+        preparar=lambda: _copiar_tabelas(['evento_dano'], pasta, pasta_sinteticos))
+    shutil.rmtree(pasta_sinteticos, ignore_errors=True)
+
+
+def _truncar(conn, nome_tabela):
+    cursor = conn.cursor()
+    cursor.execute(f"TRUNCATE {nome_tabela}")
+    conn.commit()
+    cursor.close()
+
+
+def medir_carga(medicoes, escala, tabelas, pasta):
+    """Mede a carga de cada tabela por método; deixa o banco pronto para as consultas.
+
+    Retorna False se o PostgreSQL não estiver disponível.
+    """
+    carga.DB_CONFIG = DB_CONFIG_BENCHMARK
+    carga.CAMINHO_TABELAS = pasta
+    try:
+        conn = psycopg2.connect(**DB_CONFIG_BENCHMARK)
+    except psycopg2.OperationalError as e:
+        print(f"   ⚠️ PostgreSQL indisponível ({str(e).strip().splitlines()[0]}): carga e consultas no banco ignoradas")
+        return False
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        carga.criar_tabelas(conn, com_restricoes=False)
+    for metodo in METODOS_CARGA:
+        funcao = carga.carregar_csv if metodo == 'insert' else carga.carregar_copy
+        for nome_tabela, colunas in carga.TABELAS.items():
+            medicoes.medir(escala, 'carga', f"{metodo}:{nome_tabela}",
+                           lambda: funcao(conn, nome_tabela, colunas), len(tabelas[nome_tabela]),
+                           preparar=lambda: _truncar(conn, nome_tabela))
+
+    # Uma execução: depende do estado deixado pela carga
+    eventos = len(tabelas['evento_dano'])
+    with contextlib.redirect_stdout(io.StringIO()):
+        inicio = time.perf_counter()
+        carga.construir_restricoes()
+        restricoes = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        carga.atualizar_agregados(conn)
+        agregados = time.perf_counter() - inicio
+    medicoes.registrar(escala, 'carga', 'construir_restricoes', restricoes, None, eventos)
+    medicoes.registrar(escala, 'carga', 'atualizar_agregados', agregados, None, eventos)
+    conn.close()
+    return True
+
+
+def medir_consultas(medicoes, escala, backend, eventos, pasta):
+    """Mede cada consulta do relatório, sem cache, no motor informado."""
+    if backend == 'duckdb':
+        if analise_local.duckdb is None:
+            print("   ⚠️ duckdb não instalado: consultas locais ignoradas")
+            return
+        pool = analise_local.PoolDuckDB(pasta)
+    else:
+        pool = ThreadedConnectionPool(1, 1, **DB_CONFIG_BENCHMARK)
+
+    conn = pool.getconn()
+    try:
+        for nome, (descricao, sql, _) in relatorio.CONSULTAS.items():
+            medicoes.medir(escala, 'consultas', f"{backend}:{nome}",
+                           lambda: relatorio.executar_consulta(conn, sql, descricao), eventos)
+    finally:
+        pool.putconn(conn)
+        pool.closeall()
+
+
+# ============================================
+# RESULTADOS
+# ============================================
+
+def _versao_codigo():
+    """Commit atual do repositório (None fora de um repositório git)."""
+    try:
+        saida = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True)
+        return saida.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def salvar_resultados(medicoes, inicio):
+    """Grava o JSON da execução em PASTA_SAIDA e retorna o caminho."""
+    os.makedirs(PASTA_SAIDA, exist_ok=True)
+    versao = _versao_codigo()
+    resultado = {
+        'data': inicio.isoformat(timespec='seconds'),
+        'versao': versao,
+        'ambiente': {
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'numpy': np.__version__,
+            'sistema': platform.platform(),
+            'cpus': os.cpu_count(),
+            'formato_tabelas': formato_efetivo(),
+        },
+        'configuracao': {
+            'escalas': escalas(),
+            'repeticoes': REPETICOES,
+            'semente': SEMENTE,
+        },
+        'medicoes': medicoes.linhas,
+    }
+    caminho = os.path.join(PASTA_SAIDA, f"benchmark_{inicio:%Y%m%d_%H%M%S}_{versao or 'sem_versao'}.json")
+    with open(caminho, 'w', encoding='utf-8') as arquivo:
+        json.dump(resultado, arquivo, indent=2, ensure_ascii=False)
+    return caminho
+
+
+def comparar(medicoes, caminho_anterior):
+    """Mostra a variação de tempo em relação a um JSON anterior."""
+    with open(caminho_anterior, encoding='utf-8') as arquivo:
+        anterior = json.load(arquivo)
+    base = {(m['escala'], m['grupo'], m['etapa']): m['segundos'] for m in anterior['medicoes']}
+
+    print("\n" + "=" * 50)
+    print(f"📊 COMPARAÇÃO COM {anterior.get('versao')} ({anterior.get('data')})")
+    print("=" * 50)
+    regressoes = 0
+    for m in medicoes.linhas:
+        antes = base.get((m['escala'], m['grupo'], m['etapa']))
+        if not antes:
+            continue
+        variacao = m['segundos'] / antes - 1
+        regressao = variacao > TOLERANCIA_REGRESSAO and m['segundos'] - antes > TEMPO_MINIMO_REGRESSAO
+        regressoes += regressao
+        print(f"   {m['escala']:>11,} {m['grupo']:<10} {m['etapa']:<28} "
+              f"{antes:>9.3f}s → {m['segundos']:>9.3f}s {variacao:>+8.1%} {'❌' if regressao else '✅'}")
+    print(f"\n{'⚠️' if regressoes else '✅'} {regressoes} etapa(s) mais lentas que {TOLERANCIA_REGRESSAO:.0%}")
+
+
+def main():
+    print("=" * 50)
+    print("⏱️ BENCHMARK - ETL, SINTÉTICOS, CARGA E CONSULTAS")
+    print("=" * 50)
+
+    # Mudar para diretório do script
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    inicio = datetime.now()
+    medicoes = Medicoes()
+
+    for escala in escalas():
+        print(f"\n📏 Escala: {escala:,} eventos")
+        pasta = os.path.join(PASTA_TRABALHO, str(escala))
+        os.makedirs(pasta, exist_ok=True)
+
+        # Mesmos tipos que carregar_dados aplica na leitura do CSV original
+        df = gerar_dados(escala).astype(TIPOS_ORIGINAL)
+        if MEDIR_ETL:
+            tabelas = medir_etl(medicoes, escala, df, pasta)
+        else:
+            with contextlib.redirect_stdout(io.StringIO()):
+                tabelas = {nome: ler_tabela(nome, pasta) for nome in etl.ETAPAS}
+        del df
+
+        if MEDIR_SINTETICOS:
+            medir_sinteticos(medicoes, escala, tabelas, pasta)
+
+        banco_carregado = MEDIR_CARGA and medir_carga(medicoes, escala, tabelas, pasta)
+
+        if MEDIR_CONSULTAS:
+            for backend in BACKENDS_CONSULTAS:
+                if backend == 'postgres' and not banco_carregado:
+                    continue
+                medir_consultas(medicoes, escala, backend, len(tabelas['evento_dano']), pasta)
+
+    caminho = salvar_resultados(medicoes, inicio)
+    print(f"\n📁 Resultados salvos em: {os.path.abspath(caminho)}")
+
+    if COMPARAR_COM:
+        comparar(medicoes, COMPARAR_COM)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+"""
+============================================
+PROJETO BIG DATA - CS:GO MATCHMAKING
+Benchmark - Atribuição de Chaves Substitutas
+============================================
+
+Compara a atribuição de IDs antiga (dicionários + Series.map e chave
+de round em texto) com a atribuição vetorizada de chaves.py, medindo
+tempo e pico de memória de cada etapa e conferindo se os IDs gerados
+são idênticos.
+
+Uso:
+    python benchmark_chaves.py
+
+Por padrão usa um DataFrame sintético com NUM_LINHAS linhas no formato
+do CSV original; defina CAMINHO_CSV para medir sobre a base real.
+"""
+
+import contextlib
+import io
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from esquema import aplicar_esquema
+import etl_processar_dados as etl
+
+# ============================================
+# CONFIGURAÇÕES
+# ============================================
+
+# CSV original (None = dados sintéticos com NUM_LINHAS linhas)
+CAMINHO_CSV = None
+NUM_LINHAS = 1_000_000
+
+# Repetições de cada medição (vale o menor tempo)
+REPETICOES = 3
+
+SEMENTE = 42
+
+
+# ============================================
+# IMPLEMENTAÇÃO ANTERIOR (REFERÊNCIA)
+# ============================================
+
+def legado_jogadores(df):
+    atacantes = df[['att_id', 'att_rank']].rename(columns={'att_id': 'steam_id', 'att_rank': 'rank_atual'})
+    vitimas = df[['vic_id', 'vic_rank']].rename(columns={'vic_id': 'steam_id', 'vic_rank': 'rank_atual'})
+    jogadores = pd.concat([atacantes, vitimas])
+    jogadores = jogadores.drop_duplicates(subset=['steam_id'], keep='last')
+    jogadores = jogadores.dropna(subset=['steam_id'])
+    jogadores = jogadores.reset_index(drop=True)
+    jogadores.insert(0, 'jogador_id', range(1, len(jogadores) + 1))
+    return jogadores
+
+
+def legado_mapas(df):
+    mapas = df[['map']].drop_duplicates().rename(columns={'map': 'nome'})
+    mapas = mapas.reset_index(drop=True)
+    mapas.insert(0, 'mapa_id', range(1, len(mapas) + 1))
+    return mapas
+
+
+def legado_partidas(df, mapas):
+    mapa_dict = dict(zip(mapas['nome'], mapas['mapa_id']))
+    partidas = df[['file', 'map', 'date', 'avg_match_rank']].drop_duplicates(subset=['file'])
+    partidas = partidas.rename(columns={'file': 'arquivo_demo', 'date': 'data_hora', 'avg_match_rank': 'rank_medio'})
+    partidas['mapa_id'] = partidas['map'].map(mapa_dict)
+    partidas = partidas.drop(columns=['map']).reset_index(drop=True)
+    partidas.insert(0, 'partida_id', range(1, len(partidas) + 1))
+    return partidas[['partida_id', 'arquivo_demo', 'mapa_id', 'data_hora', 'rank_medio']]
+
+
+def legado_rounds(df, partidas):
+    partida_dict = dict(zip(partidas['arquivo_demo'], partidas['partida_id']))
+    rounds = df[['file', 'round', 'round_type', 'winner_side', 'ct_eq_val', 't_eq_val']].drop_duplicates(
+        subset=['file', 'round'])
+    rounds = rounds.rename(columns={'round': 'numero', 'round_type': 'tipo', 'winner_side': 'vencedor_lado',
+                                    'ct_eq_val': 'ct_economia', 't_eq_val': 't_economia'})
+    rounds['partida_id'] = rounds['file'].map(partida_dict)
+    rounds = rounds.drop(columns=['file']).reset_index(drop=True)
+    rounds.insert(0, 'round_id', range(1, len(rounds) + 1))
+    return rounds[['round_id', 'partida_id', 'numero', 'tipo', 'vencedor_lado', 'ct_economia', 't_economia']]
+
+
+def legado_eventos(df, rounds, jogadores, armas, partidas):
+    jogador_dict = dict(zip(jogadores['steam_id'], jogadores['jogador_id']))
+    arma_dict = dict(zip(armas['nome'], armas['arma_id']))
+    rounds = rounds.copy()
+    rounds['chave'] = rounds['partida_id'].astype(str) + '_' + rounds['numero'].astype(str)
+    partida_dict = dict(zip(partidas['arquivo_demo'], partidas['partida_id']))
+    df = df.copy()
+    df['partida_id_temp'] = df['file'].map(partida_dict)
+    df['chave_round'] = df['partida_id_temp'].astype(str) + '_' + df['round'].astype(str)
+    round_dict = dict(zip(rounds['chave'], rounds['round_id']))
+    eventos = df.copy()
+    eventos['round_id'] = eventos['chave_round'].map(round_dict)
+    eventos['atacante_id'] = eventos['att_id'].map(jogador_dict)
+    eventos['vitima_id'] = eventos['vic_id'].map(jogador_dict)
+    eventos['arma_id'] = eventos['wp'].map(arma_dict)
+    eventos = eventos[list(etl.COLUNAS_EVENTO)].rename(columns=etl.COLUNAS_EVENTO)
+    eventos = eventos.reset_index(drop=True)
+    eventos.insert(0, 'evento_id', range(1, len(eventos) + 1))
+    return eventos
+
+
+# ============================================
+# DADOS E MEDIÇÃO
+# ============================================
+
+def gerar_dados(num_linhas: int) -> pd.DataFrame:
+    """DataFrame sintético com as colunas do CSV original."""
+    rng = np.random.default_rng(SEMENTE)
+    num_partidas = max(1, num_linhas // 700)
+    partida = np.sort(rng.integers(0, num_partidas, num_linhas))
+    jogadores = 76561197960265728 + rng.choice(10**9, size=max(10, num_partidas * 4), replace=False)
+    armas = [f"arma_{i}" for i in range(40)]
+    mapas = ['de_dust2', 'de_mirage', 'de_inferno', 'de_cache', 'de_overpass', 'de_train', 'de_nuke', 'de_cbble']
+
+    dados = {
+        'file': pd.Series([f"{i:021d}.dem" for i in range(num_partidas)])[partida].to_numpy(),
+        'map': np.array(mapas)[partida % len(mapas)],
+        'date': '09/28/2017 8:44:22 PM',
+        'round': rng.integers(1, 31, num_linhas),
+        'wp': np.array(armas)[rng.integers(0, len(armas), num_linhas)],
+        'wp_type': 'Rifle',
+        'att_id': jogadores[rng.integers(0, len(jogadores), num_linhas)].astype(np.float64),
+        'vic_id': jogadores[rng.integers(0, len(jogadores), num_linhas)],
+        'att_rank': rng.integers(0, 19, num_linhas),
+        'vic_rank': rng.integers(0, 19, num_linhas),
+        'round_type': 'NORMAL',
+        'winner_side': 'Terrorist',
+        'ct_eq_val': rng.integers(0, 30_000, num_linhas),
+        't_eq_val': rng.integers(0, 30_000, num_linhas),
+        'avg_match_rank': (partida % 18).astype(np.float64),
+    }
+    df = pd.DataFrame(dados)
+    df.loc[rng.random(num_linhas) < 0.02, 'att_id'] = np.nan  # dano do mundo (sem atacante)
+    df['tick'] = rng.integers(0, 200_000, num_linhas)
+    df['seconds'] = rng.random(num_linhas) * 3_000
+    df['hp_dmg'] = rng.integers(0, 101, num_linhas)
+    df['arm_dmg'] = rng.integers(0, 101, num_linhas)
+    df['hitbox'] = np.array(['Head', 'Chest', 'Stomach', 'LeftArm', 'RightLeg'])[rng.integers(0, 5, num_linhas)]
+    df['is_bomb_planted'] = rng.random(num_linhas) < 0.2
+    df['award'] = rng.integers(0, 3_300, num_linhas)
+    for coluna in ('att_pos_x', 'att_pos_y', 'vic_pos_x', 'vic_pos_y'):
+        df[coluna] = rng.normal(0, 1_000, num_linhas)
+    return df
+
+
+def medir(funcao, *args):
+    """Executa REPETICOES vezes; retorna (resultado, menor tempo, pico de memória em MB)."""
+    tempos = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(REPETICOES):
+            inicio = time.perf_counter()
+            resultado = funcao(*args)
+            tempos.append(time.perf_counter() - inicio)
+        tracemalloc.start()
+        funcao(*args)
+        _, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return resultado, min(tempos), pico / 1024 ** 2
+
+
+def main():
+    print("=" * 50)
+    print("⏱️ BENCHMARK - ATRIBUIÇÃO DE CHAVES")
+    print("=" * 50)
+
+    if CAMINHO_CSV:
+        df = etl.carregar_dados(CAMINHO_CSV)
+    else:
+        print(f"🎲 Gerando {NUM_LINHAS:,} linhas sintéticas...")
+        df = gerar_dados(NUM_LINHAS)
+
+    armas = etl.extrair_armas(df)
+    # (etapa, tabela, implementação anterior, nova, argumentos)
+    etapas = [
+        ('jogadores', 'jogador', legado_jogadores, etl.extrair_jogadores, lambda: (df,)),
+        ('mapas', 'mapa', legado_mapas, etl.extrair_mapas, lambda: (df,)),
+        ('partidas', 'partida', legado_partidas, etl.extrair_partidas, lambda: (df, resultados['mapas'])),
+        ('rounds', 'round', legado_rounds, etl.extrair_rounds, lambda: (df, resultados['partidas'])),
+        ('eventos', 'evento_dano', legado_eventos, etl.extrair_eventos,
+         lambda: (df, resultados['rounds'], resultados['jogadores'], armas, resultados['partidas'])),
+    ]
+
+    resultados = {}
+    linhas = []
+    for nome, tabela, antiga, nova, argumentos in etapas:
+        print(f"🔄 Medindo {nome}...")
+        esperado, t_antigo, m_antigo = medir(antiga, *argumentos())
+        obtido, t_novo, m_novo = medir(nova, *argumentos())
+        # Compara depois do esquema de tipos, como as tabelas são gravadas
+        iguais = aplicar_esquema(esperado, tabela).equals(aplicar_esquema(obtido, tabela))
+        resultados[nome] = obtido
+        linhas.append((nome, t_antigo, t_novo, m_antigo, m_novo, iguais))
+
+    print("\n" + "=" * 50)
+    print("📊 RESULTADOS")
+    print("=" * 50)
+    print(f"{'etapa':<10} {'antes (s)':>10} {'depois (s)':>11} {'ganho':>7} {'mem antes':>10} {'mem depois':>11}  IDs")
+    for nome, t_antigo, t_novo, m_antigo, m_novo, iguais in linhas:
+        ganho = t_antigo / t_novo if t_novo > 0 else float('inf')
+        print(f"{nome:<10} {t_antigo:>10.3f} {t_novo:>11.3f} {ganho:>6.1f}x "
+              f"{m_antigo:>8.1f}MB {m_novo:>9.1f}MB  {'✅' if iguais else '❌'}")
+
+
+if __name__ == "__main__":
+    main()
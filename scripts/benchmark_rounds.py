@@ -0,0 +1,127 @@
+"""
+============================================
+PROJETO BIG DATA - CS:GO MATCHMAKING
+Benchmark - Geração de Rounds Sintéticos
+============================================
+
+Compara a geração de rounds anterior (laço Python por partida e por
+round, um dicionário por linha) com a geração em colunas de
+gerar_dados_sinteticos.gerar_rounds_sinteticos, medindo tempo e pico
+de memória e conferindo se as duas saídas seguem as mesmas regras.
+
+Uso:
+    python benchmark_rounds.py
+"""
+
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from esquema import aplicar_esquema
+import gerar_dados_sinteticos as gerador
+
+# ============================================
+# CONFIGURAÇÕES
+# ============================================
+
+# Quantidades de partidas medidas
+NUM_PARTIDAS = [10_000, 100_000]
+
+# Repetições de cada medição (vale o menor tempo)
+REPETICOES = 3
+
+SEMENTE = 42
+
+
+# ============================================
+# IMPLEMENTAÇÃO ANTERIOR (REFERÊNCIA)
+# ============================================
+
+def legado_rounds(partidas_ids, rng):
+    novos_rounds = []
+    for partida_id in partidas_ids:
+        num_rounds = int(rng.integers(16, 31))
+        for numero in range(1, num_rounds + 1):
+            if numero in [1, 16]:
+                tipo = 'PISTOL_ROUND'
+            else:
+                tipo = gerador.TIPOS_ROUND[rng.integers(len(gerador.TIPOS_ROUND))]
+            vencedor = gerador.LADOS[rng.integers(len(gerador.LADOS))]
+            ct_eco = int(rng.integers(1000, 16001))
+            t_eco = int(rng.integers(1000, 16001))
+            novos_rounds.append({
+                'partida_id': partida_id,
+                'numero': numero,
+                'tipo': tipo,
+                'vencedor_lado': vencedor,
+                'ct_economia': ct_eco,
+                't_economia': t_eco
+            })
+    return pd.DataFrame(novos_rounds, columns=['partida_id', 'numero', 'tipo', 'vencedor_lado',
+                                               'ct_economia', 't_economia'])
+
+
+# ============================================
+# MEDIÇÃO E CONFERÊNCIA
+# ============================================
+
+def medir(funcao, partidas_ids):
+    """Executa REPETICOES vezes; retorna (resultado, menor tempo, pico de memória em MB)."""
+    tempos = []
+    for _ in range(REPETICOES):
+        rng = np.random.default_rng(SEMENTE)
+        inicio = time.perf_counter()
+        resultado = funcao(partidas_ids, rng)
+        tempos.append(time.perf_counter() - inicio)
+    tracemalloc.start()
+    funcao(partidas_ids, np.random.default_rng(SEMENTE))
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return resultado, min(tempos), pico / 1024 ** 2
+
+
+def conferir(rounds: pd.DataFrame, partidas_ids: np.ndarray) -> bool:
+    """Regras que qualquer implementação precisa respeitar."""
+    rounds = aplicar_esquema(rounds, 'round')
+    por_partida = rounds.groupby('partida_id', sort=False)['numero']
+    pistol = rounds['numero'].isin([1, 16])
+    return bool(
+        np.array_equal(rounds['partida_id'].unique(), partidas_ids)
+        and por_partida.size().between(16, 30).all()
+        and (por_partida.cumcount() + 1 == rounds['numero']).all()
+        and (rounds.loc[pistol, 'tipo'] == 'PISTOL_ROUND').all()
+        and set(rounds['tipo'].unique()) <= set(gerador.TIPOS_ROUND)
+        and set(rounds['vencedor_lado'].unique()) <= set(gerador.LADOS)
+        and rounds[['ct_economia', 't_economia']].stack().between(1000, 16000).all()
+    )
+
+
+def main():
+    print("=" * 50)
+    print("⏱️ BENCHMARK - ROUNDS SINTÉTICOS")
+    print("=" * 50)
+
+    linhas = []
+    for num_partidas in NUM_PARTIDAS:
+        print(f"🔄 Medindo {num_partidas:,} partidas...")
+        partidas_ids = np.arange(1, num_partidas + 1)
+        antigo, t_antigo, m_antigo = medir(legado_rounds, partidas_ids)
+        novo, t_novo, m_novo = medir(gerador.gerar_rounds_sinteticos, partidas_ids)
+        valido = conferir(antigo, partidas_ids) and conferir(novo, partidas_ids)
+        linhas.append((num_partidas, len(novo), t_antigo, t_novo, m_antigo, m_novo, valido))
+
+    print("\n" + "=" * 50)
+    print("📊 RESULTADOS")
+    print("=" * 50)
+    print(f"{'partidas':>10} {'rounds':>11} {'antes (s)':>10} {'depois (s)':>11} {'ganho':>7} "
+          f"{'mem antes':>10} {'mem depois':>11}  regras")
+    for num_partidas, num_rounds, t_antigo, t_novo, m_antigo, m_novo, valido in linhas:
+        ganho = t_antigo / t_novo if t_novo > 0 else float('inf')
+        print(f"{num_partidas:>10,} {num_rounds:>11,} {t_antigo:>10.3f} {t_novo:>11.3f} {ganho:>6.1f}x "
+              f"{m_antigo:>8.1f}MB {m_novo:>9.1f}MB  {'✅' if valido else '❌'}")
+
+
+if __name__ == "__main__":
+    main()
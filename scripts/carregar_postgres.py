@@ -4,7 +4,8 @@ PROJETO BIG DATA - CS:GO MATCHMAKING
 Carregar Dados no PostgreSQL
 ============================================
 
-Este script carrega os CSVs normalizados no PostgreSQL.
+Este script carrega as tabelas normalizadas (CSV, Parquet ou Arrow,
+conforme FORMATO_TABELAS em armazenamento.py) no PostgreSQL.
 
 Pré-requisitos:
 1. PostgreSQL instalado e rodando
@@ -12,14 +13,48 @@ Pré-requisitos:
 3. pip install psycopg2-binary
 
 Configurar as variáveis abaixo conforme seu ambiente.
+
+A carga padrão usa COPY ... FROM STDIN (METODO_CARGA = 'copy'), em
+formato CSV ou binário (FORMATO_COPY). O caminho antigo com INSERTs em
+lote continua disponível com METODO_CARGA = 'insert'.
+
+Com MODO_INCREMENTAL as tabelas não são recriadas: só as linhas com ID
+maior que o maior ID já no banco são anexadas (saída do ETL em modo
+incremental); os ranks dos jogadores e jogador_estatistica (totais
+por jogador recalculados pelo ETL) são atualizados por upsert.
+
+Ao fim de toda carga as tabelas de agregados dos relatórios
+(sql/04_agregados.sql) são atualizadas apenas com as linhas novas e a
+carga é registrada em controle_carga (versão dos dados usada pelo cache
+de consultas_e_graficos.py).
+
+Com ESQUEMA_PARTICIONADO, partida é particionada por mês de data_hora e
+round e evento_dano pelas mesmas faixas de round_id (ver
+sql/05_esquema_particionado.sql). As partições que cobrem os dados são
+criadas antes de cada carga, e a carga paralela grava cada parte de
+evento_dano direto na sua partição.
+
+Com OTIMIZAR_INDICES, a carga completa termina instalando os índices
+parciais e de cobertura de indices_relatorio.py; cada um só fica se
+acelerar as consultas dos relatórios que ele deve atender.
+
+Com INDICE_ESPACIAL, evento_dano recebe índices GiST sobre as posições
+de atacante e vítima, para as consultas de região de mapas_calor.py.
 """
 
 import pandas as pd
 import psycopg2
 from psycopg2 import sql
+from psycopg2.pool import ThreadedConnectionPool
 import os
+import re
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from datetime import datetime
 
+from armazenamento import ler_tabela, ler_tabela_em_lotes
+from copy_postgres import TAMANHO_LEITURA, FluxoCopy, comando_copy, tipos_colunas
+
 # ============================================
 # CONFIGURAÇÕES DO BANCO
 # ============================================
@@ -33,11 +68,95 @@ DB_CONFIG = {
 
 CAMINHO_TABELAS = '../base_dados/tabelas_normalizadas/'
 
+# Script que cria e atualiza (por marca d'água) os agregados dos relatórios
+CAMINHO_SQL_AGREGADOS = '../sql/04_agregados.sql'
+
+# Método de carga: 'copy' (COPY FROM STDIN) ou 'insert' (INSERTs em lote)
+METODO_CARGA = 'copy'
+
+# Formato do COPY: 'csv' (texto) ou 'binary'
+FORMATO_COPY = 'binary'
+
+# Linhas lidas e serializadas por vez no COPY
+TAMANHO_LOTE_COPY = 100_000
+
+# Carga paralela: conexões/threads simultâneas (1 = carga sequencial)
+NUM_WORKERS = os.cpu_count() or 4
+
+# Linhas do evento_dano por partição na carga paralela (faixas de evento_id)
+TAMANHO_PARTICAO_EVENTOS = 500_000
+
+# Carga em massa: cria as tabelas sem PKs, FKs e índices, carrega os
+# dados e só então constrói as restrições (em paralelo) e roda ANALYZE
+CARGA_EM_MASSA = True
+
+# Memória por sessão para construir índices e validar restrições
+MAINTENANCE_WORK_MEM = '512MB'
+
+# Carga incremental: anexa só as linhas novas às tabelas existentes
+MODO_INCREMENTAL = False
+
+# Esquema particionado: partida por mês de data_hora; round e evento_dano
+# por faixas de ROUNDS_POR_PARTICAO round_ids (as mesmas nas duas tabelas,
+# para o planejador juntar e agregar partição a partição)
+ESQUEMA_PARTICIONADO = False
+ROUNDS_POR_PARTICAO = 100_000
+
+# Avaliar e instalar os índices das consultas dos relatórios (carga completa)
+OTIMIZAR_INDICES = False
+
+# Criar índices GiST nas posições de atacante e vítima (consultas de região
+# de mapas_calor.eventos_na_regiao)
+INDICE_ESPACIAL = False
+
+# Tabelas na ordem de carga (respeitando as FKs) e suas colunas
+TABELAS = {
+    'jogador': ['jogador_id', 'steam_id', 'rank_atual'],
+    'mapa': ['mapa_id', 'nome'],
+    'arma': ['arma_id', 'nome', 'tipo'],
+    'partida': ['partida_id', 'arquivo_demo', 'mapa_id', 'data_hora', 'rank_medio'],
+    'round': ['round_id', 'partida_id', 'numero', 'tipo', 'vencedor_lado', 'ct_economia', 't_economia'],
+    'evento_dano': ['evento_id', 'round_id', 'atacante_id', 'vitima_id', 'arma_id',
+                    'tick', 'segundos', 'dano_hp', 'dano_armadura', 'hitbox',
+                    'bomba_plantada', 'premio', 'atacante_x', 'atacante_y', 'vitima_x', 'vitima_y'],
+    'jogador_estatistica': ['jogador_id', 'kills', 'mortes', 'dano_total', 'headshots', 'rounds_jogados'],
+}
+
+# Tabelas que precisam estar carregadas antes de cada tabela (FKs)
+DEPENDENCIAS = {
+    'jogador': [],
+    'mapa': [],
+    'arma': [],
+    'partida': ['mapa'],
+    'round': ['partida'],
+    'evento_dano': ['round', 'jogador', 'arma'],
+    'jogador_estatistica': ['jogador'],
+}
+
+# Tabelas divididas em partições de ids carregadas em paralelo
+TABELAS_PARTICIONADAS = {'evento_dano'}
+
+# Chave primária de cada tabela (usada na carga incremental)
+CHAVES_PRIMARIAS = {tabela: colunas[0] for tabela, colunas in TABELAS.items()}
+
+# Coluna da chave de particionamento (RANGE) de cada tabela no
+# ESQUEMA_PARTICIONADO. A chave entra na PK e por isso é NOT NULL:
+# linhas sem ela são descartadas na carga (_descartar_chave_nula)
+PARTICIONAMENTO = {
+    'partida': 'data_hora',
+    'round': 'round_id',
+    'evento_dano': 'round_id',
+}
+
 # ============================================
 # DDL - CRIAR TABELAS
 # ============================================
 DDL_CRIAR_TABELAS = """
+-- Limpar agregados (são reconstruídos por sql/04_agregados.sql)
+DROP TABLE IF EXISTS agregados_controle, agg_arma, agg_hitbox, agg_mapa_lado, agg_jogador;
+
 -- Limpar tabelas existentes (na ordem correta por causa das FKs)
+DROP TABLE IF EXISTS jogador_estatistica CASCADE;
 DROP TABLE IF EXISTS evento_dano CASCADE;
 DROP TABLE IF EXISTS round CASCADE;
 DROP TABLE IF EXISTS partida CASCADE;
@@ -45,40 +164,43 @@ DROP TABLE IF EXISTS arma CASCADE;
 DROP TABLE IF EXISTS mapa CASCADE;
 DROP TABLE IF EXISTS jogador CASCADE;
 
+-- Tabelas sem chaves, checks e índices: ver RESTRICOES_TABELAS,
+-- CHAVES_ESTRANGEIRAS e INDICES abaixo
+
 -- TABELA: JOGADOR
 CREATE TABLE jogador (
-    jogador_id INTEGER PRIMARY KEY,
-    steam_id BIGINT UNIQUE,
-    rank_atual INTEGER CHECK (rank_atual BETWEEN 0 AND 18)
+    jogador_id INTEGER NOT NULL,
+    steam_id BIGINT,
+    rank_atual INTEGER
 );
 
 -- TABELA: MAPA
 CREATE TABLE mapa (
-    mapa_id INTEGER PRIMARY KEY,
-    nome VARCHAR(50) NOT NULL UNIQUE
+    mapa_id INTEGER NOT NULL,
+    nome VARCHAR(50) NOT NULL
 );
 
 -- TABELA: ARMA
 CREATE TABLE arma (
-    arma_id INTEGER PRIMARY KEY,
-    nome VARCHAR(50) NOT NULL UNIQUE,
+    arma_id INTEGER NOT NULL,
+    nome VARCHAR(50) NOT NULL,
     tipo VARCHAR(20) NOT NULL
 );
 
 -- TABELA: PARTIDA
 CREATE TABLE partida (
-    partida_id INTEGER PRIMARY KEY,
-    arquivo_demo VARCHAR(100) NOT NULL UNIQUE,
-    mapa_id INTEGER REFERENCES mapa(mapa_id),
+    partida_id INTEGER NOT NULL,
+    arquivo_demo VARCHAR(100) NOT NULL,
+    mapa_id INTEGER,
     data_hora TIMESTAMP,
     rank_medio DECIMAL(4,1)
 );
 
 -- TABELA: ROUND
 CREATE TABLE round (
-    round_id INTEGER PRIMARY KEY,
-    partida_id INTEGER REFERENCES partida(partida_id),
-    numero INTEGER NOT NULL CHECK (numero > 0),
+    round_id INTEGER NOT NULL,
+    partida_id INTEGER,
+    numero INTEGER NOT NULL,
     tipo VARCHAR(20),
     vencedor_lado VARCHAR(20),
     ct_economia INTEGER,
@@ -87,15 +209,15 @@ CREATE TABLE round (
 
 -- TABELA: EVENTO_DANO
 CREATE TABLE evento_dano (
-    evento_id INTEGER PRIMARY KEY,
-    round_id INTEGER REFERENCES round(round_id),
-    atacante_id INTEGER REFERENCES jogador(jogador_id),
-    vitima_id INTEGER REFERENCES jogador(jogador_id),
-    arma_id INTEGER REFERENCES arma(arma_id),
+    evento_id INTEGER NOT NULL,
+    round_id INTEGER,
+    atacante_id INTEGER,
+    vitima_id INTEGER,
+    arma_id INTEGER,
     tick INTEGER,
     segundos DECIMAL(10,4),
-    dano_hp INTEGER CHECK (dano_hp >= 0),
-    dano_armadura INTEGER CHECK (dano_armadura >= 0),
+    dano_hp INTEGER,
+    dano_armadura INTEGER,
     hitbox VARCHAR(20),
     bomba_plantada BOOLEAN DEFAULT FALSE,
     premio INTEGER,
@@ -105,15 +227,84 @@ CREATE TABLE evento_dano (
     vitima_y DECIMAL(15,3)
 );
 
--- Índices para performance
-CREATE INDEX idx_partida_mapa ON partida(mapa_id);
-CREATE INDEX idx_round_partida ON round(partida_id);
-CREATE INDEX idx_evento_round ON evento_dano(round_id);
-CREATE INDEX idx_evento_atacante ON evento_dano(atacante_id);
-CREATE INDEX idx_evento_vitima ON evento_dano(vitima_id);
-CREATE INDEX idx_evento_arma ON evento_dano(arma_id);
+-- TABELA: JOGADOR_ESTATISTICA (calculada no ETL, uma linha por jogador)
+CREATE TABLE jogador_estatistica (
+    jogador_id INTEGER NOT NULL,
+    kills INTEGER NOT NULL,
+    mortes INTEGER NOT NULL,
+    dano_total BIGINT NOT NULL,
+    headshots INTEGER NOT NULL,
+    rounds_jogados INTEGER NOT NULL
+);
 """
 
+# Histórico das cargas (não é apagado na carga completa): a última linha
+# identifica a versão atual dos dados
+DDL_CONTROLE_CARGA = """
+CREATE TABLE IF NOT EXISTS controle_carga (
+    carga_id SERIAL PRIMARY KEY,
+    tipo VARCHAR(20) NOT NULL,
+    inicio TIMESTAMP NOT NULL,
+    fim TIMESTAMP NOT NULL DEFAULT NOW(),
+    maior_evento_id BIGINT
+)
+"""
+
+# Chaves primárias, UNIQUE e CHECK de cada tabela (um ALTER TABLE por tabela)
+RESTRICOES_TABELAS = {
+    'jogador': ['PRIMARY KEY (jogador_id)', 'UNIQUE (steam_id)',
+                'CHECK (rank_atual BETWEEN 0 AND 18)'],
+    'mapa': ['PRIMARY KEY (mapa_id)', 'UNIQUE (nome)'],
+    'arma': ['PRIMARY KEY (arma_id)', 'UNIQUE (nome)'],
+    'partida': ['PRIMARY KEY (partida_id)', 'UNIQUE (arquivo_demo)'],
+    'round': ['PRIMARY KEY (round_id)', 'CHECK (numero > 0)'],
+    'evento_dano': ['PRIMARY KEY (evento_id)', 'CHECK (dano_hp >= 0)',
+                    'CHECK (dano_armadura >= 0)'],
+    'jogador_estatistica': ['PRIMARY KEY (jogador_id)'],
+}
+
+# Chaves estrangeiras: tabela -> [(nome, coluna, referência)]
+CHAVES_ESTRANGEIRAS = {
+    'partida': [('fk_partida_mapa', 'mapa_id', 'mapa(mapa_id)')],
+    'round': [('fk_round_partida', 'partida_id', 'partida(partida_id)')],
+    'evento_dano': [
+        ('fk_evento_round', 'round_id', 'round(round_id)'),
+        ('fk_evento_atacante', 'atacante_id', 'jogador(jogador_id)'),
+        ('fk_evento_vitima', 'vitima_id', 'jogador(jogador_id)'),
+        ('fk_evento_arma', 'arma_id', 'arma(arma_id)'),
+    ],
+    'jogador_estatistica': [('fk_estatistica_jogador', 'jogador_id', 'jogador(jogador_id)')],
+}
+
+# Índices para performance
+INDICES = [
+    'CREATE INDEX idx_partida_mapa ON partida(mapa_id)',
+    'CREATE INDEX idx_round_partida ON round(partida_id)',
+    'CREATE INDEX idx_evento_round ON evento_dano(round_id)',
+    'CREATE INDEX idx_evento_atacante ON evento_dano(atacante_id)',
+    'CREATE INDEX idx_evento_vitima ON evento_dano(vitima_id)',
+    'CREATE INDEX idx_evento_arma ON evento_dano(arma_id)',
+    'CREATE INDEX idx_estatistica_kills ON jogador_estatistica(kills DESC)',
+]
+
+# No esquema particionado, PKs e UNIQUE precisam incluir a chave de
+# particionamento. Por isso partida_id sozinho deixa de ser único e a FK
+# de round para partida não pode existir (a unicidade vem do ETL)
+RESTRICOES_PARTICIONADO = {
+    'partida': ['PRIMARY KEY (partida_id, data_hora)', 'UNIQUE (arquivo_demo, data_hora)'],
+    'evento_dano': ['PRIMARY KEY (evento_id, round_id)', 'CHECK (dano_hp >= 0)',
+                    'CHECK (dano_armadura >= 0)'],
+}
+CHAVES_SEM_PARTICIONAMENTO = {'fk_round_partida'}
+INDICES_PARTICIONADO = ['CREATE INDEX idx_partida_id ON partida(partida_id)']
+
+# Índices espaciais (GiST sobre point): atendem "point(x, y) <@ box(...)"
+# quando a consulta usa exatamente a mesma expressão
+INDICES_ESPACIAIS = [
+    'CREATE INDEX idx_evento_atacante_pos ON evento_dano USING GIST (point(atacante_x::float8, atacante_y::float8))',
+    'CREATE INDEX idx_evento_vitima_pos ON evento_dano USING GIST (point(vitima_x::float8, vitima_y::float8))',
+]
+
 # ============================================
 # FUNÇÕES
 # ============================================
@@ -126,33 +317,221 @@ def conectar():
     return conn
 
 
-def criar_tabelas(conn):
-    """Cria as tabelas no banco."""
+def _sql_restricoes(tabela):
+    """ALTER TABLE único com PK, UNIQUE e CHECK da tabela."""
+    clausulas = ', '.join(f"ADD {restricao}" for restricao in restricoes_tabelas()[tabela])
+    return f"ALTER TABLE {tabela} {clausulas}"
+
+
+def _sql_chave_estrangeira(tabela, nome, coluna, referencia, validar=True):
+    """ALTER TABLE que adiciona uma FK (NOT VALID adia a verificação)."""
+    sufixo = '' if validar else ' NOT VALID'
+    return f"ALTER TABLE {tabela} ADD CONSTRAINT {nome} FOREIGN KEY ({coluna}) REFERENCES {referencia}{sufixo}"
+
+
+def restricoes_tabelas():
+    """RESTRICOES_TABELAS do esquema em uso (normal ou particionado)."""
+    if not ESQUEMA_PARTICIONADO:
+        return RESTRICOES_TABELAS
+    return {**RESTRICOES_TABELAS, **RESTRICOES_PARTICIONADO}
+
+
+def chaves_estrangeiras():
+    """CHAVES_ESTRANGEIRAS do esquema em uso (normal ou particionado)."""
+    if not ESQUEMA_PARTICIONADO:
+        return CHAVES_ESTRANGEIRAS
+    chaves = {tabela: [chave for chave in lista if chave[0] not in CHAVES_SEM_PARTICIONAMENTO]
+              for tabela, lista in CHAVES_ESTRANGEIRAS.items()}
+    return {tabela: lista for tabela, lista in chaves.items() if lista}
+
+
+def indices():
+    """INDICES do esquema em uso (normal ou particionado), com os espaciais se ativados."""
+    return (INDICES + (INDICES_PARTICIONADO if ESQUEMA_PARTICIONADO else [])
+            + (INDICES_ESPACIAIS if INDICE_ESPACIAL else []))
+
+
+def ddl_criar_tabelas():
+    """DDL_CRIAR_TABELAS com PARTITION BY nas tabelas de PARTICIONAMENTO, se ativado."""
+    if not ESQUEMA_PARTICIONADO:
+        return DDL_CRIAR_TABELAS
+    ddl = DDL_CRIAR_TABELAS
+    for tabela, coluna in PARTICIONAMENTO.items():
+        ddl = re.sub(rf"(CREATE TABLE {tabela} \(.*?\n\))", rf"\1 PARTITION BY RANGE ({coluna})", ddl, flags=re.DOTALL)
+    return ddl
+
+
+def _nome_particao(tabela, inicio):
+    """Nome da partição de round ou evento_dano que começa em round_id = inicio."""
+    return f"{tabela}_r{inicio // ROUNDS_POR_PARTICAO:04d}"
+
+
+def esquema_particionado(conn):
+    """Indica se as tabelas do banco foram criadas com o esquema particionado."""
+    cursor = conn.cursor()
+    cursor.execute("SELECT COUNT(*) FROM pg_partitioned_table WHERE partrelid = to_regclass('evento_dano')")
+    particionado = cursor.fetchone()[0] > 0
+    cursor.close()
+    return particionado
+
+
+def criar_particoes(conn):
+    """Cria as partições que faltam para cobrir os dados de CAMINHO_TABELAS.
+
+    Uma partição de partida por mês de data_hora e uma de round e de
+    evento_dano por faixa de ROUNDS_POR_PARTICAO round_ids, até o maior
+    round do arquivo. Cada tabela tem ainda uma partição DEFAULT para
+    valores não nulos fora das faixas (chaves nulas violam a PK e são
+    descartadas antes do COPY). Deve rodar antes de cada carga, para
+    que nenhuma linha nova caia na partição DEFAULT.
+    """
+    datas = ler_tabela('partida', CAMINHO_TABELAS, colunas=['data_hora'])['data_hora']
+    meses = pd.to_datetime(datas, format='mixed', dayfirst=False).dropna().dt.to_period('M').unique()
+    maior_round = ler_tabela('round', CAMINHO_TABELAS, colunas=['round_id'])['round_id'].max()
+    maior_round = 0 if pd.isna(maior_round) else int(maior_round)
+
+    comandos = []
+    for mes in sorted(meses):
+        comandos.append(f"CREATE TABLE IF NOT EXISTS partida_{mes.year}_{mes.month:02d} PARTITION OF partida "
+                        f"FOR VALUES FROM ('{mes.start_time:%Y-%m-%d}') TO ('{(mes + 1).start_time:%Y-%m-%d}')")
+    for inicio in range(0, maior_round + 1, ROUNDS_POR_PARTICAO):
+        for tabela in ('round', 'evento_dano'):
+            comandos.append(f"CREATE TABLE IF NOT EXISTS {_nome_particao(tabela, inicio)} PARTITION OF {tabela} "
+                            f"FOR VALUES FROM ({inicio}) TO ({inicio + ROUNDS_POR_PARTICAO})")
+    for tabela in PARTICIONAMENTO:
+        comandos.append(f"CREATE TABLE IF NOT EXISTS {tabela}_padrao PARTITION OF {tabela} DEFAULT")
+
+    cursor = conn.cursor()
+    for comando in comandos:
+        cursor.execute(comando)
+    conn.commit()
+    cursor.close()
+    print(f"🧩 Partições: {len(meses)} meses de partida, "
+          f"{maior_round // ROUNDS_POR_PARTICAO + 1} faixas de round/evento_dano")
+
+
+def criar_tabelas(conn, com_restricoes=True):
+    """Cria as tabelas no banco.
+
+    Com com_restricoes=False as tabelas ficam sem PKs, FKs e índices,
+    que devem ser criados depois da carga com construir_restricoes().
+    Com ESQUEMA_PARTICIONADO as tabelas de PARTICIONAMENTO são criadas
+    particionadas, já com as partições dos dados a carregar.
+    """
     print("📦 Criando tabelas...")
     cursor = conn.cursor()
-    cursor.execute(DDL_CRIAR_TABELAS)
+    cursor.execute(ddl_criar_tabelas())
+    if ESQUEMA_PARTICIONADO:
+        criar_particoes(conn)
+    if com_restricoes:
+        for tabela, restricoes in restricoes_tabelas().items():
+            if restricoes:
+                cursor.execute(_sql_restricoes(tabela))
+        for tabela, chaves in chaves_estrangeiras().items():
+            for nome, coluna, referencia in chaves:
+                cursor.execute(_sql_chave_estrangeira(tabela, nome, coluna, referencia))
+        for indice in indices():
+            cursor.execute(indice)
     conn.commit()
     cursor.close()
-    print("✅ Tabelas criadas!")
+    print("✅ Tabelas criadas!" if com_restricoes else "✅ Tabelas criadas (sem restrições)!")
 
 
-def carregar_csv(conn, nome_tabela, arquivo_csv, colunas):
-    """Carrega um CSV na tabela usando COPY."""
+def _executar_grupos(grupos, num_workers, descricao):
+    """Executa grupos de comandos em paralelo, um grupo por conexão.
+
+    Comandos do mesmo grupo rodam em sequência (ex.: os que disputam o
+    mesmo lock de tabela); grupos diferentes rodam ao mesmo tempo.
+    Retorna o tempo da fase em segundos.
+    """
+    print(f"🔧 {descricao} ({sum(len(g) for g in grupos)} comandos)...")
+    inicio = datetime.now()
+    pool = ThreadedConnectionPool(1, max(1, min(num_workers, len(grupos))), **DB_CONFIG)
+    
+    def executar(comandos):
+        conn = pool.getconn()
+        try:
+            conn.autocommit = True
+            cursor = conn.cursor()
+            cursor.execute(f"SET maintenance_work_mem = '{MAINTENANCE_WORK_MEM}'")
+            for comando in comandos:
+                cursor.execute(comando)
+            cursor.close()
+        finally:
+            pool.putconn(conn)
+    
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, num_workers)) as executor:
+            for futuro in [executor.submit(executar, grupo) for grupo in grupos]:
+                futuro.result()
+    finally:
+        pool.closeall()
+    
+    segundos = (datetime.now() - inicio).total_seconds()
+    print(f"✅ {descricao}: {segundos:.2f}s")
+    return segundos
+
+
+def construir_restricoes(num_workers=None):
+    """Cria PKs, FKs e índices depois da carga e atualiza as estatísticas.
+
+    Fases (cada uma espera a anterior terminar):
+    1. PK/UNIQUE/CHECK: um ALTER TABLE por tabela, tabelas em paralelo
+    2. FKs: adicionadas como NOT VALID e validadas em paralelo por
+       tabela (VALIDATE só bloqueia a tabela que referencia). Tabelas
+       particionadas não aceitam NOT VALID (PostgreSQL < 18): as FKs
+       delas são adicionadas já validadas, uma tabela por conexão
+    3. Índices: todos em paralelo (CREATE INDEX não bloqueia outro)
+    4. ANALYZE de cada tabela em paralelo
+    Retorna {fase: segundos}.
+    """
+    num_workers = num_workers or NUM_WORKERS
+    tempos = {}
+    
+    tempos['chaves primárias'] = _executar_grupos(
+        [[_sql_restricoes(tabela)] for tabela, restricoes in restricoes_tabelas().items() if restricoes],
+        num_workers, "Chaves primárias, UNIQUE e CHECK")
+    
+    particionadas = set(PARTICIONAMENTO) if ESQUEMA_PARTICIONADO else set()
+    adiaveis = {tabela: chaves for tabela, chaves in chaves_estrangeiras().items() if tabela not in particionadas}
+    adicionar = [_sql_chave_estrangeira(tabela, *chave, validar=False)
+                 for tabela, chaves in adiaveis.items() for chave in chaves]
+    validar = [[f"ALTER TABLE {tabela} VALIDATE CONSTRAINT {nome}" for nome, _, _ in chaves]
+               for tabela, chaves in adiaveis.items()]
+    validar += [[_sql_chave_estrangeira(tabela, *chave) for chave in chaves]
+                for tabela, chaves in chaves_estrangeiras().items() if tabela in particionadas and chaves]
+    tempos['chaves estrangeiras'] = (
+        _executar_grupos([adicionar], 1, "Chaves estrangeiras (NOT VALID)")
+        + _executar_grupos(validar, num_workers, "Validação das chaves estrangeiras")
+    )
+    
+    tempos['índices'] = _executar_grupos([[indice] for indice in indices()], num_workers, "Índices")
+    tempos['analyze'] = _executar_grupos([[f"ANALYZE {tabela}"] for tabela in TABELAS],
+                                         num_workers, "ANALYZE")
+    return tempos
+
+
+def carregar_csv(conn, nome_tabela, colunas):
+    """Carrega uma tabela normalizada no banco com INSERTs em lote."""
     print(f"📥 Carregando {nome_tabela}...")
+    inicio = datetime.now()
     
-    # Ler CSV
-    df = pd.read_csv(arquivo_csv)
+    # Ler tabela (qualquer formato suportado pela camada de armazenamento)
+    df = ler_tabela(nome_tabela, CAMINHO_TABELAS, colunas=colunas)
     
     # Converter datas se existir coluna data_hora
     if 'data_hora' in colunas:
         df['data_hora'] = pd.to_datetime(df['data_hora'], format='mixed', dayfirst=False)
         df['data_hora'] = df['data_hora'].dt.strftime('%Y-%m-%d %H:%M:%S')
+    if nome_tabela in PARTICIONAMENTO and esquema_particionado(conn):
+        df, = _descartar_chave_nula(nome_tabela, [df])
     
     # Para tabelas grandes, usar inserção em lotes
     cursor = conn.cursor()
     
-    # Preparar dados
-    registros = df[colunas].values.tolist()
+    # Preparar dados (tipos anuláveis do pandas viram None)
+    df = df[colunas].astype(object)
+    registros = df.where(df.notna(), None).values.tolist()
     total = len(registros)
     
     # Inserir em lotes de 10000
@@ -178,7 +557,330 @@ def carregar_csv(conn, nome_tabela, arquivo_csv, colunas):
     
     conn.commit()
     cursor.close()
-    print(f"✅ {nome_tabela}: {total:,} registros inseridos")
+    segundos = (datetime.now() - inicio).total_seconds()
+    taxa = total / segundos if segundos > 0 else float('inf')
+    print(f"✅ {nome_tabela}: {total:,} registros inseridos em {segundos:.2f}s ({taxa:,.0f} linhas/s)")
+    return total, segundos
+
+
+def _descartar_chave_nula(nome_tabela, lotes):
+    """Remove dos lotes as linhas sem a chave de particionamento da tabela.
+
+    No esquema particionado a chave faz parte da PK, então é NOT NULL e
+    essas linhas não caberiam em nenhuma partição (nem na DEFAULT).
+    Datas que o pandas não consegue interpretar contam como nulas.
+    """
+    coluna = PARTICIONAMENTO[nome_tabela]
+    descartadas = 0
+    for lote in lotes:
+        valores = lote[coluna]
+        if coluna == 'data_hora':
+            valores = pd.to_datetime(valores, format='mixed', dayfirst=False, errors='coerce')
+        nulas = valores.isna()
+        if nulas.any():
+            descartadas += int(nulas.sum())
+            lote = lote[~nulas]
+        yield lote
+    if descartadas:
+        print(f"⚠️  {nome_tabela}: {descartadas:,} linhas sem {coluna} descartadas (chave de partição)")
+
+
+def _preparar_lote_copy(lote, colunas, formato):
+    """Ajusta um lote para o COPY (ordem das colunas e datas em ISO)."""
+    lote = lote[colunas]
+    if formato == 'csv' and 'data_hora' in colunas:
+        datas = pd.to_datetime(lote['data_hora'], format='mixed', dayfirst=False)
+        lote = lote.assign(data_hora=datas.dt.strftime('%Y-%m-%d %H:%M:%S'))
+    return lote
+
+
+def carregar_copy(conn, nome_tabela, colunas, formato=None, lotes=None, rotulo=None, destino=None):
+    """Carrega uma tabela normalizada via COPY FROM STDIN em streaming.
+
+    Os lotes são lidos do arquivo e serializados sob demanda enquanto o
+    servidor consome o COPY, sem montar listas de registros em Python.
+    `lotes` permite carregar apenas parte da tabela (iterador de
+    DataFrames); por padrão a tabela inteira é lida em lotes.
+    `destino` grava em outra tabela com as mesmas colunas (ex.: tabela
+    temporária criada com LIKE).
+    Retorna (linhas carregadas, segundos).
+    """
+    formato = formato or FORMATO_COPY
+    rotulo = rotulo or nome_tabela
+    print(f"📥 Carregando {rotulo} (COPY {formato})...")
+    inicio = datetime.now()
+    
+    if lotes is None:
+        lotes = ler_tabela_em_lotes(nome_tabela, CAMINHO_TABELAS, colunas=colunas,
+                                    tamanho_lote=TAMANHO_LOTE_COPY)
+    if nome_tabela in PARTICIONAMENTO and esquema_particionado(conn):
+        lotes = _descartar_chave_nula(nome_tabela, lotes)
+    lotes = (_preparar_lote_copy(lote, colunas, formato) for lote in lotes)
+    tipos = tipos_colunas(conn, nome_tabela, colunas) if formato == 'binary' else None
+    fluxo = FluxoCopy(lotes, formato, tipos)
+    
+    cursor = conn.cursor()
+    cursor.copy_expert(comando_copy(destino or nome_tabela, colunas, formato), fluxo, size=TAMANHO_LEITURA)
+    conn.commit()
+    cursor.close()
+    
+    segundos = (datetime.now() - inicio).total_seconds()
+    taxa = fluxo.linhas / segundos if segundos > 0 else float('inf')
+    print(f"✅ {rotulo}: {fluxo.linhas:,} registros em {segundos:.2f}s ({taxa:,.0f} linhas/s)")
+    return fluxo.linhas, segundos
+
+
+def _particoes(nome_tabela, colunas):
+    """Divide a tabela em partes carregadas em paralelo: (destino, lotes).
+
+    No esquema normal, faixas contíguas de ids gravadas na própria
+    tabela (destino None). No particionado, cada lote é separado pela
+    faixa de round_id e cada parte vai direto para a sua partição: o
+    COPY não precisa rotear linha a linha pela tabela-mãe e as conexões
+    gravam em partições diferentes. Linhas sem round_id ficam com
+    destino None e são descartadas por carregar_copy (a PK exige
+    round_id).
+    """
+    lotes = ler_tabela_em_lotes(nome_tabela, CAMINHO_TABELAS, colunas=colunas, tamanho_lote=TAMANHO_LOTE_COPY)
+    if not ESQUEMA_PARTICIONADO or nome_tabela not in PARTICIONAMENTO:
+        lotes_por_particao = max(1, TAMANHO_PARTICAO_EVENTOS // TAMANHO_LOTE_COPY)
+        particao = []
+        for lote in lotes:
+            particao.append(lote)
+            if len(particao) == lotes_por_particao:
+                yield None, particao
+                particao = []
+        if particao:
+            yield None, particao
+        return
+
+    pendentes = {}  # destino -> [lotes, linhas]
+    for lote in lotes:
+        faixas = lote['round_id'] // ROUNDS_POR_PARTICAO
+        for faixa, parte in lote.groupby(faixas, dropna=False, sort=False):
+            destino = None if pd.isna(faixa) else _nome_particao(nome_tabela, int(faixa) * ROUNDS_POR_PARTICAO)
+            acumulado = pendentes.setdefault(destino, [[], 0])
+            acumulado[0].append(parte)
+            acumulado[1] += len(parte)
+            if acumulado[1] >= TAMANHO_PARTICAO_EVENTOS:
+                yield destino, pendentes.pop(destino)[0]
+    for destino, (particao, _) in pendentes.items():
+        yield destino, particao
+
+
+def carregar_em_paralelo(num_workers=None):
+    """Carrega todas as tabelas via COPY usando um pool de conexões.
+
+    Uma tabela só começa depois que todas as suas dependências (FKs)
+    terminaram; tabelas independentes (jogador, mapa, arma) carregam ao
+    mesmo tempo. Tabelas em TABELAS_PARTICIONADAS são divididas em
+    faixas de ids e cada faixa vai para uma conexão diferente; no máximo
+    num_workers faixas ficam em memória ao mesmo tempo.
+    """
+    num_workers = num_workers or NUM_WORKERS
+    print(f"⚙️ Carga paralela com {num_workers} conexões")
+    pool = ThreadedConnectionPool(1, num_workers, **DB_CONFIG)
+    vagas = threading.Semaphore(num_workers)
+    
+    def tarefa(nome_tabela, lotes=None, rotulo=None, destino=None):
+        conn = pool.getconn()
+        try:
+            return carregar_copy(conn, nome_tabela, TABELAS[nome_tabela], lotes=lotes, rotulo=rotulo,
+                                 destino=destino)
+        finally:
+            pool.putconn(conn)
+            if lotes is not None:
+                vagas.release()
+    
+    pendentes = dict(DEPENDENCIAS)
+    concluidas = set()
+    em_execucao = {}  # future -> tabela
+    restantes = {}    # tabela -> partições ainda em execução
+    inicio_tabela = {}
+    
+    try:
+        with ThreadPoolExecutor(max_workers=num_workers) as executor:
+            while pendentes or em_execucao:
+                prontas = [t for t, deps in pendentes.items() if concluidas.issuperset(deps)]
+                if not prontas and not em_execucao:
+                    raise ValueError(f"Dependências circulares entre: {', '.join(pendentes)}")
+                for nome_tabela in prontas:
+                    del pendentes[nome_tabela]
+                    inicio_tabela[nome_tabela] = datetime.now()
+                    if nome_tabela not in TABELAS_PARTICIONADAS:
+                        em_execucao[executor.submit(tarefa, nome_tabela)] = nome_tabela
+                        continue
+                    restantes[nome_tabela] = 0
+                    partes = _particoes(nome_tabela, TABELAS[nome_tabela])
+                    for numero, (destino, particao) in enumerate(partes, start=1):
+                        vagas.acquire()
+                        rotulo = f"{destino or nome_tabela} [partição {numero}]"
+                        em_execucao[executor.submit(tarefa, nome_tabela, particao, rotulo, destino)] = nome_tabela
+                        restantes[nome_tabela] += 1
+                
+                feitas, _ = wait(list(em_execucao), return_when=FIRST_COMPLETED)
+                for futuro in feitas:
+                    nome_tabela = em_execucao.pop(futuro)
+                    futuro.result()
+                    if nome_tabela in restantes:
+                        restantes[nome_tabela] -= 1
+                        if restantes[nome_tabela] > 0:
+                            continue
+                    segundos = (datetime.now() - inicio_tabela[nome_tabela]).total_seconds()
+                    print(f"🏁 {nome_tabela} concluída em {segundos:.2f}s")
+                    concluidas.add(nome_tabela)
+    finally:
+        pool.closeall()
+
+
+def tabelas_existem(conn):
+    """Verifica se todas as tabelas do modelo já existem no banco."""
+    cursor = conn.cursor()
+    existem = True
+    for tabela in TABELAS:
+        cursor.execute("SELECT to_regclass(%s)", (tabela,))
+        existem = existem and cursor.fetchone()[0] is not None
+    cursor.close()
+    return existem
+
+
+def _maior_id_banco(conn, nome_tabela):
+    """Maior valor da chave primária já carregado (0 se vazia)."""
+    cursor = conn.cursor()
+    cursor.execute(f"SELECT COALESCE(MAX({CHAVES_PRIMARIAS[nome_tabela]}), 0) FROM {nome_tabela}")
+    maior = cursor.fetchone()[0]
+    cursor.close()
+    return maior
+
+
+def _lotes_novos(nome_tabela, colunas, maior_id):
+    """Lê a tabela em lotes mantendo só as linhas com ID acima de maior_id."""
+    chave = CHAVES_PRIMARIAS[nome_tabela]
+    for lote in ler_tabela_em_lotes(nome_tabela, CAMINHO_TABELAS, colunas=colunas,
+                                    tamanho_lote=TAMANHO_LOTE_COPY):
+        lote = lote[lote[chave] > maior_id]
+        if len(lote):
+            yield lote
+
+
+def atualizar_jogadores(conn):
+    """Insere jogadores novos e atualiza o rank dos existentes (upsert).
+
+    A tabela é pequena: é copiada inteira para uma tabela temporária e
+    mesclada com INSERT ... ON CONFLICT.
+    """
+    cursor = conn.cursor()
+    cursor.execute("CREATE TEMP TABLE tmp_jogador (LIKE jogador)")
+    carregar_copy(conn, 'jogador', TABELAS['jogador'], destino='tmp_jogador', rotulo='jogador (temporária)')
+    cursor.execute("""
+        INSERT INTO jogador (jogador_id, steam_id, rank_atual)
+        SELECT jogador_id, steam_id, rank_atual FROM tmp_jogador
+        ON CONFLICT (jogador_id) DO UPDATE SET rank_atual = EXCLUDED.rank_atual
+        WHERE jogador.rank_atual IS DISTINCT FROM EXCLUDED.rank_atual
+    """)
+    alterados = cursor.rowcount
+    cursor.execute("DROP TABLE tmp_jogador")
+    conn.commit()
+    cursor.close()
+    print(f"✅ jogador: {alterados:,} registros inseridos/atualizados")
+
+
+def atualizar_estatisticas(conn):
+    """Insere ou atualiza as linhas de jogador_estatistica (upsert).
+
+    O ETL incremental regrava a tabela inteira com os totais já somados
+    aos eventos novos; só as linhas que mudaram são reescritas.
+    """
+    colunas = TABELAS['jogador_estatistica']
+    contagens = colunas[1:]
+    cursor = conn.cursor()
+    cursor.execute("CREATE TEMP TABLE tmp_estatistica (LIKE jogador_estatistica)")
+    carregar_copy(conn, 'jogador_estatistica', colunas, destino='tmp_estatistica',
+                  rotulo='jogador_estatistica (temporária)')
+    cursor.execute(f"""
+        INSERT INTO jogador_estatistica ({', '.join(colunas)})
+        SELECT {', '.join(colunas)} FROM tmp_estatistica
+        ON CONFLICT (jogador_id) DO UPDATE SET
+            {', '.join(f'{c} = EXCLUDED.{c}' for c in contagens)}
+        WHERE ({', '.join(f'jogador_estatistica.{c}' for c in contagens)})
+            IS DISTINCT FROM ({', '.join(f'EXCLUDED.{c}' for c in contagens)})
+    """)
+    alterados = cursor.rowcount
+    cursor.execute("DROP TABLE tmp_estatistica")
+    conn.commit()
+    cursor.close()
+    print(f"✅ jogador_estatistica: {alterados:,} registros inseridos/atualizados")
+
+
+def carregar_incremental(conn):
+    """Anexa às tabelas existentes apenas as linhas novas do ETL.
+
+    Os IDs gerados pelo ETL incremental continuam a numeração anterior,
+    então "novo" é simplesmente ID maior que o maior ID no banco. As
+    tabelas são processadas na ordem das FKs. No esquema particionado,
+    as partições dos meses e rounds novos são criadas antes.
+    """
+    if esquema_particionado(conn):
+        criar_particoes(conn)
+    for nome_tabela, colunas in TABELAS.items():
+        if nome_tabela == 'jogador':
+            atualizar_jogadores(conn)
+            continue
+        if nome_tabela == 'jogador_estatistica':
+            atualizar_estatisticas(conn)
+            continue
+        maior_id = _maior_id_banco(conn, nome_tabela)
+        carregar_copy(conn, nome_tabela, colunas, lotes=_lotes_novos(nome_tabela, colunas, maior_id),
+                      rotulo=f"{nome_tabela} ({CHAVES_PRIMARIAS[nome_tabela]} > {maior_id:,})")
+    
+    conn.autocommit = True
+    cursor = conn.cursor()
+    for nome_tabela in TABELAS:
+        cursor.execute(f"ANALYZE {nome_tabela}")
+    cursor.close()
+    conn.autocommit = False
+
+
+def atualizar_agregados(conn):
+    """Executa sql/04_agregados.sql: cria os agregados e agrega as linhas novas.
+
+    Depois de uma carga completa tudo é agregado; depois de uma carga
+    incremental só os eventos e rounds acima da marca d'água.
+    Retorna o tempo em segundos.
+    """
+    print("📊 Atualizando agregados dos relatórios...")
+    inicio = datetime.now()
+    with open(CAMINHO_SQL_AGREGADOS, encoding='utf-8') as arquivo:
+        script = arquivo.read()
+    
+    conn.autocommit = True  # o script controla a própria transação
+    cursor = conn.cursor()
+    cursor.execute(script)
+    cursor.execute("SELECT fonte, id_anterior, id_atual FROM agregados_controle ORDER BY fonte")
+    for fonte, anterior, atual in cursor.fetchall():
+        print(f"   {fonte}: IDs {anterior:,} → {atual:,}")
+    cursor.close()
+    conn.autocommit = False
+    
+    segundos = (datetime.now() - inicio).total_seconds()
+    print(f"✅ Agregados atualizados em {segundos:.2f}s")
+    return segundos
+
+
+def registrar_carga(conn, tipo, inicio):
+    """Registra a carga em controle_carga e retorna o carga_id."""
+    cursor = conn.cursor()
+    cursor.execute(DDL_CONTROLE_CARGA)
+    cursor.execute("""
+        INSERT INTO controle_carga (tipo, inicio, maior_evento_id)
+        SELECT %s, %s, MAX(evento_id) FROM evento_dano
+        RETURNING carga_id
+    """, (tipo, inicio))
+    carga_id = cursor.fetchone()[0]
+    conn.commit()
+    cursor.close()
+    print(f"🏷️ Carga registrada: carga_id {carga_id} ({tipo})")
+    return carga_id
 
 
 def main():
@@ -195,51 +897,71 @@ def main():
         # Conectar
         conn = conectar()
         
+        if MODO_INCREMENTAL and tabelas_existem(conn):
+            print("\n" + "=" * 50)
+            print("📥 CARGA INCREMENTAL")
+            print("=" * 50)
+            carregar_incremental(conn)
+            atualizar_agregados(conn)
+            registrar_carga(conn, 'incremental', inicio)
+            conn.close()
+            print("\n" + "=" * 50)
+            print(f"✅ CARGA INCREMENTAL CONCLUÍDA EM {datetime.now() - inicio}")
+            print("=" * 50)
+            return
+        if MODO_INCREMENTAL:
+            print("⚠️ Tabelas não encontradas: executando carga completa")
+        
         # Criar tabelas
-        criar_tabelas(conn)
+        tempos = {}
+        inicio_fase = datetime.now()
+        criar_tabelas(conn, com_restricoes=not CARGA_EM_MASSA)
+        tempos['criação das tabelas'] = (datetime.now() - inicio_fase).total_seconds()
         
         # Carregar dados na ordem correta (respeitar FKs)
         print("\n" + "=" * 50)
         print("📥 CARREGANDO DADOS")
         print("=" * 50)
         
-        # 1. Jogador
-        carregar_csv(conn, 'jogador', 
-                     f"{CAMINHO_TABELAS}jogador.csv",
-                     ['jogador_id', 'steam_id', 'rank_atual'])
-        
-        # 2. Mapa
-        carregar_csv(conn, 'mapa',
-                     f"{CAMINHO_TABELAS}mapa.csv",
-                     ['mapa_id', 'nome'])
+        inicio_fase = datetime.now()
+        if METODO_CARGA == 'copy' and NUM_WORKERS > 1:
+            carregar_em_paralelo(NUM_WORKERS)
+        else:
+            for nome_tabela, colunas in TABELAS.items():
+                if METODO_CARGA == 'copy':
+                    carregar_copy(conn, nome_tabela, colunas)
+                else:
+                    carregar_csv(conn, nome_tabela, colunas)
+        tempos['carga dos dados'] = (datetime.now() - inicio_fase).total_seconds()
         
-        # 3. Arma
-        carregar_csv(conn, 'arma',
-                     f"{CAMINHO_TABELAS}arma.csv",
-                     ['arma_id', 'nome', 'tipo'])
+        # Restrições, índices e estatísticas depois da carga
+        if CARGA_EM_MASSA:
+            print("\n" + "=" * 50)
+            print("🔧 CONSTRUINDO RESTRIÇÕES E ÍNDICES")
+            print("=" * 50)
+            tempos.update(construir_restricoes(NUM_WORKERS))
         
-        # 4. Partida
-        carregar_csv(conn, 'partida',
-                     f"{CAMINHO_TABELAS}partida.csv",
-                     ['partida_id', 'arquivo_demo', 'mapa_id', 'data_hora', 'rank_medio'])
-        
-        # 5. Round
-        carregar_csv(conn, 'round',
-                     f"{CAMINHO_TABELAS}round.csv",
-                     ['round_id', 'partida_id', 'numero', 'tipo', 'vencedor_lado', 'ct_economia', 't_economia'])
-        
-        # 6. Evento Dano
-        carregar_csv(conn, 'evento_dano',
-                     f"{CAMINHO_TABELAS}evento_dano.csv",
-                     ['evento_id', 'round_id', 'atacante_id', 'vitima_id', 'arma_id', 
-                      'tick', 'segundos', 'dano_hp', 'dano_armadura', 'hitbox',
-                      'bomba_plantada', 'premio', 'atacante_x', 'atacante_y', 'vitima_x', 'vitima_y'])
+        # Agregados lidos pelos relatórios
+        tempos['agregados'] = atualizar_agregados(conn)
+        if OTIMIZAR_INDICES:
+            # Importado só aqui: indices_relatorio traz consultas_e_graficos
+            # (matplotlib, duckdb e as pastas dos gráficos)
+            from indices_relatorio import instalar_indices
+            inicio_fase = datetime.now()
+            instalar_indices(conn)
+            tempos['índices dos relatórios'] = (datetime.now() - inicio_fase).total_seconds()
+        registrar_carga(conn, 'completa', inicio)
         
         # Fechar conexão
         conn.close()
         
         fim = datetime.now()
         print("\n" + "=" * 50)
+        print("⏱️ TEMPO POR FASE")
+        print("=" * 50)
+        for fase, segundos in tempos.items():
+            print(f"  • {fase:<22} {segundos:>10.2f}s")
+        print("\n" + "=" * 50)
         print(f"✅ CARGA CONCLUÍDA EM {fim - inicio}")
         print("=" * 50)
         
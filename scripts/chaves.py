@@ -0,0 +1,72 @@
+"""
+============================================
+PROJETO BIG DATA - CS:GO MATCHMAKING
+Atribuição Vetorizada de Chaves Substitutas
+============================================
+
+Funções usadas pelo ETL para gerar e resolver IDs sem dicionários
+Python nem chaves em texto:
+
+- as entidades são numeradas com pd.factorize (ordem de primeira
+  aparição, a mesma de drop_duplicates), e os códigos já são o ID
+  de cada linha;
+- a busca de IDs é feita com pd.Index.get_indexer sobre arrays;
+- chaves compostas (partida, número do round) viram um único int64.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def codificar(valores) -> tuple:
+    """Códigos por linha e valores distintos, na ordem de primeira aparição.
+
+    NaN vira um valor como outro qualquer (como em drop_duplicates).
+    Retorna (códigos, únicos): o ID de cada linha é códigos + 1.
+    """
+    return pd.factorize(valores, sort=False, use_na_sentinel=False)
+
+
+def primeiras_posicoes(codigos: np.ndarray) -> np.ndarray:
+    """Posição da primeira linha de cada código gerado por codificar().
+
+    Como os códigos surgem em ordem crescente, a primeira ocorrência de
+    um código é a linha em que ele supera o máximo visto até então.
+    """
+    if len(codigos) == 0:
+        return np.empty(0, dtype=np.int64)
+    maximo_anterior = np.maximum.accumulate(codigos)[:-1]
+    novos = np.concatenate(([True], codigos[1:] > maximo_anterior))
+    return np.flatnonzero(novos)
+
+
+def mapear_ids(valores, chaves, ids) -> pd.api.extensions.ExtensionArray:
+    """Resolve o ID de cada valor a partir de pares (chave, id) da dimensão.
+
+    Equivale a valores.map(dict(zip(chaves, ids))): chaves repetidas
+    ficam com o último ID e valores sem correspondência viram <NA>.
+    Retorna um array Int64 anulável.
+    """
+    indice = pd.Index(chaves)
+    ids = np.asarray(ids, dtype=np.int64)
+    if not indice.is_unique:
+        ultimos = ~indice.duplicated(keep='last')
+        indice, ids = indice[ultimos], ids[ultimos]
+    posicoes = indice.get_indexer(valores)
+    encontrados = posicoes >= 0
+    return pd.arrays.IntegerArray(np.where(encontrados, ids[posicoes], 0), ~encontrados)
+
+
+def chave_composta(principal, secundaria, base: int) -> np.ndarray:
+    """Chave int64 principal * base + secundaria (-1 se algum lado for nulo).
+
+    `secundaria` precisa ficar em [0, base) para que a chave seja única.
+    """
+    nulos = np.asarray(pd.isna(principal)) | np.asarray(pd.isna(secundaria))
+    principal = pd.Series(principal, copy=False).to_numpy(dtype=np.int64, na_value=0)
+    secundaria = pd.Series(secundaria, copy=False).to_numpy(dtype=np.int64, na_value=0)
+    if len(secundaria) and (secundaria.min() < 0 or secundaria.max() >= base):
+        raise ValueError(f"Valores fora de [0, {base}) não cabem na chave composta")
+    chave = principal * base + secundaria
+    chave[nulos] = -1
+    return chave
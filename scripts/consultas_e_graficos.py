@@ -6,12 +6,41 @@ Testar Consultas SQL e Gerar Gráficos
 
 Este script executa consultas SQL avançadas e gera
 gráficos para o relatório final.
+
+As consultas de armas, hitbox, CT vs T e top jogadores leem as tabelas
+de agregados (sql/04_agregados.sql), mantidas por carregar_postgres.py,
+em vez de varrer evento_dano e round a cada execução.
+
+As consultas de CONSULTAS rodam ao mesmo tempo, cada uma em uma
+conexão de um pool (NUM_CONEXOES). Assim que uma termina, o gráfico
+dela é enviado a um pool de processos (NUM_PROCESSOS_GRAFICOS) e é
+desenhado enquanto as outras consultas continuam no banco.
+
+Os resultados ficam em cache em PASTA_CACHE, indexados pelo SQL e pela
+versão dos dados (última carga registrada em controle_carga por
+carregar_postgres.py). Enquanto nada for carregado, os gráficos são
+refeitos a partir do cache sem consultar o banco; quando a versão muda,
+as entradas antigas são apagadas.
+
+Com BACKEND = 'duckdb' as mesmas consultas rodam no motor local
+(analise_local.py) direto sobre as tabelas normalizadas em
+analise_local.PASTA_TABELAS, sem PostgreSQL; a versão do cache passa a
+ser o tamanho e a data de modificação dos arquivos.
 """
 
+import hashlib
+import shutil
 import pandas as pd
 import psycopg2
+from psycopg2.pool import ThreadedConnectionPool
+import matplotlib
+matplotlib.use('Agg')  # sem janela: os gráficos são desenhados em processos separados
 import matplotlib.pyplot as plt
 import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from datetime import datetime
+
+from analise_local import PASTA_TABELAS, PoolDuckDB, versao_arquivos
 
 # Configuração do banco
 DB_CONFIG = {
@@ -19,52 +48,129 @@ DB_CONFIG = {
     'port': 5432,
     'database': 'csgo_analytics',
     'user': 'postgres',
-    'password': '159357'
+    'password': '159357',
+    # Junções e agregações partição a partição no esquema particionado
+    # (carregar_postgres.ESQUEMA_PARTICIONADO), só nas sessões do
+    # relatório; no esquema normal não têm efeito
+    'options': '-c enable_partitionwise_join=on -c enable_partitionwise_aggregate=on',
 }
 
+# Motor das consultas: 'postgres' (banco carregado) ou 'duckdb' (arquivos locais)
+BACKEND = 'postgres'
+
 # Pasta para salvar gráficos
 PASTA_GRAFICOS = '../modelos/graficos/'
 os.makedirs(PASTA_GRAFICOS, exist_ok=True)
 
+# Consultas simultâneas (conexões no pool; 1 = uma consulta por vez)
+NUM_CONEXOES = 8
+
+# Processos que desenham e salvam os gráficos
+NUM_PROCESSOS_GRAFICOS = os.cpu_count() or 4
+
+# Cache dos resultados das consultas (uma subpasta por versão dos dados)
+USAR_CACHE = True
+PASTA_CACHE = '../base_dados/cache_consultas/'
+
+NOMES_RANK = {
+    1: 'Silver I', 2: 'Silver II', 3: 'Silver III', 4: 'Silver IV',
+    5: 'Silver Elite', 6: 'Silver Elite M', 7: 'Gold Nova I', 8: 'Gold Nova II',
+    9: 'Gold Nova III', 10: 'Gold Nova M', 11: 'MG I', 12: 'MG II',
+    13: 'MG Elite', 14: 'DMG', 15: 'LE', 16: 'LEM', 17: 'Supreme', 18: 'Global'
+}
+
+
 def conectar():
     return psycopg2.connect(**DB_CONFIG)
 
-def executar_consulta(conn, sql, descricao):
-    """Executa uma consulta e retorna DataFrame."""
-    print(f"\n{'='*50}")
-    print(f"📊 {descricao}")
-    print('='*50)
-    df = pd.read_sql(sql, conn)
-    print(df.to_string())
-    return df
 
-def main():
-    print("="*60)
-    print("🔍 EXECUTANDO CONSULTAS SQL AVANÇADAS")
-    print("="*60)
-    
-    conn = conectar()
-    print("✅ Conectado ao PostgreSQL!")
-    
-    # ========================================
-    # CONSULTA 1: Contagem de registros por tabela
-    # ========================================
-    sql_contagem = """
-    SELECT 'jogador' as tabela, COUNT(*) as registros FROM jogador
-    UNION ALL
-    SELECT 'mapa', COUNT(*) FROM mapa
-    UNION ALL
-    SELECT 'arma', COUNT(*) FROM arma
-    UNION ALL
-    SELECT 'partida', COUNT(*) FROM partida
-    UNION ALL
-    SELECT 'round', COUNT(*) FROM round
-    UNION ALL
-    SELECT 'evento_dano', COUNT(*) FROM evento_dano
-    ORDER BY registros DESC;
+def versao_dados(conn):
+    """Identifica o estado atual dos dados no banco.
+
+    Usa a última carga de controle_carga (id e horário, para não repetir
+    após recriar o banco); sem essa tabela, usa os maiores IDs de
+    evento_dano e partida.
+    """
+    cursor = conn.cursor()
+    cursor.execute("SELECT to_regclass('controle_carga')")
+    if cursor.fetchone()[0] is not None:
+        cursor.execute("SELECT carga_id, fim FROM controle_carga ORDER BY carga_id DESC LIMIT 1")
+        ultima = cursor.fetchone()
+        versao = f"carga:{ultima[0]}:{ultima[1].isoformat()}" if ultima else "carga:0"
+    else:
+        cursor.execute("SELECT (SELECT MAX(evento_id) FROM evento_dano), (SELECT MAX(partida_id) FROM partida)")
+        versao = "ids:{}:{}".format(*cursor.fetchone())
+    cursor.close()
+    conn.rollback()
+    return versao
+
+
+def _pasta_versao(versao):
+    return os.path.join(PASTA_CACHE, hashlib.sha256(versao.encode()).hexdigest()[:16])
+
+
+def preparar_cache(versao):
+    """Cria a pasta da versão atual e apaga as de versões anteriores."""
+    atual = _pasta_versao(versao)
+    os.makedirs(atual, exist_ok=True)
+    for pasta in os.listdir(PASTA_CACHE):
+        caminho = os.path.join(PASTA_CACHE, pasta)
+        if caminho != atual and os.path.isdir(caminho):
+            shutil.rmtree(caminho, ignore_errors=True)
+
+
+def executar_consulta(conn, sql, descricao, versao=None):
+    """Executa uma consulta e retorna DataFrame.
+
+    Com `versao` (e USAR_CACHE), o resultado é lido do cache se a mesma
+    consulta já rodou nessa versão dos dados, e gravado nele se não.
     """
-    df_contagem = executar_consulta(conn, sql_contagem, "Contagem de Registros por Tabela")
+    caminho = None
+    if versao is not None and USAR_CACHE:
+        chave = hashlib.sha256(f"{sql}\n{versao}".encode()).hexdigest()
+        caminho = os.path.join(_pasta_versao(versao), f"{chave}.pkl")
     
+    if caminho is not None and os.path.exists(caminho):
+        df, origem = pd.read_pickle(caminho), ' (cache)'
+    else:
+        df, origem = pd.read_sql(sql, conn), ''
+        if caminho is not None:
+            temporario = f"{caminho}.{os.getpid()}.{id(df)}.tmp"
+            df.to_pickle(temporario)
+            os.replace(temporario, caminho)  # outra thread nunca lê um arquivo pela metade
+    # Um único print por consulta: as consultas terminam em threads diferentes
+    print(f"\n{'='*50}\n📊 {descricao}{origem}\n{'='*50}\n{df.to_string()}")
+    return df
+
+
+def _salvar(nome_arquivo):
+    """Salva a figura atual em PASTA_GRAFICOS e retorna o nome do arquivo."""
+    plt.tight_layout()
+    plt.savefig(f'{PASTA_GRAFICOS}{nome_arquivo}', dpi=150)
+    plt.close()
+    return nome_arquivo
+
+
+# ========================================
+# CONSULTA 1: Contagem de registros por tabela
+# ========================================
+SQL_CONTAGEM = """
+SELECT 'jogador' as tabela, COUNT(*) as registros FROM jogador
+UNION ALL
+SELECT 'mapa', COUNT(*) FROM mapa
+UNION ALL
+SELECT 'arma', COUNT(*) FROM arma
+UNION ALL
+SELECT 'partida', COUNT(*) FROM partida
+UNION ALL
+SELECT 'round', COUNT(*) FROM round
+UNION ALL
+SELECT 'evento_dano', COUNT(*) FROM evento_dano
+ORDER BY registros DESC;
+"""
+
+
+def grafico_registros(df_contagem):
     # Gráfico de barras
     plt.figure(figsize=(10, 6))
     plt.barh(df_contagem['tabela'], df_contagem['registros'], color='steelblue')
@@ -73,144 +179,127 @@ def main():
     plt.xscale('log')
     for i, v in enumerate(df_contagem['registros']):
         plt.text(v, i, f' {v:,}', va='center')
-    plt.tight_layout()
-    plt.savefig(f'{PASTA_GRAFICOS}01_registros_por_tabela.png', dpi=150)
-    plt.close()
-    print(f"📈 Gráfico salvo: 01_registros_por_tabela.png")
-    
-    # ========================================
-    # CONSULTA 2: Top 10 Mapas Mais Jogados
-    # ========================================
-    sql_mapas = """
-    SELECT m.nome as mapa, COUNT(DISTINCT p.partida_id) as partidas
-    FROM mapa m
-    INNER JOIN partida p ON m.mapa_id = p.mapa_id
-    GROUP BY m.nome
-    ORDER BY partidas DESC
-    LIMIT 10;
-    """
-    df_mapas = executar_consulta(conn, sql_mapas, "Top 10 Mapas Mais Jogados")
-    
+    return _salvar('01_registros_por_tabela.png')
+
+
+# ========================================
+# CONSULTA 2: Top 10 Mapas Mais Jogados
+# ========================================
+SQL_MAPAS = """
+SELECT m.nome as mapa, COUNT(DISTINCT p.partida_id) as partidas
+FROM mapa m
+INNER JOIN partida p ON m.mapa_id = p.mapa_id
+GROUP BY m.nome
+ORDER BY partidas DESC
+LIMIT 10;
+"""
+
+
+def grafico_mapas(df_mapas):
     plt.figure(figsize=(10, 6))
     plt.bar(df_mapas['mapa'], df_mapas['partidas'], color='darkgreen')
     plt.xlabel('Mapa')
     plt.ylabel('Número de Partidas')
     plt.title('Top 10 Mapas Mais Jogados')
     plt.xticks(rotation=45, ha='right')
-    plt.tight_layout()
-    plt.savefig(f'{PASTA_GRAFICOS}02_mapas_mais_jogados.png', dpi=150)
-    plt.close()
-    print(f"📈 Gráfico salvo: 02_mapas_mais_jogados.png")
-    
-    # ========================================
-    # CONSULTA 3: Taxa de Vitória CT vs T
-    # ========================================
-    sql_ct_t = """
-    SELECT 
-        m.nome as mapa,
-        COUNT(CASE WHEN r.vencedor_lado = 'CounterTerrorist' THEN 1 END) as vitorias_ct,
-        COUNT(CASE WHEN r.vencedor_lado = 'Terrorist' THEN 1 END) as vitorias_t,
-        COUNT(*) as total_rounds
-    FROM round r
-    INNER JOIN partida p ON r.partida_id = p.partida_id
-    INNER JOIN mapa m ON p.mapa_id = m.mapa_id
-    WHERE m.mapa_id <= 21
-    GROUP BY m.nome
-    HAVING COUNT(*) > 100
-    ORDER BY total_rounds DESC
-    LIMIT 10;
-    """
-    df_ct_t = executar_consulta(conn, sql_ct_t, "Taxa de Vitória CT vs T por Mapa")
-    
+    return _salvar('02_mapas_mais_jogados.png')
+
+
+# ========================================
+# CONSULTA 3: Taxa de Vitória CT vs T
+# ========================================
+SQL_CT_T = """
+SELECT
+    m.nome as mapa,
+    SUM(CASE WHEN a.vencedor_lado = 'CounterTerrorist' THEN a.rounds ELSE 0 END)::BIGINT as vitorias_ct,
+    SUM(CASE WHEN a.vencedor_lado = 'Terrorist' THEN a.rounds ELSE 0 END)::BIGINT as vitorias_t,
+    SUM(a.rounds)::BIGINT as total_rounds
+FROM agg_mapa_lado a
+INNER JOIN mapa m ON a.mapa_id = m.mapa_id
+WHERE m.mapa_id <= 21
+GROUP BY m.nome
+HAVING SUM(a.rounds) > 100
+ORDER BY total_rounds DESC
+LIMIT 10;
+"""
+
+
+def grafico_ct_t(df_ct_t):
     # Gráfico de barras agrupadas
     x = range(len(df_ct_t))
     width = 0.35
-    
+
     fig, ax = plt.subplots(figsize=(12, 6))
     bars1 = ax.bar([i - width/2 for i in x], df_ct_t['vitorias_ct'], width, label='CT', color='#5b89a6')
     bars2 = ax.bar([i + width/2 for i in x], df_ct_t['vitorias_t'], width, label='Terrorist', color='#c9a227')
-    
+
     ax.set_xlabel('Mapa')
     ax.set_ylabel('Vitórias')
     ax.set_title('Vitórias CT vs Terrorist por Mapa')
     ax.set_xticks(x)
     ax.set_xticklabels(df_ct_t['mapa'], rotation=45, ha='right')
     ax.legend()
-    plt.tight_layout()
-    plt.savefig(f'{PASTA_GRAFICOS}03_ct_vs_t.png', dpi=150)
-    plt.close()
-    print(f"📈 Gráfico salvo: 03_ct_vs_t.png")
-    
-    # ========================================
-    # CONSULTA 4: Top 10 Armas Mais Usadas
-    # ========================================
-    sql_armas = """
-    SELECT a.nome as arma, a.tipo, COUNT(*) as usos,
-           SUM(e.dano_hp) as dano_total
-    FROM evento_dano e
-    INNER JOIN arma a ON e.arma_id = a.arma_id
-    WHERE a.arma_id <= 42
-    GROUP BY a.nome, a.tipo
-    ORDER BY usos DESC
-    LIMIT 10;
-    """
-    df_armas = executar_consulta(conn, sql_armas, "Top 10 Armas Mais Usadas")
-    
+    return _salvar('03_ct_vs_t.png')
+
+
+# ========================================
+# CONSULTA 4: Top 10 Armas Mais Usadas
+# ========================================
+SQL_ARMAS = """
+SELECT a.nome as arma, a.tipo, g.usos, g.dano_total
+FROM agg_arma g
+INNER JOIN arma a ON g.arma_id = a.arma_id
+WHERE a.arma_id <= 42
+ORDER BY usos DESC
+LIMIT 10;
+"""
+
+
+def grafico_armas(df_armas):
     plt.figure(figsize=(10, 6))
     colors = plt.cm.Reds([0.3 + i*0.07 for i in range(len(df_armas))])
     plt.barh(df_armas['arma'], df_armas['usos'], color=colors)
     plt.xlabel('Número de Usos')
     plt.title('Top 10 Armas Mais Usadas')
     plt.gca().invert_yaxis()
-    plt.tight_layout()
-    plt.savefig(f'{PASTA_GRAFICOS}04_armas_mais_usadas.png', dpi=150)
-    plt.close()
-    print(f"📈 Gráfico salvo: 04_armas_mais_usadas.png")
-    
-    # ========================================
-    # CONSULTA 5: Distribuição de Dano por Hitbox
-    # ========================================
-    sql_hitbox = """
-    SELECT hitbox, 
-           COUNT(*) as hits,
-           ROUND(AVG(dano_hp), 2) as dano_medio,
-           SUM(dano_hp) as dano_total
-    FROM evento_dano
-    WHERE hitbox IS NOT NULL AND hitbox != ''
-    GROUP BY hitbox
-    ORDER BY hits DESC;
-    """
-    df_hitbox = executar_consulta(conn, sql_hitbox, "Distribuição de Hits por Hitbox")
-    
+    return _salvar('04_armas_mais_usadas.png')
+
+
+# ========================================
+# CONSULTA 5: Distribuição de Dano por Hitbox
+# ========================================
+SQL_HITBOX = """
+SELECT hitbox,
+       hits,
+       ROUND(dano_total::DECIMAL / NULLIF(hits_com_dano, 0), 2) as dano_medio,
+       dano_total
+FROM agg_hitbox
+ORDER BY hits DESC;
+"""
+
+
+def grafico_hitbox(df_hitbox):
     plt.figure(figsize=(10, 6))
-    colors_hitbox = ['#ff6b6b' if h == 'Head' else '#4ecdc4' for h in df_hitbox['hitbox']]
     plt.pie(df_hitbox['hits'], labels=df_hitbox['hitbox'], autopct='%1.1f%%', colors=plt.cm.Set3.colors)
     plt.title('Distribuição de Hits por Parte do Corpo')
-    plt.tight_layout()
-    plt.savefig(f'{PASTA_GRAFICOS}05_hits_por_hitbox.png', dpi=150)
-    plt.close()
-    print(f"📈 Gráfico salvo: 05_hits_por_hitbox.png")
-    
-    # ========================================
-    # CONSULTA 6: Distribuição de Ranks
-    # ========================================
-    sql_ranks = """
-    SELECT rank_atual as rank, COUNT(*) as jogadores
-    FROM jogador
-    WHERE rank_atual > 0 AND rank_atual <= 18
-    GROUP BY rank_atual
-    ORDER BY rank_atual;
-    """
-    df_ranks = executar_consulta(conn, sql_ranks, "Distribuição de Jogadores por Rank")
-    
-    rank_names = {
-        1: 'Silver I', 2: 'Silver II', 3: 'Silver III', 4: 'Silver IV',
-        5: 'Silver Elite', 6: 'Silver Elite M', 7: 'Gold Nova I', 8: 'Gold Nova II',
-        9: 'Gold Nova III', 10: 'Gold Nova M', 11: 'MG I', 12: 'MG II',
-        13: 'MG Elite', 14: 'DMG', 15: 'LE', 16: 'LEM', 17: 'Supreme', 18: 'Global'
-    }
-    df_ranks['rank_nome'] = df_ranks['rank'].map(rank_names)
-    
+    return _salvar('05_hits_por_hitbox.png')
+
+
+# ========================================
+# CONSULTA 6: Distribuição de Ranks
+# ========================================
+SQL_RANKS = """
+SELECT rank_atual as rank, COUNT(*) as jogadores
+FROM jogador
+WHERE rank_atual > 0 AND rank_atual <= 18
+GROUP BY rank_atual
+ORDER BY rank_atual;
+"""
+
+
+def grafico_ranks(df_ranks):
+    df_ranks = df_ranks.assign(rank_nome=df_ranks['rank'].map(NOMES_RANK))
+
     plt.figure(figsize=(12, 6))
     colors_rank = plt.cm.RdYlGn([i/18 for i in df_ranks['rank']])
     plt.bar(df_ranks['rank_nome'], df_ranks['jogadores'], color=colors_rank)
@@ -218,29 +307,26 @@ def main():
     plt.ylabel('Número de Jogadores')
     plt.title('Distribuição de Jogadores por Rank')
     plt.xticks(rotation=45, ha='right')
-    plt.tight_layout()
-    plt.savefig(f'{PASTA_GRAFICOS}06_distribuicao_ranks.png', dpi=150)
-    plt.close()
-    print(f"📈 Gráfico salvo: 06_distribuicao_ranks.png")
-    
-    # ========================================
-    # CONSULTA 7: Headshot Percentage por Arma
-    # ========================================
-    sql_hs = """
-    SELECT a.nome as arma,
-           COUNT(*) as total_hits,
-           COUNT(CASE WHEN e.hitbox = 'Head' THEN 1 END) as headshots,
-           ROUND(COUNT(CASE WHEN e.hitbox = 'Head' THEN 1 END)::DECIMAL / COUNT(*) * 100, 2) as hs_percent
-    FROM evento_dano e
-    INNER JOIN arma a ON e.arma_id = a.arma_id
-    WHERE a.arma_id <= 42
-    GROUP BY a.nome
-    HAVING COUNT(*) > 1000
-    ORDER BY hs_percent DESC
-    LIMIT 10;
-    """
-    df_hs = executar_consulta(conn, sql_hs, "Top 10 Armas por Headshot %")
-    
+    return _salvar('06_distribuicao_ranks.png')
+
+
+# ========================================
+# CONSULTA 7: Headshot Percentage por Arma
+# ========================================
+SQL_HS = """
+SELECT a.nome as arma,
+       g.usos as total_hits,
+       g.headshots,
+       ROUND(g.headshots::DECIMAL / g.usos * 100, 2) as hs_percent
+FROM agg_arma g
+INNER JOIN arma a ON g.arma_id = a.arma_id
+WHERE a.arma_id <= 42 AND g.usos > 1000
+ORDER BY hs_percent DESC
+LIMIT 10;
+"""
+
+
+def grafico_headshots(df_hs):
     plt.figure(figsize=(10, 6))
     plt.barh(df_hs['arma'], df_hs['hs_percent'], color='crimson')
     plt.xlabel('Headshot %')
@@ -248,32 +334,113 @@ def main():
     plt.gca().invert_yaxis()
     for i, v in enumerate(df_hs['hs_percent']):
         plt.text(v + 0.5, i, f'{v}%', va='center')
-    plt.tight_layout()
-    plt.savefig(f'{PASTA_GRAFICOS}07_headshot_por_arma.png', dpi=150)
-    plt.close()
-    print(f"📈 Gráfico salvo: 07_headshot_por_arma.png")
-    
-    # ========================================
-    # CONSULTA 8: Top Jogadores por Kills
-    # ========================================
-    sql_top_players = """
-    SELECT j.steam_id, j.rank_atual,
-           COUNT(*) as kills
-    FROM evento_dano e
-    INNER JOIN jogador j ON e.atacante_id = j.jogador_id
-    WHERE e.dano_hp >= 100
-    GROUP BY j.steam_id, j.rank_atual
-    ORDER BY kills DESC
-    LIMIT 15;
+    return _salvar('07_headshot_por_arma.png')
+
+
+# ========================================
+# CONSULTA 8: Top Jogadores por Kills
+# ========================================
+SQL_TOP_PLAYERS = """
+SELECT j.steam_id, j.rank_atual, e.kills
+FROM jogador_estatistica e
+INNER JOIN jogador j ON e.jogador_id = j.jogador_id
+WHERE e.kills > 0
+ORDER BY kills DESC
+LIMIT 15;
+"""
+
+# Consultas do relatório: nome -> (descrição, SQL, função do gráfico ou None)
+CONSULTAS = {
+    'contagem': ("Contagem de Registros por Tabela", SQL_CONTAGEM, grafico_registros),
+    'mapas': ("Top 10 Mapas Mais Jogados", SQL_MAPAS, grafico_mapas),
+    'ct_t': ("Taxa de Vitória CT vs T por Mapa", SQL_CT_T, grafico_ct_t),
+    'armas': ("Top 10 Armas Mais Usadas", SQL_ARMAS, grafico_armas),
+    'hitbox': ("Distribuição de Hits por Hitbox", SQL_HITBOX, grafico_hitbox),
+    'ranks': ("Distribuição de Jogadores por Rank", SQL_RANKS, grafico_ranks),
+    'headshots': ("Top 10 Armas por Headshot %", SQL_HS, grafico_headshots),
+    'top_players': ("Top 15 Jogadores por Kills", SQL_TOP_PLAYERS, None),
+}
+
+
+def gerar_relatorio(num_conexoes=None, num_processos=None):
+    """Executa CONSULTAS em paralelo e desenha os gráficos enquanto elas rodam.
+
+    Cada consulta usa uma conexão do pool; quando termina, seu gráfico
+    vai para o pool de processos. O tempo total fica próximo do tempo
+    da consulta mais lenta somado ao do último gráfico.
+    Retorna ({nome: DataFrame}, {nome: segundos da consulta}).
     """
-    df_players = executar_consulta(conn, sql_top_players, "Top 15 Jogadores por Kills")
-    
+    num_conexoes = max(1, min(num_conexoes or NUM_CONEXOES, len(CONSULTAS)))
+    num_processos = num_processos or NUM_PROCESSOS_GRAFICOS
+    if BACKEND == 'duckdb':
+        pool = PoolDuckDB()
+        print(f"✅ Motor local DuckDB sobre {os.path.abspath(PASTA_TABELAS)} "
+              f"({num_conexoes} consultas simultâneas, {num_processos} processos para gráficos)")
+    else:
+        pool = ThreadedConnectionPool(1, num_conexoes, **DB_CONFIG)
+        print(f"✅ Conectado ao PostgreSQL! ({num_conexoes} conexões, {num_processos} processos para gráficos)")
+
+    versao = None
+    if USAR_CACHE:
+        if BACKEND == 'duckdb':
+            versao = versao_arquivos()
+        else:
+            conn = pool.getconn()
+            try:
+                versao = versao_dados(conn)
+            finally:
+                pool.putconn(conn)
+        preparar_cache(versao)
+        print(f"🗃️ Versão dos dados: {versao}")
+
+    def consultar(nome):
+        descricao, sql, _ = CONSULTAS[nome]
+        conn = pool.getconn()
+        try:
+            inicio = datetime.now()
+            df = executar_consulta(conn, sql, descricao, versao)
+            return df, (datetime.now() - inicio).total_seconds()
+        finally:
+            pool.putconn(conn)
+
+    resultados, tempos, graficos = {}, {}, []
+    try:
+        with ProcessPoolExecutor(max_workers=num_processos) as desenhistas, \
+                ThreadPoolExecutor(max_workers=num_conexoes) as executor:
+            futuros = {executor.submit(consultar, nome): nome for nome in CONSULTAS}
+            for futuro in as_completed(futuros):
+                nome = futuros[futuro]
+                resultados[nome], tempos[nome] = futuro.result()
+                grafico = CONSULTAS[nome][2]
+                if grafico is not None:
+                    graficos.append(desenhistas.submit(grafico, resultados[nome]))
+            for futuro in as_completed(graficos):
+                print(f"📈 Gráfico salvo: {futuro.result()}")
+    finally:
+        pool.closeall()
+
+    return resultados, tempos
+
+
+def main():
+    print("="*60)
+    print("🔍 EXECUTANDO CONSULTAS SQL AVANÇADAS")
+    print("="*60)
+
+    inicio = datetime.now()
+    _, tempos = gerar_relatorio()
+    total = (datetime.now() - inicio).total_seconds()
+
     # ========================================
     # RESUMO FINAL
     # ========================================
     print("\n" + "="*60)
     print("✅ CONSULTAS EXECUTADAS COM SUCESSO!")
     print("="*60)
+    print("\n⏱️ Tempo por consulta:")
+    for nome in CONSULTAS:
+        print(f"   • {nome:<12} {tempos[nome]:>8.2f}s")
+    print(f"   Total do relatório: {total:.2f}s (consulta mais lenta: {max(tempos.values()):.2f}s)")
     print(f"\n📁 Gráficos salvos em: {os.path.abspath(PASTA_GRAFICOS)}")
     print("\n📊 Gráficos gerados:")
     print("   1. Registros por tabela")
@@ -283,8 +450,6 @@ def main():
     print("   5. Hits por hitbox")
     print("   6. Distribuição de ranks")
     print("   7. Headshot % por arma")
-    
-    conn.close()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,249 @@
+"""
+============================================
+PROJETO BIG DATA - CS:GO MATCHMAKING
+Carga via COPY (texto CSV ou binário)
+============================================
+
+Converte lotes de DataFrame diretamente no formato que o comando
+COPY ... FROM STDIN do PostgreSQL espera e os entrega ao
+cursor.copy_expert através de um objeto "arquivo" que gera os bytes
+sob demanda. Nenhuma lista Python por linha é criada: cada lote é
+serializado de forma vetorizada (to_csv ou NumPy).
+
+Formatos:
+- csv:    texto CSV (COPY ... WITH (FORMAT csv))
+- binary: formato binário nativo (COPY ... WITH (FORMAT binary)),
+          sem parse de texto no servidor
+"""
+
+import io
+
+import numpy as np
+import pandas as pd
+
+# Cabeçalho e rodapé do formato binário do COPY
+ASSINATURA_BINARIO = b'PGCOPY\n\xff\r\n\x00' + (0).to_bytes(4, 'big') + (0).to_bytes(4, 'big')
+RODAPE_BINARIO = (-1).to_bytes(2, 'big', signed=True)
+
+# Época do PostgreSQL (2000-01-01) em microssegundos desde a época Unix
+EPOCA_POSTGRES_US = 946_684_800 * 1_000_000
+
+# NUMERIC binário: 4 dígitos inteiros + 1 fracionário na base 10000
+# (cobre valores absolutos < 10^16 com até 4 casas decimais)
+NUMERIC_DIGITOS_INTEIROS = 4
+NUMERIC_TAMANHO = 8 + 2 * (NUMERIC_DIGITOS_INTEIROS + 1)
+
+# Bytes pedidos por leitura do copy_expert (o padrão do psycopg2 é 8 KB)
+TAMANHO_LEITURA = 1 << 20
+
+FORMATOS_INTEIROS = {
+    'smallint': '>i2',
+    'integer': '>i4',
+    'bigint': '>i8',
+}
+
+
+# ============================================
+# METADADOS DAS COLUNAS
+# ============================================
+
+def tipos_colunas(conn, tabela: str, colunas: list) -> dict:
+    """Consulta o tipo PostgreSQL (e a escala de NUMERIC) de cada coluna."""
+    cursor = conn.cursor()
+    cursor.execute(
+        """
+        SELECT column_name, data_type, numeric_scale
+        FROM information_schema.columns
+        WHERE table_schema = current_schema() AND table_name = %s
+        """,
+        (tabela,)
+    )
+    tipos = {nome: (tipo, escala) for nome, tipo, escala in cursor.fetchall()}
+    cursor.close()
+    return {col: tipos[col] for col in colunas}
+
+
+def comando_copy(tabela: str, colunas: list, formato: str) -> str:
+    """Monta o comando COPY ... FROM STDIN para o formato pedido."""
+    opcoes = "FORMAT csv" if formato == 'csv' else "FORMAT binary"
+    return f"COPY {tabela} ({', '.join(colunas)}) FROM STDIN WITH ({opcoes})"
+
+
+# ============================================
+# CODIFICAÇÃO DOS LOTES
+# ============================================
+
+def codificar_lote_csv(lote: pd.DataFrame) -> bytes:
+    """Serializa um lote como CSV sem cabeçalho (NULL = campo vazio)."""
+    return lote.to_csv(index=False, header=False).encode('utf-8')
+
+
+def _campo_fixo(valores: np.ndarray, validos: np.ndarray, formato: str):
+    """Campo de tamanho fixo: retorna (tamanhos, bytes por linha)."""
+    dados = np.zeros(len(valores), dtype=formato)
+    dados[validos] = valores[validos]
+    largura = dados.dtype.itemsize
+    tamanhos = np.where(validos, largura, -1).astype(np.int64)
+    return tamanhos, dados.view(np.uint8).reshape(-1, largura)
+
+
+def _campo_numeric(valores: np.ndarray, validos: np.ndarray, escala: int):
+    """Codifica NUMERIC no formato binário (ndigits, weight, sign, dscale, dígitos).
+
+    Os zeros à esquerda e à direita são removidos pelo próprio servidor.
+    """
+    n = np.zeros(len(valores), dtype=np.int64)
+    n[validos] = np.rint(np.abs(valores[validos]) * 10 ** escala).astype(np.int64)
+    inteiro, fracao = np.divmod(n, 10 ** escala)
+
+    registro = np.zeros(len(valores), dtype=[
+        ('ndigits', '>i2'), ('weight', '>i2'), ('sign', '>u2'), ('dscale', '>i2'),
+        ('digitos', '>i2', NUMERIC_DIGITOS_INTEIROS + 1),
+    ])
+    registro['ndigits'] = NUMERIC_DIGITOS_INTEIROS + 1
+    registro['weight'] = NUMERIC_DIGITOS_INTEIROS - 1
+    registro['sign'] = np.where(valores < 0, 0x4000, 0x0000)
+    registro['dscale'] = escala
+    for i in range(NUMERIC_DIGITOS_INTEIROS):
+        potencia = 10_000 ** (NUMERIC_DIGITOS_INTEIROS - 1 - i)
+        registro['digitos'][:, i] = (inteiro // potencia) % 10_000
+    registro['digitos'][:, NUMERIC_DIGITOS_INTEIROS] = fracao * 10 ** (4 - escala)
+
+    tamanhos = np.where(validos, NUMERIC_TAMANHO, -1).astype(np.int64)
+    return tamanhos, registro.view(np.uint8).reshape(-1, NUMERIC_TAMANHO)
+
+
+def _inicios(tamanhos: np.ndarray) -> np.ndarray:
+    """Soma acumulada exclusiva: posição inicial de cada segmento."""
+    return np.concatenate(([0], np.cumsum(tamanhos)[:-1])).astype(np.int64)
+
+
+def _campo_texto(serie: pd.Series, validos: np.ndarray):
+    """Campo de texto: retorna (tamanhos, buffer contínuo com os bytes).
+
+    Cada valor distinto é codificado uma única vez (hitbox, tipo etc.
+    têm poucos valores) e os bytes são replicados por indexação.
+    """
+    codigos, unicos = pd.factorize(serie)
+    codificados = [str(valor).encode('utf-8') for valor in unicos]
+    tam_unicos = np.array([len(valor) for valor in codificados], dtype=np.int64)
+    base = np.frombuffer(b''.join(codificados), dtype=np.uint8)
+
+    tamanhos = np.full(len(serie), -1, dtype=np.int64)
+    tamanhos[validos] = tam_unicos[codigos[validos]]
+    tam_validos = tamanhos[validos]
+    origem = np.repeat(_inicios(tam_unicos)[codigos[validos]] - _inicios(tam_validos), tam_validos)
+    dados = base[origem + np.arange(len(origem))] if len(base) else base
+    return tamanhos, dados
+
+
+def _codificar_coluna(serie: pd.Series, tipo: str, escala):
+    """Escolhe o codificador binário conforme o tipo da coluna no banco."""
+    validos = serie.notna().to_numpy()
+
+    if tipo in FORMATOS_INTEIROS:
+        return _campo_fixo(serie.to_numpy(dtype=np.int64, na_value=0), validos, FORMATOS_INTEIROS[tipo])
+    if tipo == 'boolean':
+        return _campo_fixo(serie.to_numpy(dtype=bool, na_value=False), validos, '?')
+    if tipo == 'double precision':
+        return _campo_fixo(serie.to_numpy(dtype=np.float64, na_value=0), validos, '>f8')
+    if tipo == 'real':
+        return _campo_fixo(serie.to_numpy(dtype=np.float64, na_value=0), validos, '>f4')
+    if tipo == 'numeric':
+        return _campo_numeric(serie.to_numpy(dtype=np.float64, na_value=np.nan), validos, int(escala or 0))
+    if tipo.startswith('timestamp'):
+        datas = pd.to_datetime(serie, format='mixed').to_numpy(dtype='datetime64[us]')
+        micros = datas.astype(np.int64) - EPOCA_POSTGRES_US
+        return _campo_fixo(micros, validos, '>i8')
+    return _campo_texto(serie, validos)
+
+
+def codificar_lote_binario(lote: pd.DataFrame, tipos: dict) -> bytes:
+    """Serializa um lote no formato binário do COPY (sem cabeçalho/rodapé).
+
+    Cada linha é: int16 com o número de campos e, para cada campo,
+    int32 com o tamanho (-1 = NULL) seguido dos bytes do valor.
+    """
+    n = len(lote)
+    if n == 0:
+        return b''
+    campos = [_codificar_coluna(lote[col], *tipos[col]) for col in lote.columns]
+
+    # Tamanho de cada linha e posição onde ela começa no buffer final
+    tamanho_linha = np.full(n, 2, dtype=np.int64)
+    for tamanhos, _ in campos:
+        tamanho_linha += 4 + np.maximum(tamanhos, 0)
+    inicio_linha = _inicios(tamanho_linha)
+
+    saida = np.empty(int(tamanho_linha.sum()), dtype=np.uint8)
+    total_campos = np.frombuffer(len(campos).to_bytes(2, 'big'), dtype=np.uint8)
+    saida[inicio_linha[:, None] + np.arange(2)] = total_campos
+
+    cursor = inicio_linha + 2
+    for tamanhos, dados in campos:
+        prefixo = tamanhos.astype('>i4').view(np.uint8).reshape(-1, 4)
+        saida[cursor[:, None] + np.arange(4)] = prefixo
+        cursor = cursor + 4
+
+        validos = tamanhos >= 0
+        if dados.ndim == 2:
+            largura = dados.shape[1]
+            saida[cursor[validos, None] + np.arange(largura)] = dados[validos]
+        elif len(dados):
+            # Texto: espalha o buffer contínuo nas posições de cada linha
+            tam_validos = tamanhos[validos]
+            destino = np.repeat(cursor[validos] - _inicios(tam_validos), tam_validos) + np.arange(len(dados))
+            saida[destino] = dados
+        cursor = cursor + np.maximum(tamanhos, 0)
+
+    return saida.tobytes()
+
+
+# ============================================
+# FLUXO PARA copy_expert
+# ============================================
+
+class FluxoCopy(io.RawIOBase):
+    """Arquivo somente-leitura que gera o conteúdo do COPY sob demanda.
+
+    Recebe um iterador de lotes (DataFrames) e só serializa o próximo
+    lote quando o psycopg2 pede mais bytes, mantendo a memória limitada
+    a um lote por vez.
+    """
+
+    def __init__(self, lotes, formato: str = 'csv', tipos: dict = None):
+        self._lotes = iter(lotes)
+        self._formato = formato
+        self._tipos = tipos
+        self._buffer = ASSINATURA_BINARIO if formato == 'binary' else b''
+        self._posicao = 0
+        self._fim = False
+        self.linhas = 0
+
+    def readable(self):
+        return True
+
+    def _proximo_bloco(self) -> bytes:
+        lote = next(self._lotes, None)
+        if lote is None:
+            self._fim = True
+            return RODAPE_BINARIO if self._formato == 'binary' else b''
+        self.linhas += len(lote)
+        if self._formato == 'binary':
+            return codificar_lote_binario(lote, self._tipos)
+        return codificar_lote_csv(lote)
+
+    def read(self, tamanho=-1):
+        while not self._fim and (tamanho < 0 or len(self._buffer) - self._posicao < tamanho):
+            self._buffer = self._buffer[self._posicao:] + self._proximo_bloco()
+            self._posicao = 0
+        if tamanho < 0:
+            tamanho = len(self._buffer) - self._posicao
+        pedaco = self._buffer[self._posicao:self._posicao + tamanho]
+        self._posicao += len(pedaco)
+        return pedaco
+
+    def readinto(self, destino):
+        pedaco = self.read(len(destino))
+        destino[:len(pedaco)] = pedaco
+        return len(pedaco)
@@ -0,0 +1,195 @@
+"""
+============================================
+PROJETO BIG DATA - CS:GO MATCHMAKING
+Esquema de Tipos das Tabelas Normalizadas
+============================================
+
+Define os tipos (dtypes do pandas) de cada coluna das tabelas
+normalizadas. O mesmo esquema é usado na gravação em formato colunar
+e na leitura de qualquer formato, para que todos os scripts enxerguem
+as mesmas colunas com os mesmos tipos.
+
+Também define os tipos das colunas do CSV original (TIPOS_ORIGINAL),
+aplicados já na leitura pelo ETL: inteiros anuláveis pequenos,
+float32 para coordenadas e category para textos repetitivos, em vez
+dos int64/float64/object inferidos pelo pandas.
+"""
+
+import sys
+
+import numpy as np
+import pandas as pd
+
+# ============================================
+# TIPOS DO CSV ORIGINAL
+# ============================================
+# Apenas as colunas usadas pelo ETL. `seconds` fica em float64: em
+# float32 a quarta casa decimal (NUMERIC(10,4) no banco) se perderia.
+TIPOS_ORIGINAL = {
+    'file': 'category',
+    'map': 'category',
+    'date': 'category',
+    'round': 'Int16',
+    'tick': 'Int32',
+    'seconds': 'float64',
+    'hp_dmg': 'Int16',
+    'arm_dmg': 'Int16',
+    'is_bomb_planted': 'boolean',
+    'hitbox': 'category',
+    'wp': 'category',
+    'wp_type': 'category',
+    'award': 'Int16',
+    'winner_side': 'category',
+    'att_id': 'Int64',
+    'att_rank': 'Int8',
+    'vic_id': 'Int64',
+    'vic_rank': 'Int8',
+    'att_pos_x': 'float32',
+    'att_pos_y': 'float32',
+    'vic_pos_x': 'float32',
+    'vic_pos_y': 'float32',
+    'round_type': 'category',
+    'ct_eq_val': 'Int32',
+    't_eq_val': 'Int32',
+    'avg_match_rank': 'float32',
+}
+
+# ============================================
+# TIPOS POR TABELA
+# ============================================
+ESQUEMA_TABELAS = {
+    'jogador': {
+        'jogador_id': 'Int32',
+        'steam_id': 'Int64',
+        'rank_atual': 'Int8',
+        # Lado da última ocorrência que definiu rank_atual (modo incremental)
+        'rank_de_vitima': 'boolean',
+    },
+    'mapa': {
+        'mapa_id': 'Int32',
+        'nome': 'string',
+    },
+    'arma': {
+        'arma_id': 'Int32',
+        'nome': 'string',
+        'tipo': 'category',
+    },
+    'partida': {
+        'partida_id': 'Int32',
+        'arquivo_demo': 'string',
+        'mapa_id': 'Int32',
+        'data_hora': 'string',
+        'rank_medio': 'float32',
+    },
+    'round': {
+        'round_id': 'Int32',
+        'partida_id': 'Int32',
+        'numero': 'Int16',
+        'tipo': 'category',
+        'vencedor_lado': 'category',
+        'ct_economia': 'Int32',
+        't_economia': 'Int32',
+    },
+    'evento_dano': {
+        'evento_id': 'Int32',
+        'round_id': 'Int32',
+        'atacante_id': 'Int32',
+        'vitima_id': 'Int32',
+        'arma_id': 'Int32',
+        'tick': 'Int32',
+        'segundos': 'float64',
+        'dano_hp': 'Int16',
+        'dano_armadura': 'Int16',
+        'hitbox': 'category',
+        'bomba_plantada': 'boolean',
+        'premio': 'Int16',
+        'atacante_x': 'float32',
+        'atacante_y': 'float32',
+        'vitima_x': 'float32',
+        'vitima_y': 'float32',
+    },
+    # Estatísticas por jogador (estatisticas_jogador.py), calculadas no ETL
+    'jogador_estatistica': {
+        'jogador_id': 'Int32',
+        'kills': 'Int32',
+        'mortes': 'Int32',
+        'dano_total': 'Int64',
+        'headshots': 'Int32',
+        'rounds_jogados': 'Int32',
+    },
+    # Grade opcional de posições por mapa (mapas_calor.py): eventos e
+    # dano por célula de TAMANHO_CELULA unidades, para atacante e vítima
+    'mapa_calor': {
+        'mapa_id': 'Int32',
+        'papel': 'category',
+        'celula_x': 'Int16',
+        'celula_y': 'Int16',
+        'eventos': 'Int32',
+        'dano_total': 'Int64',
+    },
+}
+
+# Tipos inteiros anuláveis precisam de conversão após a leitura do CSV,
+# pois valores como "17.0" não são aceitos diretamente pelo parser
+TIPOS_INTEIROS = {'Int8', 'Int16', 'Int32', 'Int64'}
+
+
+def tipos_da_tabela(nome: str, colunas=None) -> dict:
+    """Retorna {coluna: dtype} da tabela, opcionalmente filtrado por colunas."""
+    tipos = ESQUEMA_TABELAS.get(nome, {})
+    if colunas is None:
+        return dict(tipos)
+    return {col: tipo for col, tipo in tipos.items() if col in colunas}
+
+
+def aplicar_esquema(df: pd.DataFrame, nome: str) -> pd.DataFrame:
+    """Converte as colunas conhecidas de df para os tipos do esquema."""
+    tipos = tipos_da_tabela(nome, df.columns)
+    pendentes = {col: tipo for col, tipo in tipos.items() if str(df[col].dtype) != tipo}
+    if not pendentes:
+        return df
+    return df.astype(pendentes)
+
+
+# ============================================
+# USO DE MEMÓRIA
+# ============================================
+
+def memoria_mb(df: pd.DataFrame) -> float:
+    """Memória ocupada pelo DataFrame (incluindo textos), em MB."""
+    return df.memory_usage(index=False, deep=True).sum() / 1024 ** 2
+
+
+def memoria_sem_esquema_mb(df: pd.DataFrame) -> float:
+    """Memória que df ocuparia com os tipos que o pandas inferiria sem esquema, em MB.
+
+    Inteiros viram int64 (float64 se houver nulos), floats viram float64
+    e textos/categorias viram object. O tamanho é calculado a partir dos
+    tipos e da contagem de cada valor, sem converter (copiar) o DataFrame:
+    uma coluna object ocupa 8 bytes por linha mais o tamanho de cada
+    objeto Python, contado uma vez por linha como em memory_usage(deep=True).
+    """
+    linhas = len(df)
+    total = 0
+    for coluna, tipo in df.dtypes.items():
+        if str(tipo) in TIPOS_INTEIROS or pd.api.types.is_float_dtype(tipo):
+            total += 8 * linhas
+        elif str(tipo) == 'boolean' and not df[coluna].hasnans:
+            total += linhas
+        elif str(tipo) == 'boolean' or not pd.api.types.is_numeric_dtype(tipo):
+            contagem = df[coluna].value_counts(dropna=False, sort=False)
+            # object guarda bool/str do Python, não os escalares do numpy
+            total += 8 * linhas + sum(sys.getsizeof(valor.item() if isinstance(valor, np.generic) else valor) * vezes
+                                      for valor, vezes in contagem.items())
+        else:
+            total += df[coluna].memory_usage(index=False, deep=True)
+    return total / 1024 ** 2
+
+
+def relatorio_memoria(tabelas: dict) -> None:
+    """Mostra a memória de cada tabela com os tipos inferidos e com o esquema."""
+    print(f"{'tabela':<14} {'inferido':>11} {'esquema':>11} {'redução':>8}")
+    for nome, df in tabelas.items():
+        antes, depois = memoria_sem_esquema_mb(df), memoria_mb(df)
+        reducao = 1 - depois / antes if antes else 0
+        print(f"{nome:<14} {antes:>9.1f}MB {depois:>9.1f}MB {reducao:>7.0%}")
@@ -0,0 +1,132 @@
+"""
+============================================
+PROJETO BIG DATA - CS:GO MATCHMAKING
+Estatísticas por Jogador (jogador_estatistica)
+============================================
+
+Kills, mortes, dano causado, headshots e rounds jogados de cada
+jogador, calculados no ETL em uma única passada vetorizada sobre
+evento_dano. Os relatórios de K/D e de top jogadores passam a ler uma
+linha por jogador em vez de agregar evento_dano inteiro.
+
+Definições (as mesmas das consultas de sql/03):
+- kills: eventos com o jogador como atacante e dano_hp >= DANO_KILL
+- mortes: eventos com o jogador como vítima e dano_hp >= DANO_KILL
+- dano_total: soma de dano_hp com o jogador como atacante
+- headshots: eventos com o jogador como atacante e hitbox = 'Head'
+- rounds_jogados: rounds distintos com algum evento de dano em que o
+  jogador foi atacante ou vítima
+
+Os eventos podem ser somados em blocos (modo streaming, paralelo e
+incremental): as contagens de cada bloco são acumuladas com
+np.bincount e os pares (jogador, round) ficam em uma chave int64
+única, para que um round dividido entre dois blocos conte uma vez só.
+
+Uso:
+    estatisticas = EstatisticasJogador()
+    for bloco in blocos_de_eventos:
+        estatisticas.adicionar(bloco)
+    tabela = estatisticas.tabela(jogadores['jogador_id'])
+"""
+
+import numpy as np
+import pandas as pd
+
+from armazenamento import ler_tabela_em_lotes
+from chaves import chave_composta
+
+# ============================================
+# CONFIGURAÇÕES
+# ============================================
+
+# Dano a partir do qual o evento conta como kill
+DANO_KILL = 100
+
+# Colunas de evento_dano usadas no cálculo
+COLUNAS_EVENTO_ESTATISTICA = ['round_id', 'atacante_id', 'vitima_id', 'dano_hp', 'hitbox']
+
+# Contagens somadas por jogador, na ordem das linhas de _totais
+CONTAGENS = ['kills', 'mortes', 'dano_total', 'headshots']
+
+# Base da chave (jogador_id, round_id): round_id é INTEGER, então cabe em 32 bits
+BASE_CHAVE_PAR = 2 ** 32
+
+
+# ============================================
+# ACUMULADOR
+# ============================================
+
+class EstatisticasJogador:
+    """Soma as estatísticas de blocos de evento_dano por jogador_id."""
+
+    def __init__(self):
+        self._totais = np.zeros((len(CONTAGENS), 0), dtype=np.int64)
+        self._pares = []
+        self._pares_compactados = 0
+
+    def adicionar(self, eventos: pd.DataFrame) -> None:
+        """Acumula um bloco de eventos (colunas de COLUNAS_EVENTO_ESTATISTICA)."""
+        if len(eventos) == 0:
+            return
+        # jogador_id nulo vira 0: a posição 0 dos totais é descartada no fim
+        atacante = pd.Series(eventos['atacante_id'], copy=False).to_numpy(dtype=np.int64, na_value=0)
+        vitima = pd.Series(eventos['vitima_id'], copy=False).to_numpy(dtype=np.int64, na_value=0)
+        dano = pd.Series(eventos['dano_hp'], copy=False).to_numpy(dtype=np.int64, na_value=0)
+        kill = dano >= DANO_KILL
+        headshot = (pd.Series(eventos['hitbox'], copy=False) == 'Head').to_numpy(dtype=bool, na_value=False)
+
+        tamanho = max(int(atacante.max()), int(vitima.max()), self._totais.shape[1] - 1) + 1
+        bloco = np.stack([
+            np.bincount(atacante, weights=kill, minlength=tamanho),
+            np.bincount(vitima, weights=kill, minlength=tamanho),
+            np.bincount(atacante, weights=dano, minlength=tamanho),
+            np.bincount(atacante, weights=headshot, minlength=tamanho),
+        ]).astype(np.int64)
+        bloco[:, :self._totais.shape[1]] += self._totais
+        self._totais = bloco
+
+        # Pares (jogador, round) distintos, dos dois lados do evento
+        pares = np.concatenate([
+            chave_composta(eventos['atacante_id'], eventos['round_id'], BASE_CHAVE_PAR),
+            chave_composta(eventos['vitima_id'], eventos['round_id'], BASE_CHAVE_PAR),
+        ])
+        self._pares.append(np.unique(pares[pares >= 0]))
+        # Junta os blocos quando dobram de tamanho: memória proporcional aos pares distintos
+        acumulados = sum(len(p) for p in self._pares)
+        if acumulados > 2 * self._pares_compactados:
+            self._pares = [np.unique(np.concatenate(self._pares))]
+            self._pares_compactados = len(self._pares[0])
+
+    def tabela(self, jogador_ids, anteriores: pd.DataFrame = None) -> pd.DataFrame:
+        """Tabela jogador_estatistica com uma linha por jogador de jogador_ids.
+
+        Com `anteriores` (a tabela já gravada), os valores acumulados são
+        somados aos dela: vale para a ingestão incremental, em que os
+        eventos novos são de demos novas e portanto de rounds novos.
+        """
+        ids = pd.Series(jogador_ids, copy=False).to_numpy(dtype=np.int64)
+        pares = np.unique(np.concatenate(self._pares)) if self._pares else np.empty(0, dtype=np.int64)
+        rounds = np.bincount(pares // BASE_CHAVE_PAR, minlength=self._totais.shape[1])
+        totais = np.vstack([self._totais, rounds[:self._totais.shape[1]]])
+
+        # Jogadores sem nenhum evento ficam com zero
+        dentro = ids < totais.shape[1]
+        valores = np.zeros((len(totais), len(ids)), dtype=np.int64)
+        valores[:, dentro] = totais[:, ids[dentro]]
+        tabela = pd.DataFrame(dict(zip(CONTAGENS + ['rounds_jogados'], valores)))
+        tabela.insert(0, 'jogador_id', ids)
+
+        if anteriores is not None and len(anteriores):
+            somar = tabela.columns[1:]
+            anteriores = anteriores.set_index('jogador_id')[somar].reindex(ids).fillna(0)
+            tabela[somar] += anteriores.to_numpy(dtype=np.int64)
+        return tabela
+
+
+def estatisticas_do_arquivo(pasta: str, jogador_ids, tamanho_lote: int = 1_000_000) -> pd.DataFrame:
+    """Calcula jogador_estatistica lendo evento_dano de pasta em lotes."""
+    estatisticas = EstatisticasJogador()
+    for lote in ler_tabela_em_lotes('evento_dano', pasta, colunas=COLUNAS_EVENTO_ESTATISTICA,
+                                    tamanho_lote=tamanho_lote):
+        estatisticas.adicionar(lote)
+    return estatisticas.tabela(jogador_ids)
@@ -7,7 +7,8 @@ Script ETL - Extração, Transformação e Carga
 Este script processa o arquivo CSV original e:
 1. Extrai entidades únicas (jogadores, mapas, armas)
 2. Transforma dados para modelo normalizado
-3. Gera arquivos CSV para cada tabela
+3. Gera um arquivo para cada tabela (CSV, Parquet ou Arrow;
+   ver FORMATO_TABELAS em armazenamento.py)
 4. (Opcional) Carrega dados no PostgreSQL
 
 Requisitos:
@@ -15,13 +16,40 @@ Requisitos:
 
 Uso:
     python etl_processar_dados.py
+
+Para arquivos de origem maiores que a memória disponível, ative
+MODO_STREAMING: o CSV é lido em blocos de TAMANHO_CHUNK linhas, duas
+vezes (dimensões e depois eventos), e evento_dano é gravado bloco a
+bloco. As tabelas e os IDs são os mesmos do modo em memória.
+
+Para usar vários núcleos, ative MODO_PARALELO: o CSV é dividido em
+fatias processadas por NUM_PROCESSOS processos, com os mesmos IDs do
+modo sequencial.
+
+Para ingerir apenas demos novas, ative MODO_INCREMENTAL: os IDs já
+atribuídos são mantidos e só as linhas de arquivos (`file`) ainda não
+presentes em partida são processadas e anexadas às saídas.
+
+Com GERAR_MAPAS_CALOR, grava também mapa_calor (mapas_calor.py): as
+posições de atacante e vítima agregadas em uma grade por mapa.
 """
 
+import numpy as np
 import pandas as pd
+import io
 import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
 from tqdm import tqdm
 
+from armazenamento import EscritorTabela, caminho_tabela, ler_tabela, ler_tabela_em_lotes, salvar_tabela
+from chaves import chave_composta, codificar, mapear_ids, primeiras_posicoes
+from esquema import TIPOS_ORIGINAL, aplicar_esquema, relatorio_memoria
+from estatisticas_jogador import EstatisticasJogador, estatisticas_do_arquivo
+from mapas_calor import gerar_mapas_calor
+
 # ============================================
 # CONFIGURAÇÕES
 # ============================================
@@ -30,6 +58,54 @@ from tqdm import tqdm
 CAMINHO_CSV_ORIGINAL = '../base_dados/mm_master_demos.csv'
 CAMINHO_SAIDA = '../base_dados/tabelas_normalizadas/'
 
+# Modo streaming: o pico de memória passa a depender de TAMANHO_CHUNK
+# (e dos dicionários de dimensões), não do tamanho do arquivo de origem
+MODO_STREAMING = False
+TAMANHO_CHUNK = 200_000
+
+# Modo incremental: mantém os IDs existentes e processa só demos novas
+MODO_INCREMENTAL = False
+
+# Modo paralelo: divide o CSV em fatias processadas por NUM_PROCESSOS
+# processos (FATIAS_POR_PROCESSO fatias por processo, para balancear)
+MODO_PARALELO = False
+NUM_PROCESSOS = os.cpu_count() or 4
+FATIAS_POR_PROCESSO = 2
+
+# Colunas do CSV original realmente usadas pelo ETL (tipos em esquema.py)
+COLUNAS_ORIGINAIS = list(TIPOS_ORIGINAL)
+
+# Mostrar a memória de cada tabela com e sem o esquema de tipos
+RELATORIO_MEMORIA = True
+
+# Gravar também a grade de posições por mapa (mapa_calor) ao final
+GERAR_MAPAS_CALOR = False
+
+# Colunas do evento_dano (origem -> destino)
+COLUNAS_EVENTO = {
+    'round_id': 'round_id',
+    'atacante_id': 'atacante_id',
+    'vitima_id': 'vitima_id',
+    'arma_id': 'arma_id',
+    'tick': 'tick',
+    'seconds': 'segundos',
+    'hp_dmg': 'dano_hp',
+    'arm_dmg': 'dano_armadura',
+    'hitbox': 'hitbox',
+    'is_bomb_planted': 'bomba_plantada',
+    'award': 'premio',
+    'att_pos_x': 'atacante_x',
+    'att_pos_y': 'atacante_y',
+    'vic_pos_x': 'vitima_x',
+    'vic_pos_y': 'vitima_y'
+}
+
+# Base da chave composta inteira (partida_id, numero) dos rounds
+BASE_CHAVE_ROUND = 1000
+
+# Threads que gravam as tabelas finais enquanto as próximas etapas rodam
+NUM_GRAVADORES = 2
+
 # Criar pasta de saída se não existir
 os.makedirs(CAMINHO_SAIDA, exist_ok=True)
 
@@ -41,7 +117,9 @@ def carregar_dados(caminho: str, nrows: int = None) -> pd.DataFrame:
     """Carrega o CSV original."""
     print(f"📂 Carregando dados de: {caminho}")
     
-    df = pd.read_csv(caminho, nrows=nrows)
+    # Tipos explícitos (esquema.TIPOS_ORIGINAL): steam_ids em Int64 não
+    # perdem precisão como em float64, e textos repetidos viram category
+    df = pd.read_csv(caminho, nrows=nrows, usecols=COLUNAS_ORIGINAIS, dtype=TIPOS_ORIGINAL)
     
     print(f"✅ Carregados {len(df):,} registros com {len(df.columns)} colunas")
     return df
@@ -51,18 +129,19 @@ def extrair_jogadores(df: pd.DataFrame) -> pd.DataFrame:
     """Extrai jogadores únicos do dataset."""
     print("👤 Extraindo jogadores únicos...")
     
-    # Combinar atacantes e vítimas
-    atacantes = df[['att_id', 'att_rank']].rename(columns={'att_id': 'steam_id', 'att_rank': 'rank_atual'})
-    vitimas = df[['vic_id', 'vic_rank']].rename(columns={'vic_id': 'steam_id', 'vic_rank': 'rank_atual'})
-    
-    # Concatenar e remover duplicatas (mantendo último rank conhecido)
-    jogadores = pd.concat([atacantes, vitimas])
-    jogadores = jogadores.drop_duplicates(subset=['steam_id'], keep='last')
-    jogadores = jogadores.dropna(subset=['steam_id'])
-    
-    # Adicionar ID sequencial
-    jogadores = jogadores.reset_index(drop=True)
-    jogadores.insert(0, 'jogador_id', range(1, len(jogadores) + 1))
+    # Combinar atacantes e vítimas (só as duas colunas, sem copiar o df)
+    steam_ids = pd.concat([df['att_id'], df['vic_id']], ignore_index=True)
+    ranks = pd.concat([df['att_rank'], df['vic_rank']], ignore_index=True)
+    
+    # Última ocorrência de cada jogador (mantendo último rank conhecido);
+    # rank_de_vitima guarda de que lado ele veio, para o modo incremental
+    ultimas = ~steam_ids.duplicated(keep='last').to_numpy() & steam_ids.notna().to_numpy()
+    jogadores = pd.DataFrame({
+        'jogador_id': np.arange(1, ultimas.sum() + 1),
+        'steam_id': steam_ids.array[ultimas],
+        'rank_atual': ranks.array[ultimas],
+        'rank_de_vitima': np.flatnonzero(ultimas) >= len(df),
+    })
     
     print(f"✅ Extraídos {len(jogadores):,} jogadores únicos")
     return jogadores
@@ -72,9 +151,8 @@ def extrair_mapas(df: pd.DataFrame) -> pd.DataFrame:
     """Extrai mapas únicos do dataset."""
     print("🗺️ Extraindo mapas únicos...")
     
-    mapas = df[['map']].drop_duplicates().rename(columns={'map': 'nome'})
-    mapas = mapas.reset_index(drop=True)
-    mapas.insert(0, 'mapa_id', range(1, len(mapas) + 1))
+    _, nomes = codificar(df['map'])
+    mapas = pd.DataFrame({'mapa_id': np.arange(1, len(nomes) + 1), 'nome': nomes})
     
     print(f"✅ Extraídos {len(mapas)} mapas únicos")
     return mapas
@@ -84,7 +162,13 @@ def extrair_armas(df: pd.DataFrame) -> pd.DataFrame:
     """Extrai armas únicas do dataset."""
     print("🔫 Extraindo armas únicas...")
     
-    armas = df[['wp', 'wp_type']].drop_duplicates().rename(columns={'wp': 'nome', 'wp_type': 'tipo'})
+    # Pares (nome, tipo) distintos por chave inteira dos dois códigos,
+    # na ordem de primeira aparição (como drop_duplicates)
+    codigos_nome, _ = codificar(df['wp'])
+    codigos_tipo, tipos = codificar(df['wp_type'])
+    codigos, _ = codificar(chave_composta(codigos_nome, codigos_tipo, max(1, len(tipos))))
+    
+    armas = df[['wp', 'wp_type']].iloc[primeiras_posicoes(codigos)].rename(columns={'wp': 'nome', 'wp_type': 'tipo'})
     armas = armas.dropna(subset=['nome'])
     armas = armas.reset_index(drop=True)
     armas.insert(0, 'arma_id', range(1, len(armas) + 1))
@@ -97,28 +181,18 @@ def extrair_partidas(df: pd.DataFrame, mapas: pd.DataFrame) -> pd.DataFrame:
     """Extrai partidas únicas do dataset."""
     print("🎮 Extraindo partidas únicas...")
     
-    # Criar mapeamento de mapa nome -> ID
-    mapa_dict = dict(zip(mapas['nome'], mapas['mapa_id']))
+    # Primeira linha de cada arquivo: o código do factorize já é o ID
+    codigos, arquivos = codificar(df['file'])
+    primeiras = df.iloc[primeiras_posicoes(codigos)]
     
-    # Extrair partidas únicas
-    partidas = df[['file', 'map', 'date', 'avg_match_rank']].drop_duplicates(subset=['file'])
-    partidas = partidas.rename(columns={
-        'file': 'arquivo_demo',
-        'date': 'data_hora',
-        'avg_match_rank': 'rank_medio'
+    partidas = pd.DataFrame({
+        'partida_id': np.arange(1, len(arquivos) + 1),
+        'arquivo_demo': arquivos,
+        'mapa_id': mapear_ids(primeiras['map'], mapas['nome'], mapas['mapa_id']),
+        'data_hora': primeiras['date'].array,
+        'rank_medio': primeiras['avg_match_rank'].array,
     })
     
-    # Converter mapa para ID
-    partidas['mapa_id'] = partidas['map'].map(mapa_dict)
-    partidas = partidas.drop(columns=['map'])
-    
-    # Adicionar ID sequencial
-    partidas = partidas.reset_index(drop=True)
-    partidas.insert(0, 'partida_id', range(1, len(partidas) + 1))
-    
-    # Reordenar colunas
-    partidas = partidas[['partida_id', 'arquivo_demo', 'mapa_id', 'data_hora', 'rank_medio']]
-    
     print(f"✅ Extraídas {len(partidas):,} partidas únicas")
     return partidas
 
@@ -127,94 +201,571 @@ def extrair_rounds(df: pd.DataFrame, partidas: pd.DataFrame) -> pd.DataFrame:
     """Extrai rounds únicos do dataset."""
     print("🔄 Extraindo rounds únicos...")
     
-    # Criar mapeamento de arquivo -> partida_id
-    partida_dict = dict(zip(partidas['arquivo_demo'], partidas['partida_id']))
-    
-    # Extrair rounds únicos
-    rounds = df[['file', 'round', 'round_type', 'winner_side', 'ct_eq_val', 't_eq_val']].drop_duplicates(
-        subset=['file', 'round']
-    )
-    rounds = rounds.rename(columns={
-        'round': 'numero',
-        'round_type': 'tipo',
-        'winner_side': 'vencedor_lado',
-        'ct_eq_val': 'ct_economia',
-        't_eq_val': 't_economia'
+    # Chave inteira (código do arquivo, numero) por linha; a primeira
+    # linha de cada chave define o round e a ordem de aparição, o round_id
+    codigos_arquivo, _ = codificar(df['file'])
+    codigos, chaves = codificar(chave_composta(codigos_arquivo, df['round'], BASE_CHAVE_ROUND))
+    primeiras = primeiras_posicoes(codigos)
+    
+    linhas = df[['file', 'round', 'round_type', 'winner_side', 'ct_eq_val', 't_eq_val']].iloc[primeiras]
+    
+    # Converter arquivo para partida_id (só nas linhas de cada round)
+    rounds = pd.DataFrame({
+        'round_id': np.arange(1, len(chaves) + 1),
+        'partida_id': mapear_ids(linhas['file'], partidas['arquivo_demo'], partidas['partida_id']),
+        'numero': linhas['round'].array,
+        'tipo': linhas['round_type'].array,
+        'vencedor_lado': linhas['winner_side'].array,
+        'ct_economia': linhas['ct_eq_val'].array,
+        't_economia': linhas['t_eq_val'].array,
     })
     
-    # Converter arquivo para partida_id
-    rounds['partida_id'] = rounds['file'].map(partida_dict)
-    rounds = rounds.drop(columns=['file'])
-    
-    # Adicionar ID sequencial
-    rounds = rounds.reset_index(drop=True)
-    rounds.insert(0, 'round_id', range(1, len(rounds) + 1))
-    
-    # Reordenar colunas
-    rounds = rounds[['round_id', 'partida_id', 'numero', 'tipo', 'vencedor_lado', 'ct_economia', 't_economia']]
-    
     print(f"✅ Extraídos {len(rounds):,} rounds únicos")
     return rounds
 
 
-def extrair_eventos(df: pd.DataFrame, rounds: pd.DataFrame, jogadores: pd.DataFrame, armas: pd.DataFrame) -> pd.DataFrame:
+def extrair_eventos(df: pd.DataFrame, rounds: pd.DataFrame, jogadores: pd.DataFrame, armas: pd.DataFrame,
+                    partidas: pd.DataFrame) -> pd.DataFrame:
     """Extrai eventos de dano com FKs corretas."""
     print("💥 Processando eventos de dano...")
     
-    # Criar dicionários de mapeamento
-    jogador_dict = dict(zip(jogadores['steam_id'], jogadores['jogador_id']))
-    arma_dict = dict(zip(armas['nome'], armas['arma_id']))
-    
-    # Criar chave composta para rounds
-    rounds['chave'] = rounds['partida_id'].astype(str) + '_' + rounds['numero'].astype(str)
-    
-    # Criar mapeamento de partida (precisa do arquivo_demo)
-    # Primeiro, recriar o mapeamento arquivo -> partida_id
-    partidas = pd.read_csv(f"{CAMINHO_SAIDA}partida.csv")
-    partida_dict = dict(zip(partidas['arquivo_demo'], partidas['partida_id']))
-    
-    # Adicionar partida_id ao df
-    df['partida_id_temp'] = df['file'].map(partida_dict)
-    df['chave_round'] = df['partida_id_temp'].astype(str) + '_' + df['round'].astype(str)
-    
-    round_dict = dict(zip(rounds['chave'], rounds['round_id']))
-    
-    # Processar eventos
-    eventos = df.copy()
-    eventos['round_id'] = eventos['chave_round'].map(round_dict)
-    eventos['atacante_id'] = eventos['att_id'].map(jogador_dict)
-    eventos['vitima_id'] = eventos['vic_id'].map(jogador_dict)
-    eventos['arma_id'] = eventos['wp'].map(arma_dict)
-    
-    # Selecionar e renomear colunas
-    eventos = eventos[[
-        'round_id', 'atacante_id', 'vitima_id', 'arma_id',
-        'tick', 'seconds', 'hp_dmg', 'arm_dmg', 'hitbox',
-        'is_bomb_planted', 'award', 'att_pos_x', 'att_pos_y', 'vic_pos_x', 'vic_pos_y'
-    ]].rename(columns={
-        'seconds': 'segundos',
-        'hp_dmg': 'dano_hp',
-        'arm_dmg': 'dano_armadura',
-        'is_bomb_planted': 'bomba_plantada',
-        'award': 'premio',
-        'att_pos_x': 'atacante_x',
-        'att_pos_y': 'atacante_y',
-        'vic_pos_x': 'vitima_x',
-        'vic_pos_y': 'vitima_y'
-    })
-    
-    # Adicionar ID sequencial
-    eventos = eventos.reset_index(drop=True)
-    eventos.insert(0, 'evento_id', range(1, len(eventos) + 1))
+    eventos = _mapear_eventos(df, rounds, jogadores, armas, partidas)
     
     print(f"✅ Processados {len(eventos):,} eventos")
     return eventos
 
 
+def _mapear_eventos(df: pd.DataFrame, rounds: pd.DataFrame, jogadores: pd.DataFrame, armas: pd.DataFrame,
+                    partidas: pd.DataFrame, primeiro_id: int = 1) -> pd.DataFrame:
+    """Monta as linhas de evento_dano, numeradas a partir de primeiro_id."""
+    # Mapeamento arquivo -> partida_id vindo direto da etapa de partidas
+    partida_id = mapear_ids(df['file'], partidas['arquivo_demo'], partidas['partida_id'])
+    
+    # Chaves inteiras dos rounds, dos dois lados
+    chave_evento = chave_composta(partida_id, df['round'], BASE_CHAVE_ROUND)
+    chave_round = chave_composta(rounds['partida_id'], rounds['numero'], BASE_CHAVE_ROUND)
+    
+    # Resolver as FKs por busca vetorizada (sem dicionários nem df.copy())
+    eventos = pd.DataFrame({
+        'evento_id': np.arange(primeiro_id, primeiro_id + len(df)),
+        'round_id': mapear_ids(chave_evento, chave_round, rounds['round_id']),
+        'atacante_id': mapear_ids(df['att_id'], jogadores['steam_id'], jogadores['jogador_id']),
+        'vitima_id': mapear_ids(df['vic_id'], jogadores['steam_id'], jogadores['jogador_id']),
+        'arma_id': mapear_ids(df['wp'], armas['nome'], armas['arma_id']),
+    })
+    for origem in list(COLUNAS_EVENTO)[4:]:
+        eventos[COLUNAS_EVENTO[origem]] = df[origem].array
+    return eventos
+
+
+def extrair_estatisticas_jogador(df: pd.DataFrame, eventos: pd.DataFrame, jogadores: pd.DataFrame) -> pd.DataFrame:
+    """Calcula kills, mortes, dano, headshots e rounds jogados por jogador."""
+    print("📈 Calculando estatísticas por jogador...")
+    
+    estatisticas = EstatisticasJogador()
+    estatisticas.adicionar(eventos)
+    tabela = estatisticas.tabela(jogadores['jogador_id'])
+    
+    print(f"✅ Estatísticas de {len(tabela):,} jogadores")
+    return tabela
+
+
+# ============================================
+# PIPELINE EM MEMÓRIA
+# ============================================
+
+# Etapas do ETL: tabela -> (função, tabelas de que depende). Cada função
+# recebe o DataFrame original seguido das tabelas das dependências.
+ETAPAS = {
+    'jogador': (extrair_jogadores, []),
+    'mapa': (extrair_mapas, []),
+    'arma': (extrair_armas, []),
+    'partida': (extrair_partidas, ['mapa']),
+    'round': (extrair_rounds, ['partida']),
+    'evento_dano': (extrair_eventos, ['round', 'jogador', 'arma', 'partida']),
+    'jogador_estatistica': (extrair_estatisticas_jogador, ['evento_dano', 'jogador']),
+}
+
+
+def executar_etapas(df: pd.DataFrame, gravar: bool = True) -> dict:
+    """Executa as etapas de ETAPAS respeitando as dependências.
+
+    As tabelas passam de uma etapa para outra em memória, já com os
+    tipos compactos de esquema.ESQUEMA_TABELAS. Assim que uma
+    etapa termina, a gravação da sua tabela é enviada a um pool de
+    NUM_GRAVADORES threads e a próxima etapa começa sem esperar o disco.
+    Retorna {tabela: DataFrame} depois que todas as gravações terminam.
+    """
+    tabelas = {}
+    pendentes = dict(ETAPAS)
+    with ThreadPoolExecutor(max_workers=NUM_GRAVADORES) as gravador:
+        gravacoes = []
+        while pendentes:
+            prontas = [nome for nome, (_, deps) in pendentes.items() if all(d in tabelas for d in deps)]
+            if not prontas:
+                raise ValueError(f"Dependências circulares entre: {', '.join(pendentes)}")
+            for nome in prontas:
+                funcao, deps = pendentes.pop(nome)
+                tabelas[nome] = aplicar_esquema(funcao(df, *(tabelas[d] for d in deps)), nome)
+                if gravar:
+                    gravacoes.append(gravador.submit(salvar_tabela, tabelas[nome], nome, CAMINHO_SAIDA))
+        for gravacao in gravacoes:
+            gravacao.result()
+    return tabelas
+
+
+# ============================================
+# DIMENSÕES POR PARTES
+# ============================================
+
+# Tabelas do CSV de onde saem as dimensões: tabela -> (colunas que
+# identificam a entidade, colunas guardadas da primeira ocorrência)
+PRIMEIRAS_OCORRENCIAS = {
+    'mapa': (['map'], ['map']),
+    'arma': (['wp', 'wp_type'], ['wp', 'wp_type']),
+    'partida': (['file'], ['file', 'map', 'date', 'avg_match_rank']),
+    'round': (['file', 'round'], ['file', 'round', 'round_type', 'winner_side', 'ct_eq_val', 't_eq_val']),
+}
+
+# Colunas do CSV lidas na passada de dimensões do modo streaming
+COLUNAS_DIMENSOES = [
+    coluna for coluna in COLUNAS_ORIGINAIS
+    if coluna in {'att_id', 'att_rank', 'vic_id', 'vic_rank'}
+    or any(coluna in guardar for _, guardar in PRIMEIRAS_OCORRENCIAS.values())
+]
+
+
+def _dimensoes_parciais(df: pd.DataFrame, indice: int) -> dict:
+    """Extrai as dimensões de um pedaço do CSV (fatia ou bloco).
+
+    Cada dimensão parcial guarda a posição (fatia, linha) das ocorrências
+    relevantes, para que a junção reproduza exatamente a ordem de
+    aparição do ETL em memória.
+    """
+    linha = np.arange(len(df))
+
+    parciais = {'linhas': len(df)}
+    for nome, (chave, guardar) in PRIMEIRAS_OCORRENCIAS.items():
+        primeiras = df[guardar].assign(fatia=indice, linha=linha).drop_duplicates(subset=chave)
+        parciais[nome] = primeiras
+
+    # Jogadores: última ocorrência na ordem [atacantes..., vítimas...]
+    # de extrair_jogadores, com o lado (0 = atacante, 1 = vítima)
+    steam_ids = pd.concat([df['att_id'], df['vic_id']], ignore_index=True)
+    ultimas = ~steam_ids.duplicated(keep='last').to_numpy() & steam_ids.notna().to_numpy()
+    parciais['jogador'] = pd.DataFrame({
+        'steam_id': steam_ids.array,
+        'rank_atual': pd.concat([df['att_rank'], df['vic_rank']], ignore_index=True).array,
+        'lado': np.repeat([0, 1], len(df)),
+        'fatia': indice,
+        'linha': np.concatenate([linha, linha]),
+    })[ultimas]
+    return parciais
+
+
+def _reduzir_parciais(parciais: list) -> dict:
+    """Junta dimensões parciais em uma só, sem atribuir IDs.
+
+    A ordenação por (fatia, linha) recoloca as ocorrências na ordem do
+    arquivo; de cada entidade fica a primeira ocorrência (a última, para
+    jogadores). O resultado é outra dimensão parcial, que pode ser
+    juntada de novo com as próximas.
+    """
+    def juntar(nome, chave, manter, ordem):
+        todas = pd.concat([p[nome] for p in parciais], ignore_index=True)
+        todas = todas.sort_values(ordem, kind='stable')
+        return todas.drop_duplicates(subset=chave, keep=manter).reset_index(drop=True)
+
+    reduzidas = {'linhas': sum(p['linhas'] for p in parciais)}
+    for nome, (chave, _) in PRIMEIRAS_OCORRENCIAS.items():
+        reduzidas[nome] = juntar(nome, chave, 'first', ['fatia', 'linha'])
+    reduzidas['jogador'] = juntar('jogador', ['steam_id'], 'last', ['lado', 'fatia', 'linha'])
+    return reduzidas
+
+
+def _chaves(df: pd.DataFrame, colunas: list) -> pd.MultiIndex:
+    """Chave (possivelmente composta) de cada linha, para comparar tabelas."""
+    return pd.MultiIndex.from_frame(df[colunas].astype(object))
+
+
+def _juntar_dimensoes(parciais: list, existentes: dict = None) -> dict:
+    """Junta as dimensões parciais e atribui os IDs globais.
+
+    Os IDs seguem a ordem de aparição no arquivo, então são os mesmos do
+    ETL em memória. Com `existentes` (modo incremental), jogador, mapa,
+    arma e partida já gravados mantêm seus IDs e ranks de acordo com
+    rank_de_vitima; só as entidades novas são numeradas, a partir do
+    maior ID atual. round traz apenas os rounds das partes, numerados a
+    partir de 1.
+    """
+    dims = _reduzir_parciais(parciais)
+    existentes = existentes or {}
+
+    def numerar(nome, novas, chave):
+        """Numera as linhas novas (de chave ainda não existente) após as atuais."""
+        anteriores = existentes.get(nome)
+        primeiro = 1
+        if anteriores is not None:
+            novas = novas[~_chaves(novas, chave).isin(_chaves(anteriores, chave))]
+            primeiro = int(anteriores[f'{nome}_id'].max()) + 1 if len(anteriores) else 1
+        novas = novas.reset_index(drop=True)
+        novas.insert(0, f'{nome}_id', np.arange(primeiro, primeiro + len(novas)))
+        return novas if anteriores is None else pd.concat([anteriores, novas], ignore_index=True)
+
+    jogadores = pd.DataFrame({
+        'steam_id': dims['jogador']['steam_id'],
+        'rank_atual': dims['jogador']['rank_atual'],
+        'rank_de_vitima': dims['jogador']['lado'] == 1,
+    })
+    anteriores = existentes.get('jogador')
+    if anteriores is not None and len(jogadores):
+        # O rank gravado só é substituído por um de vítima, ou por qualquer
+        # rank novo se era de atacante, como reprocessando todo o histórico.
+        # Saídas antigas, sem rank_de_vitima, tratam todo rank como de vítima
+        de_vitima = (anteriores['rank_de_vitima'].fillna(True).to_numpy(dtype=bool)
+                     if 'rank_de_vitima' in anteriores else np.ones(len(anteriores), dtype=bool))
+        posicoes = pd.Index(jogadores['steam_id']).get_indexer(anteriores['steam_id'])
+        novo_de_vitima = jogadores['rank_de_vitima'].to_numpy()[posicoes]
+        substituir = (posicoes >= 0) & (novo_de_vitima | ~de_vitima)
+        ranks = anteriores['rank_atual'].array.copy()
+        ranks[substituir] = jogadores['rank_atual'].array[posicoes[substituir]]
+        de_vitima[substituir] = novo_de_vitima[substituir]
+        existentes = {**existentes, 'jogador': anteriores.assign(rank_atual=ranks, rank_de_vitima=de_vitima)}
+    jogadores = numerar('jogador', jogadores, ['steam_id'])
+
+    mapas = numerar('mapa', dims['mapa'][['map']].rename(columns={'map': 'nome'}), ['nome'])
+
+    armas = dims['arma'].dropna(subset=['wp'])[['wp', 'wp_type']].rename(columns={'wp': 'nome', 'wp_type': 'tipo'})
+    armas = numerar('arma', armas, ['nome', 'tipo'])
+
+    linhas = dims['partida']
+    partidas = numerar('partida', pd.DataFrame({
+        'arquivo_demo': linhas['file'],
+        'mapa_id': mapear_ids(linhas['map'], mapas['nome'], mapas['mapa_id']),
+        'data_hora': linhas['date'],
+        'rank_medio': linhas['avg_match_rank'],
+    }), ['arquivo_demo'])
+
+    linhas = dims['round']
+    rounds = pd.DataFrame({
+        'round_id': np.arange(1, len(linhas) + 1),
+        'partida_id': mapear_ids(linhas['file'], partidas['arquivo_demo'], partidas['partida_id']),
+        'numero': linhas['round'],
+        'tipo': linhas['round_type'],
+        'vencedor_lado': linhas['winner_side'],
+        'ct_economia': linhas['ct_eq_val'],
+        't_economia': linhas['t_eq_val'],
+    })
+    return {'jogador': jogadores, 'mapa': mapas, 'arma': armas, 'partida': partidas, 'round': rounds}
+
+
+# ============================================
+# MODO STREAMING
+# ============================================
+
+def _ler_em_blocos(caminho: str, tamanho_chunk: int, colunas: list = COLUNAS_ORIGINAIS):
+    """Leitor do CSV original em blocos de tamanho_chunk linhas."""
+    return pd.read_csv(caminho, usecols=colunas, dtype=TIPOS_ORIGINAL, chunksize=tamanho_chunk)
+
+
+def _dimensoes_em_blocos(caminho: str, tamanho_chunk: int, ignorar: set = frozenset()) -> tuple:
+    """Primeira leitura: dimensões parciais do CSV inteiro, bloco a bloco.
+
+    Lê só COLUNAS_DIMENSOES; cada bloco é reduzido junto com o acumulado,
+    então a memória depende do número de entidades, não de linhas.
+    Linhas de arquivos em `ignorar` (demos já processadas) ficam de fora.
+    Retorna (dimensões parciais, linhas ignoradas por arquivo).
+    """
+    acumuladas = None
+    ignoradas = pd.Series(dtype='int64')
+    leitor = _ler_em_blocos(caminho, tamanho_chunk, COLUNAS_DIMENSOES)
+    for indice, chunk in enumerate(tqdm(leitor, desc="Dimensões", unit="bloco")):
+        if ignorar:
+            conhecidas = chunk['file'].isin(ignorar)
+            contagem = chunk.loc[conhecidas, 'file'].astype(object).value_counts()
+            ignoradas = ignoradas.add(contagem, fill_value=0).astype('int64')
+            chunk = chunk[~conhecidas]
+        parciais = _dimensoes_parciais(chunk, indice)
+        acumuladas = parciais if acumuladas is None else _reduzir_parciais([acumuladas, parciais])
+    return acumuladas, ignoradas
+
+
+def _eventos_em_blocos(caminho: str, tamanho_chunk: int, tabelas: dict, escritor: EscritorTabela,
+                       estatisticas: EstatisticasJogador, primeiro_id: int = 1, ignorar: set = frozenset()) -> None:
+    """Segunda leitura: grava evento_dano bloco a bloco com as dimensões finais."""
+    for chunk in tqdm(_ler_em_blocos(caminho, tamanho_chunk), desc="Eventos", unit="bloco"):
+        if ignorar:
+            chunk = chunk[~chunk['file'].isin(ignorar)]
+            if chunk.empty:
+                continue
+        eventos = _mapear_eventos(chunk, tabelas['round'], tabelas['jogador'], tabelas['arma'],
+                                  tabelas['partida'], primeiro_id + escritor.linhas)
+        escritor.escrever(eventos)
+        estatisticas.adicionar(eventos)
+
+
+def executar_etl_streaming(caminho: str, tamanho_chunk: int = TAMANHO_CHUNK) -> dict:
+    """Executa o ETL lendo o CSV original em blocos.
+
+    O CSV é lido duas vezes: a primeira leitura extrai as dimensões
+    (jogador_id depende da última ocorrência de cada jogador, que só é
+    conhecida no fim do arquivo) e a segunda grava evento_dano bloco a
+    bloco. Apenas as dimensões e um bloco ficam em memória, e as tabelas
+    são as mesmas do ETL em memória e do modo paralelo.
+    Retorna as dimensões finais e o total de eventos processados.
+    """
+    print(f"📂 Lendo {caminho} em blocos de {tamanho_chunk:,} linhas")
+
+    parciais, _ = _dimensoes_em_blocos(caminho, tamanho_chunk)
+    tabelas = _juntar_dimensoes([parciais])
+    estatisticas = EstatisticasJogador()
+    with EscritorTabela('evento_dano', CAMINHO_SAIDA) as escritor:
+        _eventos_em_blocos(caminho, tamanho_chunk, tabelas, escritor, estatisticas)
+    total_eventos = escritor.linhas
+
+    tabelas['jogador_estatistica'] = estatisticas.tabela(tabelas['jogador']['jogador_id'])
+    for nome, tabela in tabelas.items():
+        salvar_tabela(tabela, nome, CAMINHO_SAIDA)
+
+    print(f"✅ Processados {total_eventos:,} eventos em modo streaming")
+    tabelas['total_eventos'] = total_eventos
+    return tabelas
+
+
+# ============================================
+# MODO INCREMENTAL
+# ============================================
+
+def _maior_id(nome: str, coluna: str) -> int:
+    """Maior ID de uma tabela já gravada, lido em lotes (0 se vazia)."""
+    maior = 0
+    for lote in ler_tabela_em_lotes(nome, CAMINHO_SAIDA, colunas=[coluna]):
+        if len(lote):
+            maior = max(maior, int(lote[coluna].max()))
+    return maior
+
+
+def _carregar_dimensoes_existentes() -> dict:
+    """Lê as dimensões já gravadas, para reaproveitar os IDs.
+
+    Jogadores, mapas, armas e partidas voltam inteiros (são pequenos);
+    de rounds só é preciso saber o maior ID, já que rounds nunca se
+    repetem entre demos.
+    """
+    return {nome: ler_tabela(nome, CAMINHO_SAIDA) for nome in ('jogador', 'mapa', 'arma', 'partida')}
+
+
+def _verificar_demos_completas(linhas_por_arquivo: pd.Series, partidas: pd.DataFrame) -> None:
+    """Falha se uma demo já processada reaparece com mais linhas do que as gravadas.
+
+    O modo incremental pula por inteiro os arquivos que já estão em
+    partida, então as linhas novas de uma demo processada pela metade
+    seriam perdidas sem aviso. Compara as linhas de cada arquivo no CSV
+    com os eventos gravados da partida correspondente.
+    """
+    if linhas_por_arquivo.empty:
+        return
+    rounds = ler_tabela('round', CAMINHO_SAIDA, colunas=['round_id', 'partida_id'])
+    eventos_por_partida = pd.Series(dtype='int64')
+    for lote in ler_tabela_em_lotes('evento_dano', CAMINHO_SAIDA, colunas=['round_id']):
+        partida_id = mapear_ids(lote['round_id'], rounds['round_id'], rounds['partida_id'])
+        eventos_por_partida = eventos_por_partida.add(pd.Series(partida_id).value_counts(), fill_value=0)
+    partida_id = mapear_ids(linhas_por_arquivo.index, partidas['arquivo_demo'], partidas['partida_id'])
+    gravadas = eventos_por_partida.reindex(partida_id, fill_value=0)
+
+    incompletas = linhas_por_arquivo[linhas_por_arquivo.to_numpy() > gravadas.to_numpy()]
+    if len(incompletas):
+        exemplos = ', '.join(incompletas.index[:5])
+        raise ValueError(
+            f"{len(incompletas):,} demos já processadas reaparecem com linhas novas ({exemplos}). "
+            "O modo incremental só ingere demos inteiras: execute o ETL completo.")
+
+
+def executar_etl_incremental(caminho: str, tamanho_chunk: int = TAMANHO_CHUNK) -> dict:
+    """Processa apenas as demos que ainda não estão nas tabelas normalizadas.
+
+    A unidade de ingestão é a demo (`file`): um arquivo já presente em
+    partida é ignorado por inteiro. Se ele reaparece no CSV com mais
+    linhas do que as gravadas (lote que terminou no meio de uma demo),
+    a execução falha antes de gravar qualquer coisa.
+
+    Os mapeamentos steam_id→jogador_id, map→mapa_id, weapon→arma_id e
+    file→partida_id existentes são preservados; novos itens recebem IDs
+    a partir do maior ID atual. Rounds e eventos novos são anexados às
+    saídas e as dimensões são regravadas (com ranks atualizados), assim
+    como jogador_estatistica, somada às estatísticas dos eventos novos.
+    """
+    if not os.path.exists(caminho_tabela('partida', CAMINHO_SAIDA)):
+        print("⚠️ Nenhuma saída anterior encontrada: executando ETL completo em streaming")
+        return executar_etl_streaming(caminho, tamanho_chunk)
+
+    print(f"📂 Lendo {caminho} em blocos de {tamanho_chunk:,} linhas (modo incremental)")
+    existentes = _carregar_dimensoes_existentes()
+    arquivos_conhecidos = set(existentes['partida']['arquivo_demo'])
+    ultimo_evento = _maior_id('evento_dano', 'evento_id')
+    print(f"   {len(arquivos_conhecidos):,} partidas já processadas; último evento_id = {ultimo_evento:,}")
+
+    parciais, linhas_conhecidas = _dimensoes_em_blocos(caminho, tamanho_chunk, arquivos_conhecidos)
+    _verificar_demos_completas(linhas_conhecidas, existentes['partida'])
+    tabelas = _juntar_dimensoes([parciais], existentes)
+    tabelas['round']['round_id'] += _maior_id('round', 'round_id')
+
+    estatisticas = EstatisticasJogador()
+    with EscritorTabela('evento_dano', CAMINHO_SAIDA, anexar=True) as escritor:
+        _eventos_em_blocos(caminho, tamanho_chunk, tabelas, escritor, estatisticas,
+                           ultimo_evento + 1, arquivos_conhecidos)
+    novos_eventos = escritor.linhas
+
+    # Eventos novos são de demos novas (rounds novos): as estatísticas
+    # somam às anteriores; saídas antigas sem a tabela são recalculadas
+    if os.path.exists(caminho_tabela('jogador_estatistica', CAMINHO_SAIDA)):
+        anteriores = ler_tabela('jogador_estatistica', CAMINHO_SAIDA)
+        tabelas['jogador_estatistica'] = estatisticas.tabela(tabelas['jogador']['jogador_id'], anteriores)
+    else:
+        tabelas['jogador_estatistica'] = estatisticas_do_arquivo(CAMINHO_SAIDA, tabelas['jogador']['jogador_id'])
+    for nome in ('jogador', 'mapa', 'arma', 'partida', 'jogador_estatistica'):
+        salvar_tabela(tabelas[nome], nome, CAMINHO_SAIDA)
+    with EscritorTabela('round', CAMINHO_SAIDA, anexar=True) as escritor:
+        if len(tabelas['round']):
+            escritor.escrever(tabelas['round'])
+
+    print(f"✅ Partidas novas: {len(tabelas['partida']) - len(arquivos_conhecidos):,}")
+    print(f"✅ Rounds novos:   {len(tabelas['round']):,}")
+    print(f"✅ Eventos novos:  {novos_eventos:,}")
+    tabelas['total_eventos'] = novos_eventos
+    return tabelas
+
+
+# ============================================
+# MODO PARALELO
+# ============================================
+
+# Dimensões usadas pelos processos na fase de eventos (ver _iniciar_processo)
+_dimensoes_processo = {}
+
+
+def _fatias_do_arquivo(caminho: str, num_fatias: int) -> tuple:
+    """Divide o CSV em faixas de bytes que terminam em fim de linha.
+
+    Retorna (cabeçalho, [(início, fim), ...]). Supõe que nenhum campo
+    contém quebra de linha, como no dump original.
+    """
+    tamanho = os.path.getsize(caminho)
+    with open(caminho, 'rb') as arquivo:
+        cabecalho = arquivo.readline()
+        limites = [arquivo.tell()]
+        for i in range(1, num_fatias):
+            arquivo.seek(max(limites[-1], tamanho * i // num_fatias))
+            arquivo.readline()
+            limites.append(min(arquivo.tell(), tamanho))
+        limites.append(tamanho)
+    colunas = pd.read_csv(io.BytesIO(cabecalho), nrows=0).columns.tolist()
+    return colunas, [(inicio, fim) for inicio, fim in zip(limites, limites[1:]) if fim > inicio]
+
+
+def _ler_fatia(caminho: str, inicio: int, fim: int, colunas: list) -> pd.DataFrame:
+    """Lê uma faixa de bytes do CSV original como DataFrame."""
+    with open(caminho, 'rb') as arquivo:
+        arquivo.seek(inicio)
+        dados = arquivo.read(fim - inicio)
+    return pd.read_csv(io.BytesIO(dados), header=None, names=colunas, usecols=COLUNAS_ORIGINAIS,
+                       dtype=TIPOS_ORIGINAL)
+
+
+def _processar_fatia(indice: int, caminho: str, inicio: int, fim: int, colunas: list, pasta_temp: str) -> dict:
+    """Fase 1 (em um processo): lê a fatia e extrai dimensões parciais.
+
+    A fatia lida fica em disco para a fase 2.
+    """
+    df = _ler_fatia(caminho, inicio, fim, colunas)
+    df.to_pickle(os.path.join(pasta_temp, f"fatia_{indice}.pkl"))
+    return _dimensoes_parciais(df, indice)
+
+
+def _iniciar_processo(dimensoes: dict) -> None:
+    """Recebe as dimensões uma única vez por processo (não por fatia)."""
+    _dimensoes_processo.update(dimensoes)
+
+
+def _eventos_da_fatia(indice: int, pasta_temp: str, primeiro_id: int) -> pd.DataFrame:
+    """Fase 2 (em um processo): converte a fatia em linhas de evento_dano."""
+    caminho = os.path.join(pasta_temp, f"fatia_{indice}.pkl")
+    df = pd.read_pickle(caminho)
+    os.remove(caminho)
+    d = _dimensoes_processo
+    eventos = _mapear_eventos(df, d['round'], d['jogador'], d['arma'], d['partida'], primeiro_id)
+    # Conversão de tipos ainda no processo: o principal só grava
+    return aplicar_esquema(eventos, 'evento_dano')
+
+
+def executar_etl_paralelo(caminho: str, num_processos: int = None) -> dict:
+    """Executa o ETL em um pool de processos, fatiando o CSV original.
+
+    Fase 1: cada processo lê uma faixa de bytes do CSV e extrai as
+    dimensões parciais. As dimensões são juntadas no processo principal,
+    com IDs determinísticos (iguais aos do ETL sequencial).
+    Fase 2: cada processo converte sua fatia em eventos; as partes são
+    gravadas em ordem, com evento_id contínuo entre as fatias.
+    """
+    num_processos = num_processos or NUM_PROCESSOS
+    colunas, fatias = _fatias_do_arquivo(caminho, num_processos * FATIAS_POR_PROCESSO)
+    print(f"📂 Lendo {caminho} em {len(fatias)} fatias com {num_processos} processos")
+    pasta_temp = tempfile.mkdtemp(prefix='etl_fatias_')
+
+    try:
+        with ProcessPoolExecutor(max_workers=num_processos) as executor:
+            parciais = list(executor.map(
+                _processar_fatia, range(len(fatias)), [caminho] * len(fatias),
+                *zip(*fatias), [colunas] * len(fatias), [pasta_temp] * len(fatias)))
+        print(f"✅ Carregados {sum(p['linhas'] for p in parciais):,} registros")
+
+        print("🔗 Juntando dimensões das fatias...")
+        tabelas = _juntar_dimensoes(parciais)
+        with ThreadPoolExecutor(max_workers=NUM_GRAVADORES) as gravador:
+            gravacoes = [gravador.submit(salvar_tabela, tabela, nome, CAMINHO_SAIDA)
+                         for nome, tabela in tabelas.items()]
+
+            print("💥 Processando eventos de dano...")
+            primeiros_ids = np.cumsum([1] + [p['linhas'] for p in parciais])[:-1].tolist()
+            with ProcessPoolExecutor(max_workers=num_processos, initializer=_iniciar_processo,
+                                     initargs=(tabelas,)) as executor, \
+                    EscritorTabela('evento_dano', CAMINHO_SAIDA) as escritor:
+                partes = executor.map(_eventos_da_fatia, range(len(fatias)),
+                                      [pasta_temp] * len(fatias), primeiros_ids)
+                estatisticas = EstatisticasJogador()
+                for parte in tqdm(partes, total=len(fatias), desc="Fatias", unit="fatia"):
+                    escritor.escrever(parte)
+                    estatisticas.adicionar(parte)
+            tabelas['jogador_estatistica'] = estatisticas.tabela(tabelas['jogador']['jogador_id'])
+            gravacoes.append(gravador.submit(salvar_tabela, tabelas['jogador_estatistica'],
+                                             'jogador_estatistica', CAMINHO_SAIDA))
+            for gravacao in gravacoes:
+                gravacao.result()
+    finally:
+        shutil.rmtree(pasta_temp, ignore_errors=True)
+
+    print(f"✅ Processados {escritor.linhas:,} eventos")
+    tabelas['total_eventos'] = escritor.linhas
+    return tabelas
+
+
 # ============================================
 # FUNÇÃO PRINCIPAL
 # ============================================
 
+def imprimir_resumo(jogadores, mapas, armas, partidas, rounds, total_eventos):
+    """Imprime a contagem de linhas de cada tabela gerada."""
+    print("\n" + "=" * 50)
+    print("📊 RESUMO DA EXTRAÇÃO")
+    print("=" * 50)
+    print(f"  • Jogadores:    {len(jogadores):>10,}")
+    print(f"  • Mapas:        {len(mapas):>10,}")
+    print(f"  • Armas:        {len(armas):>10,}")
+    print(f"  • Partidas:     {len(partidas):>10,}")
+    print(f"  • Rounds:       {len(rounds):>10,}")
+    print(f"  • Eventos:      {total_eventos:>10,}")
+
+
 def main():
     """Executa o pipeline ETL completo."""
     print("=" * 50)
@@ -223,6 +774,25 @@ def main():
     
     inicio = datetime.now()
     
+    if MODO_INCREMENTAL:
+        executar_etl_incremental(CAMINHO_CSV_ORIGINAL, TAMANHO_CHUNK)
+        if GERAR_MAPAS_CALOR:
+            gerar_mapas_calor(CAMINHO_SAIDA)
+        print(f"\n⏱️ Tempo total: {datetime.now() - inicio}")
+        return
+    
+    if MODO_PARALELO or MODO_STREAMING:
+        if MODO_PARALELO:
+            tabelas = executar_etl_paralelo(CAMINHO_CSV_ORIGINAL, NUM_PROCESSOS)
+        else:
+            tabelas = executar_etl_streaming(CAMINHO_CSV_ORIGINAL, TAMANHO_CHUNK)
+        imprimir_resumo(tabelas['jogador'], tabelas['mapa'], tabelas['arma'],
+                        tabelas['partida'], tabelas['round'], tabelas['total_eventos'])
+        if GERAR_MAPAS_CALOR:
+            gerar_mapas_calor(CAMINHO_SAIDA)
+        print(f"\n⏱️ Tempo total: {datetime.now() - inicio}")
+        return
+    
     # 1. Carregar dados originais
     # Use nrows=10000 para teste, None para todos os dados
     df = carregar_dados(CAMINHO_CSV_ORIGINAL, nrows=None)
@@ -232,33 +802,23 @@ def main():
     print("📦 EXTRAÇÃO DE ENTIDADES")
     print("=" * 50)
     
-    jogadores = extrair_jogadores(df)
-    mapas = extrair_mapas(df)
-    armas = extrair_armas(df)
-    partidas = extrair_partidas(df, mapas)
-    rounds = extrair_rounds(df, partidas)
-    
-    # Salvar tabelas intermediárias para uso na extração de eventos
-    jogadores.to_csv(f"{CAMINHO_SAIDA}jogador.csv", index=False)
-    mapas.to_csv(f"{CAMINHO_SAIDA}mapa.csv", index=False)
-    armas.to_csv(f"{CAMINHO_SAIDA}arma.csv", index=False)
-    partidas.to_csv(f"{CAMINHO_SAIDA}partida.csv", index=False)
-    rounds.to_csv(f"{CAMINHO_SAIDA}round.csv", index=False)
+    # Etapas em memória; cada tabela é gravada em segundo plano
+    tabelas = executar_etapas(df)
     
-    # Extrair eventos (depende das outras tabelas)
-    eventos = extrair_eventos(df, rounds, jogadores, armas)
-    eventos.to_csv(f"{CAMINHO_SAIDA}evento_dano.csv", index=False)
+    if RELATORIO_MEMORIA:
+        print("\n" + "=" * 50)
+        print("🧠 MEMÓRIA POR TABELA")
+        print("=" * 50)
+        relatorio_memoria({'csv original': df, **tabelas})
     
     # 3. Resumo
-    print("\n" + "=" * 50)
-    print("📊 RESUMO DA EXTRAÇÃO")
-    print("=" * 50)
-    print(f"  • Jogadores:    {len(jogadores):>10,}")
-    print(f"  • Mapas:        {len(mapas):>10,}")
-    print(f"  • Armas:        {len(armas):>10,}")
-    print(f"  • Partidas:     {len(partidas):>10,}")
-    print(f"  • Rounds:       {len(rounds):>10,}")
-    print(f"  • Eventos:      {len(eventos):>10,}")
+    imprimir_resumo(tabelas['jogador'], tabelas['mapa'], tabelas['arma'],
+                    tabelas['partida'], tabelas['round'], len(tabelas['evento_dano']))
+    
+    # 4. Mapas de calor (lidos dos arquivos já gravados)
+    if GERAR_MAPAS_CALOR:
+        del df, tabelas
+        gerar_mapas_calor(CAMINHO_SAIDA)
     
     fim = datetime.now()
     print(f"\n⏱️ Tempo total: {fim - inicio}")
@@ -0,0 +1,164 @@
+"""
+============================================
+PROJETO BIG DATA - CS:GO MATCHMAKING
+Benchmark - Planos de vw_estatisticas_jogador
+============================================
+
+Compara, com EXPLAIN (ANALYZE, BUFFERS), a definição antiga da view
+vw_estatisticas_jogador (JOIN com "atacante_id OR vitima_id") com a
+atual (lado atacante e lado vítima agregados separadamente), em três
+usos típicos da view.
+
+Os planos completos e os tempos são gravados em PASTA_SAIDA, em um
+arquivo identificado pelo número de eventos do banco. Para comparar
+com 10x o volume real:
+    1. gerar_dados_sinteticos.py com EVENTOS_SINTETICOS = 9 * 955_466
+    2. python carregar_postgres.py
+    3. python explain_estatisticas_jogador.py
+
+Uso:
+    python explain_estatisticas_jogador.py
+"""
+
+import os
+import re
+from datetime import datetime
+
+import psycopg2
+from psycopg2 import errors
+
+from carregar_postgres import DB_CONFIG
+
+# ============================================
+# CONFIGURAÇÕES
+# ============================================
+
+PASTA_SAIDA = '../relatorio/planos/'
+
+# Limite de cada EXPLAIN ANALYZE (a definição antiga pode levar horas)
+TEMPO_LIMITE = '15min'
+
+# Definição anterior da view (JOIN com OR)
+SQL_ANTIGA = """
+SELECT
+    j.jogador_id,
+    j.steam_id,
+    j.rank_atual,
+    COUNT(CASE WHEN e.atacante_id = j.jogador_id AND e.dano_hp >= 100 THEN 1 END) as kills,
+    COUNT(CASE WHEN e.vitima_id = j.jogador_id AND e.dano_hp >= 100 THEN 1 END) as deaths,
+    SUM(CASE WHEN e.atacante_id = j.jogador_id THEN e.dano_hp ELSE 0 END) as dano_total
+FROM jogador j
+LEFT JOIN evento_dano e ON j.jogador_id = e.atacante_id OR j.jogador_id = e.vitima_id
+GROUP BY j.jogador_id, j.steam_id, j.rank_atual
+"""
+
+# Definição atual (sql/01_ddl_criar_tabelas.sql)
+SQL_NOVA = """
+SELECT
+    j.jogador_id,
+    j.steam_id,
+    j.rank_atual,
+    COALESCE(a.kills, 0) as kills,
+    COALESCE(m.deaths, 0) as deaths,
+    COALESCE(a.dano_total, 0) as dano_total
+FROM jogador j
+LEFT JOIN (
+    SELECT atacante_id,
+           COUNT(*) FILTER (WHERE dano_hp >= 100) as kills,
+           SUM(dano_hp) as dano_total
+    FROM evento_dano
+    WHERE atacante_id IS NOT NULL
+    GROUP BY atacante_id
+) a ON a.atacante_id = j.jogador_id
+LEFT JOIN (
+    SELECT vitima_id, COUNT(*) as deaths
+    FROM evento_dano
+    WHERE vitima_id IS NOT NULL AND dano_hp >= 100
+    GROUP BY vitima_id
+) m ON m.vitima_id = j.jogador_id
+"""
+
+# Usos medidos ({view} é substituído por cada definição)
+USOS = {
+    'view inteira': "SELECT * FROM ({view}) v",
+    'top 10 por kills': "SELECT * FROM ({view}) v ORDER BY kills DESC LIMIT 10",
+    'um jogador': "SELECT * FROM ({view}) v WHERE jogador_id = (SELECT MIN(jogador_id) FROM jogador)",
+}
+
+
+# ============================================
+# FUNÇÕES
+# ============================================
+
+def explicar(conn, consulta):
+    """EXPLAIN ANALYZE da consulta; retorna (plano em texto, ms) ou (None, None) se estourar o limite."""
+    cursor = conn.cursor()
+    try:
+        cursor.execute(f"SET statement_timeout = '{TEMPO_LIMITE}'")
+        cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS) {consulta}")
+        plano = '\n'.join(linha for linha, in cursor.fetchall())
+    except errors.QueryCanceled:
+        conn.rollback()
+        return None, None
+    finally:
+        cursor.close()
+    conn.rollback()
+    tempo = re.search(r'Execution Time: ([\d.]+) ms', plano)
+    return plano, float(tempo.group(1))
+
+
+def volume(conn):
+    """Número de eventos e de jogadores no banco."""
+    cursor = conn.cursor()
+    cursor.execute("SELECT (SELECT COUNT(*) FROM evento_dano), (SELECT COUNT(*) FROM jogador)")
+    eventos, jogadores = cursor.fetchone()
+    cursor.close()
+    return eventos, jogadores
+
+
+def main():
+    print("=" * 50)
+    print("⏱️ EXPLAIN ANALYZE - vw_estatisticas_jogador")
+    print("=" * 50)
+
+    # Mudar para diretório do script
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    os.makedirs(PASTA_SAIDA, exist_ok=True)
+
+    conn = psycopg2.connect(**DB_CONFIG)
+    eventos, jogadores = volume(conn)
+    print(f"📦 {eventos:,} eventos, {jogadores:,} jogadores")
+
+    linhas, planos = [], []
+    for uso, modelo in USOS.items():
+        tempos = {}
+        for versao, definicao in (('antiga', SQL_ANTIGA), ('nova', SQL_NOVA)):
+            print(f"🔄 {uso} ({versao})...")
+            plano, tempos[versao] = explicar(conn, modelo.format(view=definicao))
+            planos.append(f"--- {uso} ({versao}) ---\n{plano or f'Cancelado após {TEMPO_LIMITE}'}\n")
+        linhas.append((uso, tempos['antiga'], tempos['nova']))
+    conn.close()
+
+    tabela = [f"{'uso':<18} {'antiga (ms)':>14} {'nova (ms)':>12} {'ganho':>9}"]
+    for uso, antiga, nova in linhas:
+        ganho = f"{antiga / nova:,.1f}x" if antiga and nova else '-'
+        antiga = f"{antiga:,.1f}" if antiga is not None else f"> {TEMPO_LIMITE}"
+        nova = f"{nova:,.1f}" if nova is not None else f"> {TEMPO_LIMITE}"
+        tabela.append(f"{uso:<18} {antiga:>14} {nova:>12} {ganho:>9}")
+
+    print("\n" + "=" * 50)
+    print("📊 RESULTADOS")
+    print("=" * 50)
+    print('\n'.join(tabela))
+
+    caminho = os.path.join(PASTA_SAIDA, f"estatisticas_jogador_{eventos}_eventos.txt")
+    with open(caminho, 'w', encoding='utf-8') as arquivo:
+        arquivo.write(f"vw_estatisticas_jogador - {datetime.now():%Y-%m-%d %H:%M}\n")
+        arquivo.write(f"{eventos:,} eventos, {jogadores:,} jogadores\n\n")
+        arquivo.write('\n'.join(tabela) + '\n\n')
+        arquivo.write('\n'.join(planos))
+    print(f"\n📁 Planos salvos em: {os.path.abspath(caminho)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -13,27 +13,120 @@ Tabelas a complementar:
 - PARTIDA: 1.297 → 10.000+ (partidas fictícias)
 - ROUND: já OK (32.752)
 - JOGADOR: já OK (11.131)
-- EVENTO_DANO: já OK (955.466)
+- EVENTO_DANO: já OK (955.466); opcionalmente ampliada com
+  EVENTOS_SINTETICOS eventos para testes de carga (jogador_estatistica
+  é recalculada em seguida)
+
+Com SEMENTE definida, a saída é sempre a mesma: cada etapa (e cada
+fatia de partidas) usa um gerador NumPy próprio derivado da semente.
 """
 
+import numpy as np
 import pandas as pd
-import random
-from datetime import datetime, timedelta
 import os
+from concurrent.futures import ProcessPoolExecutor
+
+from armazenamento import EscritorTabela, ler_tabela, ler_tabela_em_lotes, salvar_tabela
+from chaves import mapear_ids
+from estatisticas_jogador import estatisticas_do_arquivo
 
 # Caminhos
 CAMINHO_TABELAS = '../base_dados/tabelas_normalizadas/'
 
+# Quantidade mínima de linhas em cada tabela complementada
+META_LINHAS = 10_000
+
+# Faixas dos números usados para diferenciar os nomes gerados
+FAIXA_NUMERO_MAPA = (1, 999)
+FAIXA_NUMERO_ARMA = (1, 9999)
+
+# Semente dos geradores aleatórios (None = nova semente a cada execução,
+# exibida no início para permitir repetir a geração)
+SEMENTE = None
+
+# Partidas e rounds são gerados em fatias de PARTIDAS_POR_FATIA partidas,
+# distribuídas entre NUM_PROCESSOS processos
+NUM_PROCESSOS = os.cpu_count() or 4
+PARTIDAS_POR_FATIA = 50_000
+
+# Data base das partidas fictícias
+DATA_BASE_PARTIDAS = '2017-10-01'
+
+# Tipos de round e lados vencedores sorteados nos rounds fictícios
+TIPOS_ROUND = ['PISTOL_ROUND', 'ECO', 'SEMI_ECO', 'SEMI_BUY', 'FULL_BUY', 'FORCE_BUY']
+LADOS = ['CounterTerrorist', 'Terrorist']
+
+# Eventos de dano sintéticos anexados a evento_dano (0 = não gera).
+# Ex.: 9 * 955_466 deixa a tabela com 10x o volume real
+EVENTOS_SINTETICOS = 0
+# Linhas geradas e gravadas por lote (limita a memória usada)
+TAMANHO_LOTE_EVENTOS = 1_000_000
+# Linhas reais guardadas como amostra para as distribuições condicionais
+TAMANHO_AMOSTRA_EVENTOS = 200_000
+
+
+# ============================================
+# GERAÇÃO VETORIZADA DE NOMES ÚNICOS
+# ============================================
+def gerar_nomes_unicos(partes, quantidade, existentes, rng):
+    """Gera `quantidade` nomes distintos concatenando uma opção de cada parte.
+
+    Cada nome corresponde a um índice inteiro no espaço de combinações.
+    Os índices são sorteados em lotes e deduplicados por hash como
+    inteiros; só os índices novos viram texto (de uma vez, por lote) e
+    são conferidos contra os nomes `existentes`. O tamanho de cada lote
+    cresce conforme o espaço de combinações livres diminui.
+    """
+    partes = [pd.array(list(parte), dtype='string') for parte in partes]
+    tamanhos = [len(parte) for parte in partes]
+    espaco = int(np.prod(tamanhos, dtype=np.float64))
+    existentes = pd.Index(pd.unique(pd.array(list(existentes), dtype='string')))
+    
+    livres = espaco - len(existentes)
+    if quantidade > livres:
+        raise ValueError(f"Só existem {espaco:,} combinações de nomes ({livres:,} livres) "
+                         f"para gerar {quantidade:,}: amplie as listas ou a faixa de números")
+    
+    sorteados = pd.Index([], dtype=np.int64)
+    nomes = []
+    aceitos = 0
+    while aceitos < quantidade:
+        faltam = quantidade - aceitos
+        disponiveis = max(1, livres - aceitos)
+        tamanho_lote = max(1_000, int(faltam * 1.2 * espaco / disponiveis))
+        
+        codigos = pd.unique(rng.integers(0, espaco, size=tamanho_lote))
+        codigos = codigos[~pd.Index(codigos).isin(sorteados)]
+        sorteados = sorteados.append(pd.Index(codigos))
+        
+        indices = np.unravel_index(codigos, tamanhos)
+        candidatos = partes[0].take(indices[0])
+        for parte, indice in zip(partes[1:], indices[1:]):
+            candidatos = candidatos + parte.take(indice)
+        candidatos = candidatos[~pd.Index(candidatos).isin(existentes)][:faltam]
+        nomes.append(candidatos)
+        aceitos += len(candidatos)
+    
+    if not nomes:
+        return pd.array([], dtype='string')
+    return pd.concat([pd.Series(lote) for lote in nomes], ignore_index=True).array
+
+
+def _numeros(faixa):
+    """Sufixos numéricos '_<n>' para toda a faixa (inclusive)."""
+    return [f"_{numero}" for numero in range(faixa[0], faixa[1] + 1)]
+
+
 # ============================================
 # GERAR MAPAS SINTÉTICOS
 # ============================================
-def gerar_mapas_sinteticos():
-    """Gera variações de mapas para atingir 10k+ linhas."""
+def gerar_mapas_sinteticos(rng=None):
+    """Gera variações de mapas para atingir META_LINHAS linhas."""
     print("🗺️ Gerando mapas sintéticos...")
+    rng = rng or np.random.default_rng()
     
     # Carregar mapas existentes
-    mapas_df = pd.read_csv(f"{CAMINHO_TABELAS}mapa.csv")
-    mapas_originais = mapas_df['nome'].tolist()
+    mapas_df = ler_tabela('mapa', CAMINHO_TABELAS)
     
     # Prefixos e sufixos para variações
     prefixos = ['de_', 'cs_', 'ar_', 'aim_', 'awp_', 'fy_', 'surf_', 'kz_', 'bhop_', 'ze_']
@@ -45,32 +138,20 @@ def gerar_mapas_sinteticos():
     sufixos = ['', '_v2', '_v3', '_classic', '_remake', '_2024', '_2025', '_pro', 
                '_ce', '_fixed', '_updated', '_final', '_beta', '_alpha', '_test']
     
-    # Gerar novos mapas
-    novos_mapas = []
-    mapa_id = len(mapas_originais) + 1
-    
-    while len(novos_mapas) + len(mapas_originais) < 10000:
-        prefixo = random.choice(prefixos)
-        tema = random.choice(temas)
-        sufixo = random.choice(sufixos)
-        
-        # Adicionar número aleatório para garantir unicidade
-        numero = random.randint(1, 999)
-        nome_mapa = f"{prefixo}{tema}{sufixo}_{numero}"
-        
-        if nome_mapa not in mapas_originais and nome_mapa not in [m['nome'] for m in novos_mapas]:
-            novos_mapas.append({
-                'mapa_id': mapa_id,
-                'nome': nome_mapa
-            })
-            mapa_id += 1
+    # Gerar novos mapas (número aleatório no final para garantir unicidade)
+    quantidade = max(0, META_LINHAS - len(mapas_df))
+    nomes = gerar_nomes_unicos([prefixos, temas, sufixos, _numeros(FAIXA_NUMERO_MAPA)],
+                               quantidade, mapas_df['nome'], rng)
+    novos_df = pd.DataFrame({
+        'mapa_id': np.arange(len(mapas_df) + 1, len(mapas_df) + quantidade + 1),
+        'nome': nomes
+    })
     
     # Combinar com originais
-    novos_df = pd.DataFrame(novos_mapas)
     mapas_final = pd.concat([mapas_df, novos_df], ignore_index=True)
     
     # Salvar
-    mapas_final.to_csv(f"{CAMINHO_TABELAS}mapa.csv", index=False)
+    salvar_tabela(mapas_final, 'mapa', CAMINHO_TABELAS)
     print(f"✅ Mapas: {len(mapas_df)} → {len(mapas_final)}")
     
     return mapas_final
@@ -79,13 +160,13 @@ def gerar_mapas_sinteticos():
 # ============================================
 # GERAR ARMAS SINTÉTICAS
 # ============================================
-def gerar_armas_sinteticas():
-    """Gera variações de armas para atingir 10k+ linhas."""
+def gerar_armas_sinteticas(rng=None):
+    """Gera variações de armas para atingir META_LINHAS linhas."""
     print("🔫 Gerando armas sintéticas...")
+    rng = rng or np.random.default_rng()
     
     # Carregar armas existentes
-    armas_df = pd.read_csv(f"{CAMINHO_TABELAS}arma.csv")
-    armas_originais = armas_df['nome'].tolist()
+    armas_df = ler_tabela('arma', CAMINHO_TABELAS)
     
     # Bases de armas e tipos
     bases_armas = ['AK', 'M4', 'AWP', 'Glock', 'USP', 'Deagle', 'P90', 'MP5', 'UMP',
@@ -102,31 +183,20 @@ def gerar_armas_sinteticas():
                  '-Silver', '-Diamond', '-Carbon', '-Camo', '-Urban', '-Desert']
     
     # Gerar novas armas
-    novas_armas = []
-    arma_id = len(armas_originais) + 1
-    
-    while len(novas_armas) + len(armas_originais) < 10000:
-        base = random.choice(bases_armas)
-        variante = random.choice(variantes)
-        tipo = random.choice(tipos)
-        numero = random.randint(1, 9999)
-        
-        nome_arma = f"{base}{variante}_{numero}"
-        
-        if nome_arma not in armas_originais and nome_arma not in [a['nome'] for a in novas_armas]:
-            novas_armas.append({
-                'arma_id': arma_id,
-                'nome': nome_arma,
-                'tipo': tipo
-            })
-            arma_id += 1
+    quantidade = max(0, META_LINHAS - len(armas_df))
+    nomes = gerar_nomes_unicos([bases_armas, variantes, _numeros(FAIXA_NUMERO_ARMA)],
+                               quantidade, armas_df['nome'], rng)
+    novas_df = pd.DataFrame({
+        'arma_id': np.arange(len(armas_df) + 1, len(armas_df) + quantidade + 1),
+        'nome': nomes,
+        'tipo': np.asarray(tipos)[rng.integers(0, len(tipos), size=quantidade)]
+    })
     
     # Combinar com originais
-    novas_df = pd.DataFrame(novas_armas)
     armas_final = pd.concat([armas_df, novas_df], ignore_index=True)
     
     # Salvar
-    armas_final.to_csv(f"{CAMINHO_TABELAS}arma.csv", index=False)
+    salvar_tabela(armas_final, 'arma', CAMINHO_TABELAS)
     print(f"✅ Armas: {len(armas_df)} → {len(armas_final)}")
     
     return armas_final
@@ -135,114 +205,314 @@ def gerar_armas_sinteticas():
 # ============================================
 # GERAR PARTIDAS SINTÉTICAS
 # ============================================
-def gerar_partidas_sinteticas(mapas_df):
-    """Gera partidas sintéticas para atingir 10k+ linhas."""
-    print("🎮 Gerando partidas sintéticas...")
-    
-    # Carregar partidas existentes
-    partidas_df = pd.read_csv(f"{CAMINHO_TABELAS}partida.csv")
+def gerar_partidas_sinteticas(primeiro_id, quantidade, mapas_validos, rng):
+    """Gera `quantidade` partidas fictícias com IDs a partir de primeiro_id."""
+    # Arquivo demo fictício
+    demos = pd.Series(rng.integers(100000000000000000, 999999999999999999, size=quantidade, endpoint=True))
+    sufixos = pd.Series(rng.integers(1000000000, 9999999999, size=quantidade, endpoint=True))
+    arquivos = 'synth_' + demos.astype('string') + '_' + sufixos.astype('string') + '.dem'
+    
+    # Data aleatória (até 365 dias, 23 horas e 59 minutos após DATA_BASE_PARTIDAS)
+    minutos = (rng.integers(0, 366, size=quantidade) * 1440
+               + rng.integers(0, 24, size=quantidade) * 60
+               + rng.integers(0, 60, size=quantidade))
+    datas = pd.Timestamp(DATA_BASE_PARTIDAS) + pd.to_timedelta(minutos, unit='min')
+    
+    return pd.DataFrame({
+        'partida_id': np.arange(primeiro_id, primeiro_id + quantidade),
+        'arquivo_demo': arquivos.array,
+        'mapa_id': rng.choice(mapas_validos, size=quantidade),
+        'data_hora': datas.strftime('%m/%d/%Y %I:%M:%S %p'),
+        'rank_medio': np.round(rng.uniform(5, 18, size=quantidade), 1),  # Rank médio (5-18)
+    })
+
+
+# ============================================
+# GERAR ROUNDS SINTÉTICOS
+# ============================================
+def gerar_rounds_sinteticos(partidas_ids, rng):
+    """Gera os rounds das partidas informadas (sem round_id).
+    
+    Tudo em colunas: o número de rounds de cada partida é sorteado de
+    uma vez, expandido com np.repeat e numerado com cumsum; tipo,
+    vencedor e economia são sorteados para todas as linhas juntas.
+    """
+    partidas_ids = np.asarray(partidas_ids)
+    
+    # Cada partida tem entre 16 e 30 rounds
+    num_rounds = rng.integers(16, 31, size=len(partidas_ids))
+    total = int(num_rounds.sum())
+    
+    # Número do round dentro da partida: posição global menos o início da partida
+    inicios = np.cumsum(num_rounds) - num_rounds
+    numeros = np.arange(total) - np.repeat(inicios, num_rounds) + 1
+    
+    # Tipo do round (rounds 1 e 16 são pistol)
+    codigos_tipo = rng.integers(len(TIPOS_ROUND), size=total)
+    codigos_tipo[(numeros == 1) | (numeros == 16)] = TIPOS_ROUND.index('PISTOL_ROUND')
+    
+    return pd.DataFrame({
+        'partida_id': np.repeat(partidas_ids, num_rounds),
+        'numero': numeros,
+        'tipo': pd.Categorical.from_codes(codigos_tipo, categories=TIPOS_ROUND),
+        'vencedor_lado': pd.Categorical.from_codes(rng.integers(len(LADOS), size=total), categories=LADOS),
+        'ct_economia': rng.integers(1000, 16001, size=total),
+        't_economia': rng.integers(1000, 16001, size=total),
+    })
+
+
+# ============================================
+# GERAÇÃO PARALELA DE PARTIDAS E ROUNDS
+# ============================================
+def _gerar_fatia(primeiro_id, quantidade, mapas_validos, semente):
+    """Partidas e rounds de uma fatia, com o gerador próprio da fatia."""
+    rng = np.random.default_rng(semente)
+    partidas = gerar_partidas_sinteticas(primeiro_id, quantidade, mapas_validos, rng)
+    rounds = gerar_rounds_sinteticos(partidas['partida_id'].to_numpy(), rng)
+    return partidas, rounds
+
+
+def gerar_partidas_e_rounds(mapas_df, semente, num_processos=None):
+    """Completa partida até META_LINHAS e gera os rounds das novas partidas.
+    
+    As novas partidas são divididas em fatias de PARTIDAS_POR_FATIA,
+    geradas em paralelo por um pool de processos. Cada fatia tem seu
+    próprio gerador, criado de semente.spawn(), e os resultados são
+    juntados na ordem das fatias: a saída depende só da semente, não do
+    número de processos nem da ordem em que as fatias terminam.
+    """
+    print("🎮 Gerando partidas e rounds sintéticos...")
+    num_processos = num_processos or NUM_PROCESSOS
+    
+    # Carregar tabelas existentes
+    partidas_df = ler_tabela('partida', CAMINHO_TABELAS)
+    rounds_df = ler_tabela('round', CAMINHO_TABELAS)
     
-    # Gerar novas partidas
-    novas_partidas = []
-    partida_id = len(partidas_df) + 1
+    # Usar apenas os 21 mapas originais para manter consistência
+    mapas_validos = mapas_df.loc[mapas_df['mapa_id'] <= 21, 'mapa_id'].to_numpy()
     
-    # Data base para novas partidas
-    data_base = datetime(2017, 10, 1)
+    quantidade = max(0, META_LINHAS - len(partidas_df))
+    inicios = list(range(0, quantidade, PARTIDAS_POR_FATIA))
+    tamanhos = [min(PARTIDAS_POR_FATIA, quantidade - inicio) for inicio in inicios]
+    primeiros_ids = [len(partidas_df) + 1 + inicio for inicio in inicios]
+    sementes = semente.spawn(len(inicios))
+    argumentos = (primeiros_ids, tamanhos, [mapas_validos] * len(inicios), sementes)
     
-    # Usar apenas os 21 mapas originais para manter consistência
-    mapas_validos = mapas_df[mapas_df['mapa_id'] <= 21]['mapa_id'].tolist()
+    if num_processos > 1 and len(inicios) > 1:
+        with ProcessPoolExecutor(max_workers=num_processos) as executor:
+            fatias = list(executor.map(_gerar_fatia, *argumentos))
+    else:
+        fatias = list(map(_gerar_fatia, *argumentos))
     
-    while len(novas_partidas) + len(partidas_df) < 10000:
-        # Gerar arquivo demo fictício
-        arquivo_demo = f"synth_{random.randint(100000000000000000, 999999999999999999)}_{random.randint(1000000000, 9999999999)}.dem"
-        
-        # Mapa aleatório (dos originais)
-        mapa_id = random.choice(mapas_validos)
-        
-        # Data aleatória
-        dias_offset = random.randint(0, 365)
-        horas_offset = random.randint(0, 23)
-        minutos_offset = random.randint(0, 59)
-        data_hora = data_base + timedelta(days=dias_offset, hours=horas_offset, minutes=minutos_offset)
-        
-        # Rank médio (1-18)
-        rank_medio = round(random.uniform(5, 18), 1)
-        
-        novas_partidas.append({
-            'partida_id': partida_id,
-            'arquivo_demo': arquivo_demo,
-            'mapa_id': mapa_id,
-            'data_hora': data_hora.strftime('%m/%d/%Y %I:%M:%S %p'),
-            'rank_medio': rank_medio
-        })
-        partida_id += 1
+    novas_partidas = [partidas for partidas, _ in fatias]
+    novos_rounds = pd.concat([rounds for _, rounds in fatias] or [pd.DataFrame()], ignore_index=True)
+    novos_rounds.insert(0, 'round_id', np.arange(len(rounds_df) + 1, len(rounds_df) + len(novos_rounds) + 1))
     
     # Combinar com originais
-    novas_df = pd.DataFrame(novas_partidas)
-    partidas_final = pd.concat([partidas_df, novas_df], ignore_index=True)
+    partidas_final = pd.concat([partidas_df, *novas_partidas], ignore_index=True)
+    rounds_final = pd.concat([rounds_df, novos_rounds], ignore_index=True)
     
     # Salvar
-    partidas_final.to_csv(f"{CAMINHO_TABELAS}partida.csv", index=False)
-    print(f"✅ Partidas: {len(partidas_df)} → {len(partidas_final)}")
+    salvar_tabela(partidas_final, 'partida', CAMINHO_TABELAS)
+    salvar_tabela(rounds_final, 'round', CAMINHO_TABELAS)
+    print(f"✅ Partidas: {len(partidas_df)} → {len(partidas_final)} ({len(inicios)} fatias)")
+    print(f"✅ Rounds: {len(rounds_df)} → {len(rounds_final)}")
     
-    return partidas_final
+    return partidas_final, rounds_final
 
 
 # ============================================
-# GERAR ROUNDS SINTÉTICOS
+# GERAR EVENTOS DE DANO SINTÉTICOS
 # ============================================
-def gerar_rounds_sinteticos(partidas_novas_ids):
-    """Gera rounds para as novas partidas."""
-    print("🔄 Gerando rounds sintéticos...")
-    
-    # Carregar rounds existentes
-    rounds_df = pd.read_csv(f"{CAMINHO_TABELAS}round.csv")
-    
-    # Tipos de round
-    tipos_round = ['PISTOL_ROUND', 'ECO', 'SEMI_ECO', 'SEMI_BUY', 'FULL_BUY', 'FORCE_BUY']
-    lados = ['CounterTerrorist', 'Terrorist']
-    
-    novos_rounds = []
-    round_id = len(rounds_df) + 1
-    
-    for partida_id in partidas_novas_ids:
-        # Cada partida tem entre 16 e 30 rounds
-        num_rounds = random.randint(16, 30)
+
+# Colunas de evento_dano guardadas na amostra das linhas reais
+COLUNAS_AMOSTRA = ['round_id', 'arma_id', 'hitbox', 'dano_hp', 'dano_armadura', 'premio', 'tick',
+                   'segundos', 'bomba_plantada', 'atacante_x', 'atacante_y', 'vitima_x', 'vitima_y']
+
+
+def _somar_contagens(acumulado, contagens):
+    """Soma contagens por valor (value_counts) de lotes diferentes."""
+    if acumulado is None:
+        return contagens
+    return acumulado.add(contagens, fill_value=0)
+
+
+def _frequencias(contagens):
+    """(valores, probabilidades) a partir de contagens por valor."""
+    contagens = contagens[contagens > 0]
+    return contagens.index.to_numpy(), (contagens / contagens.sum()).to_numpy(dtype=np.float64)
+
+
+def medir_distribuicoes_eventos(rounds_df, partidas_df, rng):
+    """Percorre evento_dano em lotes e resume as distribuições reais.
+    
+    Guarda contagens exatas de eventos por round, hitbox e arma, a
+    proporção de eventos sem atacante e uma amostra uniforme de
+    TAMANHO_AMOSTRA_EVENTOS linhas (cada linha recebe uma chave
+    aleatória e ficam as menores), usada para sortear dano por hitbox,
+    prêmio por arma e posições por mapa. A memória não depende do
+    tamanho da tabela.
+    """
+    print("📐 Medindo distribuições de evento_dano...")
+    por_round = hitboxes = armas = None
+    amostra, chaves = None, None
+    total = sem_atacante = maior_id = 0
+    
+    for lote in ler_tabela_em_lotes('evento_dano', CAMINHO_TABELAS, tamanho_lote=TAMANHO_LOTE_EVENTOS):
+        total += len(lote)
+        sem_atacante += int(lote['atacante_id'].isna().sum())
+        maior_id = max(maior_id, int(lote['evento_id'].max()))
+        por_round = _somar_contagens(por_round, lote['round_id'].value_counts())
+        hitboxes = _somar_contagens(hitboxes, lote['hitbox'].astype('string').value_counts())
+        armas = _somar_contagens(armas, lote['arma_id'].value_counts())
         
-        for numero in range(1, num_rounds + 1):
-            # Tipo do round
-            if numero in [1, 16]:  # Rounds pistol
-                tipo = 'PISTOL_ROUND'
-            else:
-                tipo = random.choice(tipos_round)
-            
-            # Vencedor
-            vencedor = random.choice(lados)
-            
-            # Economia
-            ct_eco = random.randint(1000, 16000)
-            t_eco = random.randint(1000, 16000)
+        lote = lote[COLUNAS_AMOSTRA]
+        chaves_lote = rng.random(len(lote))
+        if amostra is not None:
+            lote = pd.concat([amostra, lote], ignore_index=True)
+            chaves_lote = np.concatenate([chaves, chaves_lote])
+        if len(lote) > TAMANHO_AMOSTRA_EVENTOS:
+            menores = np.sort(np.argpartition(chaves_lote, TAMANHO_AMOSTRA_EVENTOS)[:TAMANHO_AMOSTRA_EVENTOS])
+            lote, chaves_lote = lote.iloc[menores].reset_index(drop=True), chaves_lote[menores]
+        amostra, chaves = lote, chaves_lote
+    
+    if not total:
+        raise ValueError("evento_dano está vazia: não há distribuições para imitar")
+    
+    # Mapa de cada round (round → partida → mapa)
+    mapa_por_round = mapear_ids(rounds_df['partida_id'], partidas_df['partida_id'], partidas_df['mapa_id'])
+    amostra['mapa_id'] = mapear_ids(amostra['round_id'], rounds_df['round_id'], mapa_por_round)
+    
+    categorias_hitbox, prob_hitbox = _frequencias(hitboxes)
+    amostra['hitbox_codigo'] = pd.Categorical(amostra['hitbox'].astype('string'),
+                                              categories=categorias_hitbox).codes
+    
+    print(f"✅ {total:,} eventos em {len(por_round):,} rounds; amostra de {len(amostra):,} linhas")
+    return {
+        'maior_id': maior_id,
+        'eventos_por_round': _frequencias(por_round.value_counts()),
+        'rounds_com_eventos': por_round.index.to_numpy(),
+        'hitbox': (categorias_hitbox, prob_hitbox),
+        'arma': _frequencias(armas),
+        'prob_sem_atacante': sem_atacante / total,
+        'amostra': amostra,
+    }
+
+
+def _agrupar(grupos):
+    """Índice para sortear linhas da amostra dentro de cada grupo."""
+    grupos = np.asarray(grupos, dtype=np.int64)
+    ordem = np.argsort(grupos, kind='stable')
+    valores, inicio, contagem = np.unique(grupos[ordem], return_index=True, return_counts=True)
+    return ordem, valores, inicio, contagem
+
+
+def _sortear_no_grupo(agrupamento, alvos, rng):
+    """Para cada alvo, posição de uma linha da amostra do mesmo grupo.
+    
+    Alvos cujo grupo não aparece na amostra recebem uma linha qualquer.
+    """
+    ordem, valores, inicio, contagem = agrupamento
+    posicao = np.minimum(np.searchsorted(valores, alvos), len(valores) - 1)
+    achou = valores[posicao] == alvos
+    sorteio = rng.random(len(alvos))
+    dentro = inicio[posicao] + (sorteio * contagem[posicao]).astype(np.int64)
+    qualquer = (sorteio * len(ordem)).astype(np.int64)
+    return ordem[np.where(achou, dentro, qualquer)]
+
+
+def _rounds_dos_eventos(ordem_rounds, eventos_por_round, quantidade, rng):
+    """Posição do round de cada evento, em lotes de até TAMANHO_LOTE_EVENTOS.
+    
+    Os rounds são percorridos em ordem circular; cada passagem sorteia
+    quantos eventos o round recebe (distribuição real de eventos por
+    round) e os expande com np.repeat.
+    """
+    valores, probabilidades = eventos_por_round
+    media = float(np.dot(valores, probabilidades))
+    cursor, sobra, gerados = 0, np.empty(0, dtype=np.int64), 0
+    while gerados < quantidade:
+        tamanho = min(TAMANHO_LOTE_EVENTOS, quantidade - gerados)
+        partes = [sobra]
+        disponiveis = len(sobra)
+        while disponiveis < tamanho:
+            num_rounds = int((tamanho - disponiveis) / media) + 1
+            posicoes = np.arange(cursor, cursor + num_rounds) % len(ordem_rounds)
+            contagens = rng.choice(valores, size=num_rounds, p=probabilidades)
+            partes.append(np.repeat(ordem_rounds[posicoes], contagens))
+            disponiveis += int(contagens.sum())
+            cursor = (cursor + num_rounds) % len(ordem_rounds)
+        fila = np.concatenate(partes)
+        yield fila[:tamanho]
+        sobra = fila[tamanho:]
+        gerados += tamanho
+
+
+def gerar_eventos_sinteticos(quantidade, rounds_df, partidas_df, jogadores_df, rng=None):
+    """Anexa `quantidade` eventos de dano sintéticos a evento_dano.
+    
+    Os eventos imitam as distribuições reais: eventos por round,
+    frequência de hitbox e de armas, dano por hitbox, prêmio por arma e
+    posições (com tick e segundos) por mapa. Cada lote é gerado com
+    NumPy e gravado em seguida, então a memória fica limitada a
+    TAMANHO_LOTE_EVENTOS linhas mais a amostra.
+    
+    Os rounds ainda sem eventos (sintéticos) são preenchidos primeiro;
+    depois os rounds são reaproveitados em ordem circular.
+    """
+    rng = rng or np.random.default_rng()
+    dist = medir_distribuicoes_eventos(rounds_df, partidas_df, rng)
+    print(f"💥 Gerando {quantidade:,} eventos de dano sintéticos...")
+    
+    amostra = dist['amostra']
+    por_hitbox = _agrupar(amostra['hitbox_codigo'])
+    por_arma = _agrupar(amostra['arma_id'].fillna(-1))
+    por_mapa = _agrupar(amostra['mapa_id'].fillna(-1))
+    categorias_hitbox, prob_hitbox = dist['hitbox']
+    armas, prob_armas = dist['arma']
+    
+    round_ids = rounds_df['round_id'].to_numpy(dtype=np.int64)
+    mapa_por_round = mapear_ids(rounds_df['partida_id'], partidas_df['partida_id'], partidas_df['mapa_id'])
+    mapa_por_round = mapa_por_round.to_numpy(dtype=np.int64, na_value=-1)
+    com_eventos = np.isin(round_ids, dist['rounds_com_eventos'])
+    ordem_rounds = np.concatenate([np.flatnonzero(~com_eventos), np.flatnonzero(com_eventos)])
+    jogador_ids = jogadores_df['jogador_id'].to_numpy(dtype=np.int64)
+    
+    proximo_id = dist['maior_id'] + 1
+    lotes = _rounds_dos_eventos(ordem_rounds, dist['eventos_por_round'], quantidade, rng)
+    with EscritorTabela('evento_dano', CAMINHO_TABELAS, anexar=True) as escritor:
+        for rounds_lote in lotes:
+            tamanho = len(rounds_lote)
+            hitbox = rng.choice(len(categorias_hitbox), size=tamanho, p=prob_hitbox)
+            arma = rng.choice(armas, size=tamanho, p=prob_armas)
+            linha_dano = _sortear_no_grupo(por_hitbox, hitbox, rng)
+            linha_arma = _sortear_no_grupo(por_arma, arma, rng)
+            linha_mapa = _sortear_no_grupo(por_mapa, mapa_por_round[rounds_lote], rng)
+            sem_atacante = rng.random(tamanho) < dist['prob_sem_atacante']
             
-            novos_rounds.append({
-                'round_id': round_id,
-                'partida_id': partida_id,
-                'numero': numero,
-                'tipo': tipo,
-                'vencedor_lado': vencedor,
-                'ct_economia': ct_eco,
-                't_economia': t_eco
+            lote = pd.DataFrame({
+                'evento_id': np.arange(proximo_id, proximo_id + tamanho),
+                'round_id': round_ids[rounds_lote],
+                'atacante_id': pd.arrays.IntegerArray(rng.choice(jogador_ids, size=tamanho), sem_atacante),
+                'vitima_id': rng.choice(jogador_ids, size=tamanho),
+                'arma_id': arma,
+                'tick': amostra['tick'].array.take(linha_mapa),
+                'segundos': amostra['segundos'].array.take(linha_mapa),
+                'dano_hp': amostra['dano_hp'].array.take(linha_dano),
+                'dano_armadura': amostra['dano_armadura'].array.take(linha_dano),
+                'hitbox': categorias_hitbox[hitbox],
+                'bomba_plantada': amostra['bomba_plantada'].array.take(linha_mapa),
+                'premio': amostra['premio'].array.take(linha_arma),
+                'atacante_x': amostra['atacante_x'].array.take(linha_mapa),
+                'atacante_y': amostra['atacante_y'].array.take(linha_mapa),
+                'vitima_x': amostra['vitima_x'].array.take(linha_mapa),
+                'vitima_y': amostra['vitima_y'].array.take(linha_mapa),
             })
-            round_id += 1
-    
-    # Combinar com originais
-    novos_df = pd.DataFrame(novos_rounds)
-    rounds_final = pd.concat([rounds_df, novos_df], ignore_index=True)
+            escritor.escrever(lote)
+            proximo_id += tamanho
+            print(f"   💾 {escritor.linhas:,} / {quantidade:,} eventos gravados")
     
-    # Salvar
-    rounds_final.to_csv(f"{CAMINHO_TABELAS}round.csv", index=False)
-    print(f"✅ Rounds: {len(rounds_df)} → {len(rounds_final)}")
-    
-    return rounds_final
+    print(f"✅ Eventos de dano: {dist['maior_id']:,} → {proximo_id - 1:,} (maior evento_id)")
 
 
 # ============================================
@@ -256,36 +526,42 @@ def main():
     # Mudar para diretório do script
     os.chdir(os.path.dirname(os.path.abspath(__file__)))
     
-    # Gerar dados
-    mapas_final = gerar_mapas_sinteticos()
-    armas_final = gerar_armas_sinteticas()
-    
-    # Carregar partidas originais para saber o último ID
-    partidas_orig = pd.read_csv(f"{CAMINHO_TABELAS}partida.csv")
-    ultimo_id_original = len(partidas_orig)
+    # Um gerador independente para cada etapa, todos derivados da semente
+    raiz = np.random.SeedSequence(SEMENTE)
+    print(f"🎲 Semente: {raiz.entropy}")
+    semente_mapas, semente_armas, semente_partidas, semente_eventos = raiz.spawn(4)
     
-    partidas_final = gerar_partidas_sinteticas(mapas_final)
+    # Gerar dados
+    mapas_final = gerar_mapas_sinteticos(np.random.default_rng(semente_mapas))
+    armas_final = gerar_armas_sinteticas(np.random.default_rng(semente_armas))
+    partidas_final, rounds_final = gerar_partidas_e_rounds(mapas_final, semente_partidas)
     
-    # IDs das novas partidas
-    novas_partidas_ids = list(range(ultimo_id_original + 1, len(partidas_final) + 1))
+    jogador_df = ler_tabela('jogador', CAMINHO_TABELAS)
     
-    # Gerar rounds para novas partidas
-    rounds_final = gerar_rounds_sinteticos(novas_partidas_ids)
+    # Eventos de dano para testes de carga
+    if EVENTOS_SINTETICOS > 0:
+        gerar_eventos_sinteticos(EVENTOS_SINTETICOS, rounds_final, partidas_final, jogador_df,
+                                 np.random.default_rng(semente_eventos))
+        # Os eventos sintéticos reaproveitam rounds: recalcula tudo a partir do arquivo
+        print("📈 Recalculando estatísticas por jogador...")
+        salvar_tabela(estatisticas_do_arquivo(CAMINHO_TABELAS, jogador_df['jogador_id']),
+                      'jogador_estatistica', CAMINHO_TABELAS)
     
     # Resumo final
     print("\n" + "=" * 50)
     print("📊 RESUMO FINAL")
     print("=" * 50)
     
-    jogador_df = pd.read_csv(f"{CAMINHO_TABELAS}jogador.csv")
-    evento_df = pd.read_csv(f"{CAMINHO_TABELAS}evento_dano.csv")
+    # Contagem em lotes: evento_dano pode não caber na memória
+    total_eventos = sum(len(lote) for lote in ler_tabela_em_lotes('evento_dano', CAMINHO_TABELAS,
+                                                                  colunas=['evento_id']))
     
-    print(f"  • JOGADOR:     {len(jogador_df):>10,} linhas {'✅' if len(jogador_df) >= 10000 else '⚠️'}")
-    print(f"  • MAPA:        {len(mapas_final):>10,} linhas {'✅' if len(mapas_final) >= 10000 else '⚠️'}")
-    print(f"  • ARMA:        {len(armas_final):>10,} linhas {'✅' if len(armas_final) >= 10000 else '⚠️'}")
-    print(f"  • PARTIDA:     {len(partidas_final):>10,} linhas {'✅' if len(partidas_final) >= 10000 else '⚠️'}")
-    print(f"  • ROUND:       {len(rounds_final):>10,} linhas {'✅' if len(rounds_final) >= 10000 else '⚠️'}")
-    print(f"  • EVENTO_DANO: {len(evento_df):>10,} linhas {'✅' if len(evento_df) >= 10000 else '⚠️'}")
+    print(f"  • JOGADOR:     {len(jogador_df):>10,} linhas {'✅' if len(jogador_df) >= META_LINHAS else '⚠️'}")
+    print(f"  • MAPA:        {len(mapas_final):>10,} linhas {'✅' if len(mapas_final) >= META_LINHAS else '⚠️'}")
+    print(f"  • ARMA:        {len(armas_final):>10,} linhas {'✅' if len(armas_final) >= META_LINHAS else '⚠️'}")
+    print(f"  • PARTIDA:     {len(partidas_final):>10,} linhas {'✅' if len(partidas_final) >= META_LINHAS else '⚠️'}")
+    print(f"  • ROUND:       {len(rounds_final):>10,} linhas {'✅' if len(rounds_final) >= META_LINHAS else '⚠️'}")
+    print(f"  • EVENTO_DANO: {total_eventos:>10,} linhas {'✅' if total_eventos >= META_LINHAS else '⚠️'}")
     
     print("\n✅ DADOS SINTÉTICOS GERADOS COM SUCESSO!")
 
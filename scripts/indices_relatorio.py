@@ -0,0 +1,278 @@
+"""
+============================================
+PROJETO BIG DATA - CS:GO MATCHMAKING
+Índices para as Consultas dos Relatórios
+============================================
+
+Instala índices parciais e de cobertura pensados para as consultas que
+acompanham o projeto (CONSULTAS de consultas_e_graficos.py e
+sql/03_consultas_avancadas.sql), e valida cada um com o tempo das
+consultas que ele deve acelerar.
+
+Para cada candidato de INDICES_CANDIDATOS:
+1. mede as consultas-alvo sem o índice (EXPLAIN ANALYZE, menor tempo
+   de REPETICOES execuções);
+2. cria o índice e atualiza as estatísticas da tabela;
+3. mede de novo. O índice fica se alguma consulta ganhar ao menos
+   GANHO_MINIMO e nenhuma piorar mais que TOLERANCIA_PIORA; senão é
+   removido.
+
+Os candidatos são avaliados em sequência, então o "antes" de cada um
+já inclui os índices aprovados anteriormente. Antes das medições as
+tabelas passam por VACUUM (ANALYZE): sem o mapa de visibilidade, uma
+carga recente não teria index-only scans e os índices de cobertura
+pareceriam inúteis.
+
+carregar_postgres.py executa este passo ao fim da carga completa com
+OTIMIZAR_INDICES = True (as cargas incrementais mantêm os índices);
+índices que já existem não são reavaliados.
+Para avaliar de novo no banco atual:
+    python indices_relatorio.py
+"""
+
+import os
+import re
+from datetime import datetime
+
+import psycopg2
+from psycopg2 import errors
+
+from consultas_e_graficos import CONSULTAS, DB_CONFIG
+
+# ============================================
+# CONFIGURAÇÕES
+# ============================================
+
+CAMINHO_SQL_CONSULTAS = '../sql/03_consultas_avancadas.sql'
+PASTA_SAIDA = '../relatorio/planos/'
+
+# Repetições de cada medição (vale o menor tempo)
+REPETICOES = 3
+
+# Ganho mínimo (antes / depois) em alguma consulta-alvo para manter o índice
+GANHO_MINIMO = 1.2
+
+# Piora máxima aceita nas outras consultas-alvo (0.1 = 10% mais lenta)
+TOLERANCIA_PIORA = 0.1
+
+# Limite de cada EXPLAIN ANALYZE
+TEMPO_LIMITE = '15min'
+
+# Candidatos: nome -> (tabela, definição, consultas-alvo, motivo).
+# Consultas-alvo: 'relatorio:<nome em CONSULTAS>' ou 'sql03:<número>'
+INDICES_CANDIDATOS = {
+    'idx_evento_kills_atacante': (
+        'evento_dano',
+        'ON evento_dano (atacante_id) INCLUDE (round_id, dano_hp) WHERE dano_hp >= 100',
+        ['sql03:1'],
+        "kills por atacante e mapa: só as linhas com dano_hp >= 100, com round_id e dano_hp para index-only scan",
+    ),
+    'idx_evento_arma_cobertura': (
+        'evento_dano',
+        'ON evento_dano (arma_id) INCLUDE (hitbox, dano_hp)',
+        ['sql03:3', 'sql03:7', 'sql03:9'],
+        "hits, headshots, kills e dano por arma sem ler a tabela",
+    ),
+    'idx_evento_round_cobertura': (
+        'evento_dano',
+        'ON evento_dano (round_id) INCLUDE (evento_id, dano_hp)',
+        ['sql03:6', 'sql03:8'],
+        "JOIN round x evento_dano com as colunas contadas e somadas",
+    ),
+    'idx_round_partida_cobertura': (
+        'round',
+        'ON round (partida_id) INCLUDE (round_id, vencedor_lado)',
+        ['sql03:5', 'sql03:8'],
+        "rounds por partida com o lado vencedor (CT vs T por mapa)",
+    ),
+    'idx_jogador_rank': (
+        'jogador',
+        'ON jogador (rank_atual)',
+        ['relatorio:ranks'],
+        "distribuição de jogadores por rank",
+    ),
+}
+
+
+# ============================================
+# CONSULTAS
+# ============================================
+
+def consultas_sql03(caminho=None):
+    """{'sql03:<número>': SQL} das consultas numeradas de sql/03."""
+    with open(caminho or CAMINHO_SQL_CONSULTAS, encoding='utf-8') as arquivo:
+        texto = arquivo.read()
+    consultas = {}
+    for trecho in texto.split(';'):
+        numero = re.search(r'^--\s*(\d+)\.', trecho, re.MULTILINE)
+        if numero and re.search(r'^\s*(SELECT|WITH)\b', trecho, re.MULTILINE | re.IGNORECASE):
+            consultas[f"sql03:{numero.group(1)}"] = trecho.strip()
+    return consultas
+
+
+def consultas_alvo():
+    """Todas as consultas que podem ser alvo de um índice."""
+    consultas = {f"relatorio:{nome}": sql.strip().rstrip(';') for nome, (_, sql, _) in CONSULTAS.items()}
+    consultas.update(consultas_sql03())
+    return consultas
+
+
+# ============================================
+# MEDIÇÃO
+# ============================================
+
+def tempo_consulta(conn, sql):
+    """Menor Execution Time (ms) de REPETICOES EXPLAIN ANALYZE; None se estourar TEMPO_LIMITE."""
+    cursor = conn.cursor()
+    tempos = []
+    try:
+        cursor.execute(f"SET statement_timeout = '{TEMPO_LIMITE}'")
+        for _ in range(REPETICOES):
+            cursor.execute(f"EXPLAIN (ANALYZE) {sql}")
+            plano = '\n'.join(linha for linha, in cursor.fetchall())
+            tempos.append(float(re.search(r'Execution Time: ([\d.]+) ms', plano).group(1)))
+    except errors.QueryCanceled:
+        return None
+    finally:
+        conn.rollback()
+        cursor.close()
+    return min(tempos)
+
+
+def _executar(conn, comando):
+    """Executa um comando fora de transação (CREATE INDEX, VACUUM)."""
+    conn.autocommit = True
+    cursor = conn.cursor()
+    try:
+        cursor.execute(comando)
+    finally:
+        cursor.close()
+        conn.autocommit = False
+
+
+def _indice_existe(conn, nome):
+    cursor = conn.cursor()
+    cursor.execute("SELECT to_regclass(%s)", (nome,))
+    existe = cursor.fetchone()[0] is not None
+    cursor.close()
+    conn.rollback()
+    return existe
+
+
+def _tamanho_indice(conn, nome):
+    """Tamanho do índice (somando as partições no esquema particionado)."""
+    cursor = conn.cursor()
+    # pg_partition_tree não retorna linhas para um índice comum (SUM nulo)
+    cursor.execute("""
+        SELECT pg_size_pretty(COALESCE(
+            (SELECT SUM(pg_relation_size(relid)) FROM pg_partition_tree(%(nome)s::regclass)),
+            pg_relation_size(%(nome)s::regclass)))
+    """, {'nome': nome})
+    tamanho = cursor.fetchone()[0]
+    cursor.close()
+    conn.rollback()
+    return tamanho
+
+
+def aprovar(antes, depois):
+    """Decide se o índice fica, a partir dos tempos antes/depois por consulta."""
+    ganhos = [antes[c] / depois[c] for c in antes
+              if antes[c] is not None and depois[c] is not None and depois[c] > 0]
+    # Uma consulta que estourava o limite e passou a terminar conta como ganho
+    destravadas = any(antes[c] is None and depois[c] is not None for c in antes)
+    if not ganhos:
+        return destravadas
+    return (max(ganhos) >= GANHO_MINIMO or destravadas) and min(ganhos) >= 1 / (1 + TOLERANCIA_PIORA)
+
+
+# ============================================
+# INSTALAÇÃO
+# ============================================
+
+def instalar_indices(conn, candidatos=None):
+    """Avalia e instala os índices de INDICES_CANDIDATOS.
+
+    Retorna a lista de resultados (nome, consulta, ms antes, ms depois,
+    decisão), também gravada em PASTA_SAIDA.
+    """
+    candidatos = candidatos or INDICES_CANDIDATOS
+    print(f"🔎 Avaliando {len(candidatos)} índices para as consultas dos relatórios...")
+    consultas = consultas_alvo()
+
+    novos = {nome: c for nome, c in candidatos.items() if not _indice_existe(conn, nome)}
+    for nome in set(candidatos) - set(novos):
+        print(f"   ⏭️ {nome}: já instalado")
+    for tabela in sorted({tabela for tabela, _, _, _ in novos.values()}):
+        _executar(conn, f"VACUUM (ANALYZE) {tabela}")
+
+    resultados = []
+    for nome, (tabela, definicao, alvos, motivo) in novos.items():
+        antes = {alvo: tempo_consulta(conn, consultas[alvo]) for alvo in alvos}
+        _executar(conn, f"CREATE INDEX {nome} {definicao}")
+        _executar(conn, f"ANALYZE {tabela}")
+        depois = {alvo: tempo_consulta(conn, consultas[alvo]) for alvo in alvos}
+
+        if aprovar(antes, depois):
+            decisao = f"mantido ({_tamanho_indice(conn, nome)})"
+            print(f"   ✅ {nome}: {motivo}")
+        else:
+            _executar(conn, f"DROP INDEX {nome}")
+            decisao = "removido"
+            print(f"   ❌ {nome}: sem ganho, removido")
+        for alvo in alvos:
+            resultados.append((nome, alvo, antes[alvo], depois[alvo], decisao))
+
+    if resultados:
+        salvar_resultados(conn, resultados)
+    return resultados
+
+
+def _ms(valor):
+    return f"{valor:,.1f}" if valor is not None else f"> {TEMPO_LIMITE}"
+
+
+def salvar_resultados(conn, resultados):
+    """Imprime e grava em PASTA_SAIDA a tabela de tempos por índice."""
+    cursor = conn.cursor()
+    cursor.execute("SELECT COUNT(*) FROM evento_dano")
+    eventos = cursor.fetchone()[0]
+    cursor.close()
+    conn.rollback()
+
+    tabela = [f"{'índice':<28} {'consulta':<20} {'antes (ms)':>12} {'depois (ms)':>12} {'ganho':>7}  decisão"]
+    for nome, alvo, antes, depois, decisao in resultados:
+        ganho = f"{antes / depois:,.1f}x" if antes and depois else '-'
+        tabela.append(f"{nome:<28} {alvo:<20} {_ms(antes):>12} {_ms(depois):>12} {ganho:>7}  {decisao}")
+    print('\n'.join(tabela))
+
+    os.makedirs(PASTA_SAIDA, exist_ok=True)
+    caminho = os.path.join(PASTA_SAIDA, f"indices_{eventos}_eventos.txt")
+    with open(caminho, 'w', encoding='utf-8') as arquivo:
+        arquivo.write(f"Índices dos relatórios - {datetime.now():%Y-%m-%d %H:%M}\n")
+        arquivo.write(f"{eventos:,} eventos\n\n")
+        for nome, (_, definicao, _, motivo) in INDICES_CANDIDATOS.items():
+            arquivo.write(f"{nome}: {definicao}\n    {motivo}\n")
+        arquivo.write('\n' + '\n'.join(tabela) + '\n')
+    print(f"📁 Tempos salvos em: {os.path.abspath(caminho)}")
+
+
+def main():
+    print("=" * 50)
+    print("🔎 ÍNDICES DAS CONSULTAS DOS RELATÓRIOS")
+    print("=" * 50)
+
+    # Mudar para diretório do script
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
+    conn = psycopg2.connect(**DB_CONFIG)
+    try:
+        # Reavalia tudo: remove os candidatos instalados em execuções anteriores
+        for nome in INDICES_CANDIDATOS:
+            _executar(conn, f"DROP INDEX IF EXISTS {nome}")
+        instalar_indices(conn)
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
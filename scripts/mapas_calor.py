@@ -0,0 +1,313 @@
+"""
+============================================
+PROJETO BIG DATA - CS:GO MATCHMAKING
+Mapas de Calor das Posições (mapa_calor)
+============================================
+
+Agrega as posições de atacante e vítima de evento_dano em uma grade
+por mapa: cada célula tem TAMANHO_CELULA × TAMANHO_CELULA unidades do
+jogo, e a tabela mapa_calor guarda uma linha por (mapa, papel, célula)
+com o número de eventos e o dano somado. Só as células com eventos são
+gravadas, ordenadas por mapa_id.
+
+A grade é calculada em uma passada vetorizada sobre evento_dano, em
+lotes: cada ponto vira uma chave int64 (mapa, célula) e o histograma é
+um np.unique + np.bincount, sem laço por mapa. Os mapas de calor são
+desenhados a partir de mapa_calor, sem voltar a evento_dano: o custo
+depende do número de células do mapa, não do número de eventos.
+
+Como as células têm tamanho fixo em unidades do jogo, as grades de
+todos os mapas são comparáveis e não dependem dos limites dos dados.
+mapa_calor é derivada de evento_dano e é sempre recalculada por
+completo (inclusive no ETL incremental).
+
+Consultas de região:
+- somar_regiao() soma as células de mapa_calor que tocam um retângulo
+  (aproximação na resolução da grade, sem banco);
+- eventos_na_regiao() devolve os eventos exatos do PostgreSQL com
+  point(x, y) <@ box(...), que usa os índices GiST criados por
+  carregar_postgres.py com INDICE_ESPACIAL = True.
+
+Uso (chamado pelo ETL com GERAR_MAPAS_CALOR = True):
+    from mapas_calor import gerar_mapas_calor
+    gerar_mapas_calor(pasta)
+
+Para gerar a grade (se faltar) e desenhar os mapas de calor:
+    python mapas_calor.py
+"""
+
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+from matplotlib.colors import LogNorm
+
+from armazenamento import caminho_tabela, ler_tabela, ler_tabela_em_lotes, salvar_tabela
+from chaves import chave_composta, mapear_ids
+from esquema import aplicar_esquema
+
+# ============================================
+# CONFIGURAÇÕES
+# ============================================
+
+PASTA_TABELAS = '../base_dados/tabelas_normalizadas/'
+PASTA_GRAFICOS = '../modelos/graficos/'
+
+# Lado da célula em unidades do jogo (os mapas têm até ~10.000 unidades)
+TAMANHO_CELULA = 50
+
+# Linhas de evento_dano lidas por vez
+TAMANHO_LOTE_CALOR = 1_000_000
+
+# Papel -> colunas de posição em evento_dano
+PAPEIS = {
+    'atacante': ('atacante_x', 'atacante_y'),
+    'vitima': ('vitima_x', 'vitima_y'),
+}
+
+# Mapas desenhados por main(): nomes, ou None para os NUM_MAPAS_GRAFICO
+# mapas com mais eventos
+MAPAS_GRAFICO = None
+NUM_MAPAS_GRAFICO = 6
+
+# Recalcular mapa_calor em main() mesmo que o arquivo já exista
+REGERAR = False
+
+# Índices de célula (x e y) cabem em 16 bits cada, com deslocamento para
+# as coordenadas negativas; a célula (x, y) ocupa 32 bits da chave
+BASE_CELULA = 2 ** 16
+DESLOCAMENTO_CELULA = 2 ** 15
+
+
+# ============================================
+# GRADE
+# ============================================
+
+def _mapa_por_round(pasta: str):
+    """(round_ids, mapa_id de cada round ou -1), para resolver o mapa dos eventos."""
+    rounds = ler_tabela('round', pasta, colunas=['round_id', 'partida_id'])
+    partidas = ler_tabela('partida', pasta, colunas=['partida_id', 'mapa_id'])
+    mapas = mapear_ids(rounds['partida_id'], partidas['partida_id'],
+                       partidas['mapa_id'].fillna(-1))
+    return rounds['round_id'], mapas.to_numpy(dtype=np.int64, na_value=-1)
+
+
+def _histograma(chaves, *pesos):
+    """Chaves distintas e a soma de cada peso por chave (np.unique + np.bincount)."""
+    unicas, posicoes = np.unique(chaves, return_inverse=True)
+    return (unicas,) + tuple(np.bincount(posicoes, weights=p, minlength=len(unicas)) for p in pesos)
+
+
+def _celulas_do_lote(mapa, x, y, dano):
+    """Histograma (chave mapa/célula -> eventos, dano) dos pontos válidos de um lote."""
+    validos = (mapa >= 0) & np.isfinite(x) & np.isfinite(y)
+    celula_x = np.floor(x[validos] / TAMANHO_CELULA).astype(np.int64) + DESLOCAMENTO_CELULA
+    celula_y = np.floor(y[validos] / TAMANHO_CELULA).astype(np.int64) + DESLOCAMENTO_CELULA
+    # Coordenadas absurdas (fora de ±DESLOCAMENTO_CELULA células) são descartadas
+    dentro = ((celula_x >= 0) & (celula_x < BASE_CELULA)
+              & (celula_y >= 0) & (celula_y < BASE_CELULA))
+    chaves = chave_composta(mapa[validos][dentro],
+                            celula_x[dentro] * BASE_CELULA + celula_y[dentro], BASE_CELULA ** 2)
+    return _histograma(chaves, np.ones(len(chaves)), dano[validos][dentro])
+
+
+def calcular_mapas_calor(pasta: str, tamanho_lote: int = TAMANHO_LOTE_CALOR) -> pd.DataFrame:
+    """Tabela mapa_calor a partir de evento_dano, round e partida de pasta."""
+    round_ids, mapa_do_round = _mapa_por_round(pasta)
+    colunas = ['round_id', 'dano_hp'] + [c for xy in PAPEIS.values() for c in xy]
+    parciais = {papel: [] for papel in PAPEIS}
+
+    for eventos in ler_tabela_em_lotes('evento_dano', pasta, colunas=colunas, tamanho_lote=tamanho_lote):
+        posicao = mapear_ids(eventos['round_id'], round_ids, np.arange(len(round_ids)))
+        posicao = posicao.to_numpy(dtype=np.int64, na_value=-1)
+        mapa = np.where(posicao >= 0, mapa_do_round[posicao], -1)
+        dano = eventos['dano_hp'].to_numpy(dtype=np.float64, na_value=0)
+        for papel, (coluna_x, coluna_y) in PAPEIS.items():
+            x = eventos[coluna_x].to_numpy(dtype=np.float64, na_value=np.nan)
+            y = eventos[coluna_y].to_numpy(dtype=np.float64, na_value=np.nan)
+            parciais[papel].append(_celulas_do_lote(mapa, x, y, dano))
+
+    # Junta os histogramas dos lotes (mesma chave em lotes diferentes)
+    tabelas = []
+    for papel, lotes in parciais.items():
+        if not lotes:
+            continue
+        chaves, contagens, danos = (np.concatenate(partes) for partes in zip(*lotes))
+        chaves, contagens, danos = _histograma(chaves, contagens, danos)
+        celula = chaves % BASE_CELULA ** 2
+        tabelas.append(pd.DataFrame({
+            'mapa_id': chaves // BASE_CELULA ** 2,
+            'papel': papel,
+            'celula_x': celula // BASE_CELULA - DESLOCAMENTO_CELULA,
+            'celula_y': celula % BASE_CELULA - DESLOCAMENTO_CELULA,
+            'eventos': contagens.astype(np.int64),
+            'dano_total': danos.astype(np.int64),
+        }))
+    if not tabelas:
+        tabelas.append(pd.DataFrame(columns=['mapa_id', 'papel', 'celula_x', 'celula_y',
+                                             'eventos', 'dano_total']))
+    celulas = pd.concat(tabelas, ignore_index=True)
+    celulas = celulas.sort_values(['mapa_id', 'papel', 'celula_x', 'celula_y'], ignore_index=True)
+    return aplicar_esquema(celulas, 'mapa_calor')
+
+
+def gerar_mapas_calor(pasta: str) -> int:
+    """Grava mapa_calor em pasta. Retorna o número de células gravadas."""
+    print(f"🗺️ Calculando mapas de calor (células de {TAMANHO_CELULA} unidades)...")
+    inicio = time.perf_counter()
+    celulas = calcular_mapas_calor(pasta)
+    salvar_tabela(celulas, 'mapa_calor', pasta)
+    print(f"✅ mapa_calor: {len(celulas):,} células de {celulas['mapa_id'].nunique():,} mapas "
+          f"em {time.perf_counter() - inicio:.2f}s")
+    return len(celulas)
+
+
+# ============================================
+# LEITURA DA GRADE
+# ============================================
+
+def celulas_do_mapa(celulas: pd.DataFrame, mapa_id: int, papel: str = None) -> pd.DataFrame:
+    """Células de um mapa (e papel), por busca binária em mapa_calor ordenada."""
+    mapa_ids = celulas['mapa_id'].to_numpy(dtype=np.int64, na_value=-1)
+    inicio, fim = np.searchsorted(mapa_ids, [mapa_id, mapa_id + 1])
+    trecho = celulas.iloc[inicio:fim]
+    return trecho if papel is None else trecho[trecho['papel'] == papel]
+
+
+def grade(celulas_mapa: pd.DataFrame, limites=None):
+    """Matriz [y, x] de eventos e extensão (x_min, x_max, y_min, y_max) em unidades do jogo.
+
+    `limites` = (x0, x1, y0, y1) em células; por padrão, as células ocupadas.
+    """
+    cx = celulas_mapa['celula_x'].to_numpy(dtype=np.int64)
+    cy = celulas_mapa['celula_y'].to_numpy(dtype=np.int64)
+    x0, x1, y0, y1 = limites or (cx.min(), cx.max(), cy.min(), cy.max())
+    matriz = np.zeros((y1 - y0 + 1, x1 - x0 + 1), dtype=np.int64)
+    np.add.at(matriz, (cy - y0, cx - x0), celulas_mapa['eventos'].to_numpy(dtype=np.int64))
+    extensao = (x0 * TAMANHO_CELULA, (x1 + 1) * TAMANHO_CELULA,
+                y0 * TAMANHO_CELULA, (y1 + 1) * TAMANHO_CELULA)
+    return matriz, extensao
+
+
+def somar_regiao(celulas: pd.DataFrame, mapa_id: int, papel: str,
+                 x_min: float, y_min: float, x_max: float, y_max: float):
+    """(eventos, dano) das células de mapa_calor que tocam o retângulo.
+
+    Aproximação na resolução da grade: conta os eventos das células de
+    borda inteiras. Para os eventos exatos, ver eventos_na_regiao().
+    """
+    trecho = celulas_do_mapa(celulas, mapa_id, papel)
+    cx, cy = trecho['celula_x'], trecho['celula_y']
+    dentro = ((cx >= np.floor(x_min / TAMANHO_CELULA)) & (cx <= np.floor(x_max / TAMANHO_CELULA))
+              & (cy >= np.floor(y_min / TAMANHO_CELULA)) & (cy <= np.floor(y_max / TAMANHO_CELULA)))
+    return int(trecho.loc[dentro, 'eventos'].sum()), int(trecho.loc[dentro, 'dano_total'].sum())
+
+
+# ============================================
+# CONSULTA DE REGIÃO (POSTGRESQL)
+# ============================================
+
+# Eventos com a posição do papel dentro de um retângulo de um mapa. A
+# expressão point(x::float8, y::float8) é a mesma de INDICES_ESPACIAIS
+# em carregar_postgres.py: só assim o planejador usa o índice GiST
+SQL_EVENTOS_REGIAO = """
+SELECT e.evento_id, e.round_id, e.atacante_id, e.vitima_id, e.arma_id, e.dano_hp,
+       e.hitbox, e.{x}, e.{y}
+FROM evento_dano e
+INNER JOIN round r ON e.round_id = r.round_id
+INNER JOIN partida p ON r.partida_id = p.partida_id
+INNER JOIN mapa m ON p.mapa_id = m.mapa_id
+WHERE m.nome = %(mapa)s
+  AND point(e.{x}::float8, e.{y}::float8) <@ box(point(%(x_min)s, %(y_min)s), point(%(x_max)s, %(y_max)s))
+"""
+
+
+def eventos_na_regiao(conn, mapa: str, x_min: float, y_min: float, x_max: float, y_max: float,
+                      papel: str = 'vitima') -> pd.DataFrame:
+    """Eventos de `mapa` com a posição do `papel` no retângulo (PostgreSQL)."""
+    coluna_x, coluna_y = PAPEIS[papel]
+    cursor = conn.cursor()
+    cursor.execute(SQL_EVENTOS_REGIAO.format(x=coluna_x, y=coluna_y),
+                   {'mapa': mapa, 'x_min': x_min, 'y_min': y_min, 'x_max': x_max, 'y_max': y_max})
+    colunas = [descricao[0] for descricao in cursor.description]
+    df = pd.DataFrame(cursor.fetchall(), columns=colunas)
+    cursor.close()
+    return df
+
+
+# ============================================
+# GRÁFICOS
+# ============================================
+
+def _salvar(nome_arquivo):
+    """Salva a figura atual em PASTA_GRAFICOS e retorna o nome do arquivo."""
+    plt.tight_layout()
+    plt.savefig(os.path.join(PASTA_GRAFICOS, nome_arquivo), dpi=150)
+    plt.close()
+    return nome_arquivo
+
+
+def grafico_mapa_calor(celulas: pd.DataFrame, mapa_id: int, nome_mapa: str):
+    """Mapa de calor de atacantes e vítimas de um mapa, lado a lado."""
+    trecho = celulas_do_mapa(celulas, mapa_id)
+    cx, cy = trecho['celula_x'], trecho['celula_y']
+    limites = (cx.min(), cx.max(), cy.min(), cy.max())  # mesma área nos dois painéis
+
+    fig, eixos = plt.subplots(1, len(PAPEIS), figsize=(14, 6))
+    for ax, papel in zip(eixos, PAPEIS):
+        matriz, extensao = grade(trecho[trecho['papel'] == papel], limites)
+        # Escala log: as áreas de combate concentram ordens de grandeza mais eventos
+        imagem = ax.imshow(np.ma.masked_equal(matriz, 0), origin='lower', extent=extensao,
+                           cmap='Reds', norm=LogNorm(vmin=1, vmax=max(matriz.max(), 1)),
+                           interpolation='nearest')
+        ax.set_title(f"{'Atacantes' if papel == 'atacante' else 'Vítimas'} ({matriz.sum():,} eventos)")
+        ax.set_xlabel('Posição X')
+        ax.set_ylabel('Posição Y')
+        ax.set_aspect('equal')
+        fig.colorbar(imagem, ax=ax, label='Eventos por célula')
+    fig.suptitle(f'Mapa de Calor das Posições - {nome_mapa}')
+    return _salvar(f'mapa_calor_{nome_mapa}.png')
+
+
+def main():
+    print("=" * 50)
+    print("🗺️ MAPAS DE CALOR - POSIÇÕES DOS EVENTOS")
+    print("=" * 50)
+
+    # Mudar para diretório do script
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    os.makedirs(PASTA_GRAFICOS, exist_ok=True)
+
+    if REGERAR or not os.path.exists(caminho_tabela('mapa_calor', PASTA_TABELAS)):
+        gerar_mapas_calor(PASTA_TABELAS)
+
+    inicio = time.perf_counter()
+    celulas = ler_tabela('mapa_calor', PASTA_TABELAS)
+    mapas = ler_tabela('mapa', PASTA_TABELAS)
+    print(f"📂 mapa_calor: {len(celulas):,} células lidas em {time.perf_counter() - inicio:.3f}s")
+
+    if MAPAS_GRAFICO:
+        escolhidos = mapas[mapas['nome'].isin(MAPAS_GRAFICO)]
+    else:
+        eventos = celulas[celulas['papel'] == 'vitima'].groupby('mapa_id')['eventos'].sum()
+        mais_eventos = eventos.nlargest(NUM_MAPAS_GRAFICO).index
+        escolhidos = mapas.set_index('mapa_id').loc[mais_eventos].reset_index()
+
+    for mapa_id, nome in zip(escolhidos['mapa_id'], escolhidos['nome']):
+        inicio = time.perf_counter()
+        matriz, _ = grade(celulas_do_mapa(celulas, mapa_id, 'vitima'))
+        t_grade = time.perf_counter() - inicio
+        arquivo = grafico_mapa_calor(celulas, mapa_id, nome)
+        t_total = time.perf_counter() - inicio
+        print(f"🎨 {nome}: grade {matriz.shape[1]}x{matriz.shape[0]} em {t_grade * 1000:.1f}ms, "
+              f"gráfico em {t_total * 1000:.0f}ms → {arquivo}")
+
+    print(f"\n📁 Gráficos salvos em: {os.path.abspath(PASTA_GRAFICOS)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -118,22 +118,60 @@ CREATE INDEX idx_evento_vitima ON evento_dano(vitima_id);
 CREATE INDEX idx_evento_arma ON evento_dano(arma_id);
 CREATE INDEX idx_evento_hitbox ON evento_dano(hitbox);
 
+-- ============================================
+-- TABELA: JOGADOR_ESTATISTICA
+-- ============================================
+CREATE TABLE IF NOT EXISTS jogador_estatistica (
+    jogador_id INTEGER PRIMARY KEY REFERENCES jogador(jogador_id),
+    kills INTEGER NOT NULL,
+    mortes INTEGER NOT NULL,
+    dano_total BIGINT NOT NULL,
+    headshots INTEGER NOT NULL,
+    rounds_jogados INTEGER NOT NULL
+);
+
+COMMENT ON TABLE jogador_estatistica IS 'Totais por jogador calculados no ETL (scripts/estatisticas_jogador.py)';
+COMMENT ON COLUMN jogador_estatistica.kills IS 'Eventos como atacante com dano_hp >= 100';
+COMMENT ON COLUMN jogador_estatistica.mortes IS 'Eventos como vítima com dano_hp >= 100';
+COMMENT ON COLUMN jogador_estatistica.rounds_jogados IS 'Rounds distintos com algum evento do jogador (atacante ou vítima)';
+
+-- Top jogadores por kills
+CREATE INDEX idx_estatistica_kills ON jogador_estatistica(kills DESC);
+
 -- ============================================
 -- VIEWS AUXILIARES
 -- ============================================
 
 -- View: Estatísticas por jogador
+-- Lado atacante e lado vítima são agregados separadamente (cada um
+-- agrupado pela própria coluna, um hash aggregate por leitura) e só
+-- depois juntados ao jogador. Um JOIN com "atacante_id OR vitima_id"
+-- não pode usar hash join nem índice e vira um nested loop sobre
+-- evento_dano para cada jogador.
+-- Comparação de planos: scripts/explain_estatisticas_jogador.py
 CREATE OR REPLACE VIEW vw_estatisticas_jogador AS
 SELECT 
     j.jogador_id,
     j.steam_id,
     j.rank_atual,
-    COUNT(CASE WHEN e.atacante_id = j.jogador_id AND e.dano_hp >= 100 THEN 1 END) as kills,
-    COUNT(CASE WHEN e.vitima_id = j.jogador_id AND e.dano_hp >= 100 THEN 1 END) as deaths,
-    SUM(CASE WHEN e.atacante_id = j.jogador_id THEN e.dano_hp ELSE 0 END) as dano_total
+    COALESCE(a.kills, 0) as kills,
+    COALESCE(m.deaths, 0) as deaths,
+    COALESCE(a.dano_total, 0) as dano_total
 FROM jogador j
-LEFT JOIN evento_dano e ON j.jogador_id = e.atacante_id OR j.jogador_id = e.vitima_id
-GROUP BY j.jogador_id, j.steam_id, j.rank_atual;
+LEFT JOIN (
+    SELECT atacante_id,
+           COUNT(*) FILTER (WHERE dano_hp >= 100) as kills,
+           SUM(dano_hp) as dano_total
+    FROM evento_dano
+    WHERE atacante_id IS NOT NULL
+    GROUP BY atacante_id
+) a ON a.atacante_id = j.jogador_id
+LEFT JOIN (
+    SELECT vitima_id, COUNT(*) as deaths
+    FROM evento_dano
+    WHERE vitima_id IS NOT NULL AND dano_hp >= 100
+    GROUP BY vitima_id
+) m ON m.vitima_id = j.jogador_id;
 
 -- View: Estatísticas por mapa
 CREATE OR REPLACE VIEW vw_estatisticas_mapa AS
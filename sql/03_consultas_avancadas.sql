@@ -26,32 +26,26 @@ LIMIT 10;
 -- ============================================
 -- 2. SUBCONSULTA CORRELACIONADA
 -- Jogadores com K/D ratio acima da média
+-- (kills e mortes de jogador_estatistica, calculadas no ETL)
 -- ============================================
+WITH kd AS (
+    SELECT 
+        jogador_id,
+        kills,
+        mortes,
+        kills::DECIMAL / mortes AS kd_ratio
+    FROM jogador_estatistica
+    WHERE kills > 0 AND mortes > 0
+)
 SELECT 
     j.steam_id,
     j.rank_atual,
-    kills.total AS kills,
-    deaths.total AS deaths,
-    ROUND(kills.total::DECIMAL / NULLIF(deaths.total, 0), 2) AS kd_ratio
-FROM jogador j
-INNER JOIN (
-    SELECT atacante_id, COUNT(*) AS total
-    FROM evento_dano
-    WHERE dano_hp >= 100
-    GROUP BY atacante_id
-) kills ON j.jogador_id = kills.atacante_id
-INNER JOIN (
-    SELECT vitima_id, COUNT(*) AS total
-    FROM evento_dano
-    WHERE dano_hp >= 100
-    GROUP BY vitima_id
-) deaths ON j.jogador_id = deaths.vitima_id
-WHERE kills.total::DECIMAL / NULLIF(deaths.total, 0) > (
-    SELECT AVG(k.total::DECIMAL / NULLIF(d.total, 0))
-    FROM (SELECT atacante_id, COUNT(*) AS total FROM evento_dano WHERE dano_hp >= 100 GROUP BY atacante_id) k
-    JOIN (SELECT vitima_id, COUNT(*) AS total FROM evento_dano WHERE dano_hp >= 100 GROUP BY vitima_id) d
-    ON k.atacante_id = d.vitima_id
-)
+    kd.kills,
+    kd.mortes AS deaths,
+    ROUND(kd.kd_ratio, 2) AS kd_ratio
+FROM kd
+INNER JOIN jogador j ON j.jogador_id = kd.jogador_id
+WHERE kd.kd_ratio > (SELECT AVG(kd_ratio) FROM kd)
 ORDER BY kd_ratio DESC
 LIMIT 20;
 
@@ -96,20 +90,19 @@ ORDER BY tipo_arma, rank_por_tipo;
 SELECT 
     j.steam_id,
     j.rank_atual,
-    COUNT(CASE WHEN e.atacante_id = j.jogador_id AND e.dano_hp >= 100 THEN 1 END) AS kills,
-    SUM(SUM(CASE WHEN e.atacante_id = j.jogador_id THEN e.dano_hp ELSE 0 END)) 
+    s.kills,
+    SUM(s.dano_total) 
         OVER (PARTITION BY j.rank_atual ORDER BY j.jogador_id) AS dano_acumulado_rank,
     RANK() OVER (
         PARTITION BY j.rank_atual 
-        ORDER BY COUNT(CASE WHEN e.atacante_id = j.jogador_id AND e.dano_hp >= 100 THEN 1 END) DESC
+        ORDER BY s.kills DESC
     ) AS posicao_no_rank,
     ROUND(
-        AVG(COUNT(CASE WHEN e.atacante_id = j.jogador_id AND e.dano_hp >= 100 THEN 1 END)) 
+        AVG(s.kills) 
         OVER (PARTITION BY j.rank_atual), 2
     ) AS media_kills_rank
 FROM jogador j
-LEFT JOIN evento_dano e ON j.jogador_id = e.atacante_id OR j.jogador_id = e.vitima_id
-GROUP BY j.jogador_id, j.steam_id, j.rank_atual
+INNER JOIN jogador_estatistica s ON j.jogador_id = s.jogador_id
 ORDER BY j.rank_atual DESC, posicao_no_rank;
 
 -- ============================================
@@ -227,20 +220,12 @@ SELECT
         WHEN j.rank_atual BETWEEN 17 AND 18 THEN 'Supreme/Global'
         ELSE 'Desconhecido'
     END AS categoria_rank,
-    COUNT(DISTINCT j.jogador_id) AS total_jogadores,
-    ROUND(AVG(kills.total), 2) AS media_kills,
-    ROUND(AVG(deaths.total), 2) AS media_deaths
+    COUNT(*) AS total_jogadores,
+    -- Jogadores sem kills (ou sem mortes) ficam fora da média
+    ROUND(AVG(NULLIF(s.kills, 0)), 2) AS media_kills,
+    ROUND(AVG(NULLIF(s.mortes, 0)), 2) AS media_deaths
 FROM jogador j
-LEFT JOIN (
-    SELECT atacante_id, COUNT(*) AS total
-    FROM evento_dano WHERE dano_hp >= 100
-    GROUP BY atacante_id
-) kills ON j.jogador_id = kills.atacante_id
-LEFT JOIN (
-    SELECT vitima_id, COUNT(*) AS total
-    FROM evento_dano WHERE dano_hp >= 100
-    GROUP BY vitima_id
-) deaths ON j.jogador_id = deaths.vitima_id
+INNER JOIN jogador_estatistica s ON j.jogador_id = s.jogador_id
 GROUP BY categoria_rank
 ORDER BY 
     CASE categoria_rank
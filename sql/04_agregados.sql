@@ -0,0 +1,134 @@
+-- ============================================
+-- PROJETO BIG DATA - CS:GO MATCHMAKING
+-- Camada de Agregados para os Relatórios
+-- ============================================
+
+-- Tabelas resumidas lidas por consultas_e_graficos.py no lugar de
+-- varreduras completas de evento_dano e round.
+--
+-- O script é idempotente: cria o que faltar e agrega apenas as linhas
+-- com ID acima da marca d'água gravada em agregados_controle. Na
+-- primeira execução tudo é agregado; depois de uma carga incremental
+-- só os eventos e rounds novos. carregar_postgres.py executa este
+-- arquivo ao fim de cada carga.
+--
+-- Pré-requisito: evento_dano e round só recebem linhas com IDs
+-- crescentes (carga completa ou incremental).
+
+-- ============================================
+-- TABELAS
+-- ============================================
+
+-- Marca d'água de cada tabela de origem: linhas com ID em
+-- (id_anterior, id_atual] são as agregadas na execução corrente
+CREATE TABLE IF NOT EXISTS agregados_controle (
+    fonte VARCHAR(20) PRIMARY KEY,
+    id_anterior BIGINT NOT NULL DEFAULT 0,
+    id_atual BIGINT NOT NULL DEFAULT 0,
+    atualizado_em TIMESTAMP
+);
+
+INSERT INTO agregados_controle (fonte) VALUES ('evento_dano'), ('round')
+ON CONFLICT (fonte) DO NOTHING;
+
+-- Uso, dano e headshots por arma
+CREATE TABLE IF NOT EXISTS agg_arma (
+    arma_id INTEGER PRIMARY KEY,
+    usos BIGINT NOT NULL,
+    headshots BIGINT NOT NULL,
+    dano_total BIGINT NOT NULL
+);
+
+-- Hits e dano por hitbox (hits_com_dano: hits com dano_hp informado, para a média)
+CREATE TABLE IF NOT EXISTS agg_hitbox (
+    hitbox VARCHAR(20) PRIMARY KEY,
+    hits BIGINT NOT NULL,
+    hits_com_dano BIGINT NOT NULL,
+    dano_total BIGINT NOT NULL
+);
+
+-- Rounds vencidos por mapa e lado
+CREATE TABLE IF NOT EXISTS agg_mapa_lado (
+    mapa_id INTEGER,
+    vencedor_lado VARCHAR(20),
+    rounds BIGINT NOT NULL
+);
+
+-- Uma linha por (mapa_id, vencedor_lado), com NULL contando como um
+-- valor. Índice sobre COALESCE em vez de UNIQUE NULLS NOT DISTINCT,
+-- que só existe a partir do PostgreSQL 15
+CREATE UNIQUE INDEX IF NOT EXISTS agg_mapa_lado_chave
+    ON agg_mapa_lado ((COALESCE(mapa_id, -1)), (COALESCE(vencedor_lado, '')));
+
+-- Kills, mortes e dano por jogador: agora em jogador_estatistica,
+-- calculada pelo ETL e carregada por carregar_postgres.py
+DROP TABLE IF EXISTS agg_jogador;
+
+-- ============================================
+-- ATUALIZAÇÃO INCREMENTAL
+-- ============================================
+
+BEGIN;
+
+-- Avança a marca d'água antes de agregar: linhas que chegarem durante
+-- a atualização ficam para a próxima execução
+UPDATE agregados_controle
+SET id_anterior = id_atual,
+    id_atual = (SELECT COALESCE(MAX(evento_id), 0) FROM evento_dano),
+    atualizado_em = NOW()
+WHERE fonte = 'evento_dano';
+
+UPDATE agregados_controle
+SET id_anterior = id_atual,
+    id_atual = (SELECT COALESCE(MAX(round_id), 0) FROM round),
+    atualizado_em = NOW()
+WHERE fonte = 'round';
+
+-- Eventos novos (só as colunas usadas: uma única leitura de evento_dano)
+CREATE TEMP TABLE eventos_novos ON COMMIT DROP AS
+SELECT e.arma_id, e.hitbox, e.dano_hp
+FROM evento_dano e, agregados_controle c
+WHERE c.fonte = 'evento_dano'
+  AND e.evento_id > c.id_anterior AND e.evento_id <= c.id_atual;
+
+INSERT INTO agg_arma AS a (arma_id, usos, headshots, dano_total)
+SELECT arma_id, COUNT(*), COUNT(*) FILTER (WHERE hitbox = 'Head'), COALESCE(SUM(dano_hp), 0)
+FROM eventos_novos
+WHERE arma_id IS NOT NULL
+GROUP BY arma_id
+ON CONFLICT (arma_id) DO UPDATE SET
+    usos = a.usos + EXCLUDED.usos,
+    headshots = a.headshots + EXCLUDED.headshots,
+    dano_total = a.dano_total + EXCLUDED.dano_total;
+
+INSERT INTO agg_hitbox AS h (hitbox, hits, hits_com_dano, dano_total)
+SELECT hitbox, COUNT(*), COUNT(dano_hp), COALESCE(SUM(dano_hp), 0)
+FROM eventos_novos
+WHERE hitbox IS NOT NULL AND hitbox != ''
+GROUP BY hitbox
+ON CONFLICT (hitbox) DO UPDATE SET
+    hits = h.hits + EXCLUDED.hits,
+    hits_com_dano = h.hits_com_dano + EXCLUDED.hits_com_dano,
+    dano_total = h.dano_total + EXCLUDED.dano_total;
+
+-- Rounds novos (limites em subconsultas escalares: no esquema
+-- particionado o executor descarta as partições de round fora da faixa)
+INSERT INTO agg_mapa_lado AS m (mapa_id, vencedor_lado, rounds)
+SELECT p.mapa_id, r.vencedor_lado, COUNT(*)
+FROM round r
+INNER JOIN partida p ON r.partida_id = p.partida_id
+WHERE r.round_id > (SELECT id_anterior FROM agregados_controle WHERE fonte = 'round')
+  AND r.round_id <= (SELECT id_atual FROM agregados_controle WHERE fonte = 'round')
+GROUP BY p.mapa_id, r.vencedor_lado
+ON CONFLICT ((COALESCE(mapa_id, -1)), (COALESCE(vencedor_lado, ''))) DO UPDATE SET
+    rounds = m.rounds + EXCLUDED.rounds;
+
+COMMIT;
+
+ANALYZE agg_arma;
+ANALYZE agg_hitbox;
+ANALYZE agg_mapa_lado;
+
+-- ============================================
+-- FIM DO SCRIPT DE AGREGADOS
+-- ============================================
@@ -0,0 +1,116 @@
+-- ============================================
+-- PROJETO BIG DATA - CS:GO MATCHMAKING
+-- Esquema Particionado (partida, round, evento_dano)
+-- ============================================
+
+-- Alternativa a sql/01_ddl_criar_tabelas.sql para bases com muitos
+-- meses de demos. carregar_postgres.py cria este esquema com
+-- ESQUEMA_PARTICIONADO = True e gera as partições a partir dos dados
+-- (uma por mês de partida, uma por faixa de ROUNDS_POR_PARTICAO rounds);
+-- as partições abaixo são apenas exemplos.
+--
+-- - partida: RANGE por data_hora (mês). Consultas por período leem só
+--   as partições dos meses pedidos.
+-- - round e evento_dano: RANGE por round_id, com as MESMAS faixas. O
+--   JOIN round x evento_dano e as agregações por round são feitos
+--   partição a partição (enable_partitionwise_join/aggregate), e
+--   consultas por faixa de rounds leem só as partições da faixa.
+--
+-- Em tabelas particionadas, PKs e UNIQUE precisam incluir a chave de
+-- particionamento: partida_id sozinho não é único em partida, então a
+-- FK round -> partida não existe neste esquema.
+
+-- ============================================
+-- TABELAS
+-- ============================================
+CREATE TABLE IF NOT EXISTS partida (
+    partida_id INTEGER NOT NULL,
+    arquivo_demo VARCHAR(60) NOT NULL,
+    mapa_id INTEGER NOT NULL REFERENCES mapa(mapa_id),
+    data_hora TIMESTAMP NOT NULL,
+    rank_medio DECIMAL(4,1),
+    PRIMARY KEY (partida_id, data_hora),
+    UNIQUE (arquivo_demo, data_hora)
+) PARTITION BY RANGE (data_hora);
+
+CREATE TABLE IF NOT EXISTS round (
+    round_id INTEGER PRIMARY KEY,
+    partida_id INTEGER NOT NULL,
+    numero INTEGER NOT NULL CHECK (numero > 0),
+    tipo VARCHAR(20),
+    vencedor_lado VARCHAR(20),
+    ct_economia INTEGER,
+    t_economia INTEGER
+) PARTITION BY RANGE (round_id);
+
+CREATE TABLE IF NOT EXISTS evento_dano (
+    evento_id INTEGER NOT NULL,
+    round_id INTEGER NOT NULL REFERENCES round(round_id),
+    atacante_id INTEGER REFERENCES jogador(jogador_id),
+    vitima_id INTEGER REFERENCES jogador(jogador_id),
+    arma_id INTEGER REFERENCES arma(arma_id),
+    tick INTEGER,
+    segundos DECIMAL(10,4),
+    dano_hp INTEGER CHECK (dano_hp >= 0),
+    dano_armadura INTEGER CHECK (dano_armadura >= 0),
+    hitbox VARCHAR(15),
+    bomba_plantada BOOLEAN DEFAULT FALSE,
+    premio INTEGER,
+    atacante_x DECIMAL(15,3),
+    atacante_y DECIMAL(15,3),
+    vitima_x DECIMAL(15,3),
+    vitima_y DECIMAL(15,3),
+    PRIMARY KEY (evento_id, round_id)
+) PARTITION BY RANGE (round_id);
+
+-- ============================================
+-- PARTIÇÕES (exemplo)
+-- ============================================
+CREATE TABLE IF NOT EXISTS partida_2017_09 PARTITION OF partida
+    FOR VALUES FROM ('2017-09-01') TO ('2017-10-01');
+CREATE TABLE IF NOT EXISTS partida_2017_10 PARTITION OF partida
+    FOR VALUES FROM ('2017-10-01') TO ('2017-11-01');
+
+CREATE TABLE IF NOT EXISTS round_r0000 PARTITION OF round FOR VALUES FROM (0) TO (100000);
+CREATE TABLE IF NOT EXISTS evento_dano_r0000 PARTITION OF evento_dano FOR VALUES FROM (0) TO (100000);
+
+-- Valores não nulos fora das faixas criadas. A chave de particionamento
+-- faz parte da PK (NOT NULL): linhas sem ela são descartadas na carga
+CREATE TABLE IF NOT EXISTS partida_padrao PARTITION OF partida DEFAULT;
+CREATE TABLE IF NOT EXISTS round_padrao PARTITION OF round DEFAULT;
+CREATE TABLE IF NOT EXISTS evento_dano_padrao PARTITION OF evento_dano DEFAULT;
+
+-- Índices criados na tabela-mãe valem para todas as partições
+CREATE INDEX IF NOT EXISTS idx_partida_id ON partida(partida_id);
+CREATE INDEX IF NOT EXISTS idx_partida_mapa ON partida(mapa_id);
+CREATE INDEX IF NOT EXISTS idx_round_partida ON round(partida_id);
+CREATE INDEX IF NOT EXISTS idx_evento_atacante ON evento_dano(atacante_id);
+CREATE INDEX IF NOT EXISTS idx_evento_vitima ON evento_dano(vitima_id);
+CREATE INDEX IF NOT EXISTS idx_evento_arma ON evento_dano(arma_id);
+
+-- ============================================
+-- PODA DE PARTIÇÕES (conferir com EXPLAIN)
+-- ============================================
+-- Só nesta sessão; consultas_e_graficos.py liga as duas opções nas
+-- conexões do relatório (DB_CONFIG['options'])
+SET enable_partitionwise_join = on;
+SET enable_partitionwise_aggregate = on;
+
+-- Partidas de um mês: só partida_2017_10 é lida
+EXPLAIN
+SELECT m.nome AS mapa, COUNT(*) AS partidas
+FROM partida p
+INNER JOIN mapa m ON m.mapa_id = p.mapa_id
+WHERE p.data_hora >= '2017-10-01' AND p.data_hora < '2017-11-01'
+GROUP BY m.nome;
+
+-- Dano por tipo de round: um JOIN por par de partições (round_rNNNN x evento_dano_rNNNN)
+EXPLAIN
+SELECT r.tipo, COUNT(*) AS eventos, ROUND(AVG(e.dano_hp), 2) AS dano_medio
+FROM round r
+INNER JOIN evento_dano e ON e.round_id = r.round_id
+GROUP BY r.tipo;
+
+-- ============================================
+-- FIM DO ESQUEMA PARTICIONADO
+-- ============================================
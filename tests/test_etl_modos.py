@@ -0,0 +1,104 @@
+"""
+Os modos do ETL (em memória, streaming e paralelo) devem gerar as
+mesmas tabelas, com os mesmos IDs, para o mesmo CSV de entrada.
+
+Uso:
+    python -m pytest tests
+"""
+
+import importlib
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from armazenamento import ler_tabela  # noqa: E402
+
+TABELAS = ['jogador', 'mapa', 'arma', 'partida', 'round', 'evento_dano', 'jogador_estatistica']
+LINHAS = 3_000
+
+
+def _csv_original(caminho):
+    """CSV no formato do dump original, com os casos que mudam os IDs.
+
+    Jogadores aparecem como atacante e como vítima em blocos diferentes,
+    alguns só como atacante; há atacantes, mapas e armas nulos e a mesma
+    arma com dois tipos.
+    """
+    rng = np.random.default_rng(7)
+    arquivos = np.sort(rng.integers(0, 40, LINHAS))
+    atacantes = rng.integers(0, 300, LINHAS).astype(float)
+    atacantes[rng.random(LINHAS) < 0.05] = np.nan
+    vitimas = rng.integers(100, 300, LINHAS)
+    mapas = np.array(['de_dust2', 'de_mirage', 'de_inferno', None], dtype=object)[arquivos % 4]
+    armas = np.array(['AK47', 'USP', 'AWP', 'HE', None], dtype=object)[rng.integers(0, 5, LINHAS)]
+    tipos = np.where(rng.random(LINHAS) < 0.1, 'Other', 'Rifle')
+    df = pd.DataFrame({
+        'file': [f'demo_{a:03d}.dem' for a in arquivos],
+        'map': mapas,
+        'date': [f'09/{1 + a % 28:02d}/2017 8:44:22 PM' for a in arquivos],
+        'round': rng.integers(1, 31, LINHAS),
+        'tick': rng.integers(0, 100_000, LINHAS),
+        'seconds': rng.random(LINHAS) * 1000,
+        'hp_dmg': rng.integers(0, 120, LINHAS),
+        'arm_dmg': rng.integers(0, 50, LINHAS),
+        'is_bomb_planted': rng.random(LINHAS) < 0.2,
+        'hitbox': rng.choice(['Head', 'Chest', 'Stomach'], LINHAS),
+        'wp': armas,
+        'wp_type': tipos,
+        'award': rng.integers(0, 3300, LINHAS),
+        'winner_side': rng.choice(['CounterTerrorist', 'Terrorist'], LINHAS),
+        'att_id': pd.array(76561198000000000 + atacantes, dtype='Int64'),
+        'att_rank': rng.integers(1, 19, LINHAS),
+        'vic_id': 76561198000000000 + vitimas,
+        'vic_rank': rng.integers(1, 19, LINHAS),
+        'att_pos_x': rng.random(LINHAS),
+        'att_pos_y': rng.random(LINHAS),
+        'vic_pos_x': rng.random(LINHAS),
+        'vic_pos_y': rng.random(LINHAS),
+        'round_type': rng.choice(['ECO', 'FULL_BUY'], LINHAS),
+        'ct_eq_val': rng.integers(0, 30_000, LINHAS),
+        't_eq_val': rng.integers(0, 30_000, LINHAS),
+        'avg_match_rank': rng.integers(1, 19, LINHAS).astype(float),
+    })
+    df.to_csv(caminho)
+
+
+@pytest.fixture
+def etl(tmp_path, monkeypatch):
+    """Módulo do ETL importado de uma pasta temporária.
+
+    Na importação o ETL cria CAMINHO_SAIDA, relativo à pasta atual.
+    """
+    (tmp_path / 'scripts').mkdir()
+    monkeypatch.chdir(tmp_path / 'scripts')
+    return importlib.import_module('etl_processar_dados')
+
+
+def _executar(etl, modo, csv, pasta, monkeypatch):
+    pasta.mkdir()
+    monkeypatch.setattr(etl, 'CAMINHO_SAIDA', f'{pasta}/')
+    if modo == 'memoria':
+        etl.executar_etapas(etl.carregar_dados(csv))
+    elif modo == 'streaming':
+        # Blocos pequenos: jogadores e rounds atravessam vários blocos
+        etl.executar_etl_streaming(csv, tamanho_chunk=700)
+    else:
+        etl.executar_etl_paralelo(csv, num_processos=2)
+    return {nome: ler_tabela(nome, f'{pasta}/') for nome in TABELAS}
+
+
+@pytest.mark.parametrize('modo', ['streaming', 'paralelo'])
+def test_modo_gera_as_mesmas_tabelas_que_em_memoria(etl, modo, tmp_path, monkeypatch):
+    csv = str(tmp_path / 'original.csv')
+    _csv_original(csv)
+
+    esperadas = _executar(etl, 'memoria', csv, tmp_path / 'memoria', monkeypatch)
+    obtidas = _executar(etl, modo, csv, tmp_path / modo, monkeypatch)
+
+    for nome in TABELAS:
+        pd.testing.assert_frame_equal(obtidas[nome], esperadas[nome], obj=nome)